@@ -0,0 +1,200 @@
+"""Summary tables behind the board analytics.
+
+On SQLite three small tables hold running totals that triggers on ``tasks``,
+``task_tag`` and ``tags`` keep current, so every write path (ORM flushes, bulk
+statements, the importer) updates them in the same transaction:
+
+- ``analytics_tasks``: task count and time spent per (column, assignee)
+- ``analytics_due_dates``: task count per (day of end_date, column)
+- ``analytics_tags``: task count and time spent per tag
+
+Reading them costs the same whatever the number of tasks (see
+``app.crud.analytics``). Missing status and assignee are stored as ``''`` and
+``0`` so they can be part of the primary keys. Rows whose count drops to zero
+are kept and skipped when reading.
+
+Other backends have no summary tables; the analytics are computed with GROUP BY
+queries over ``tasks`` and ``task_tag`` instead.
+
+The tables are created by migration 0008 and by ``Base.metadata.create_all``
+(see ``app.models.models``).
+"""
+
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import column, table, text
+from sqlalchemy.engine import Connection
+
+from app.triggers import sqlite_objects, triggers_suspended
+
+TABLE_PREFIX = "analytics_"
+TASK_TOTALS = f"{TABLE_PREFIX}tasks"
+DUE_DATE_TOTALS = f"{TABLE_PREFIX}due_dates"
+TAG_TOTALS = f"{TABLE_PREFIX}tags"
+
+SQLITE_TABLE_DDL = (
+    f"""CREATE TABLE {TASK_TOTALS} (
+        status TEXT NOT NULL, assignee_id INTEGER NOT NULL, tasks INTEGER NOT NULL, time_spent REAL NOT NULL,
+        PRIMARY KEY (status, assignee_id)
+    ) WITHOUT ROWID""",
+    f"""CREATE TABLE {DUE_DATE_TOTALS} (
+        end_day TEXT NOT NULL, status TEXT NOT NULL, tasks INTEGER NOT NULL,
+        PRIMARY KEY (end_day, status)
+    ) WITHOUT ROWID""",
+    f"""CREATE TABLE {TAG_TOTALS} (
+        tag_id INTEGER PRIMARY KEY, tasks INTEGER NOT NULL, time_spent REAL NOT NULL
+    )""",
+)
+
+
+def _add_task(row: str, sign: str) -> str:
+    """Statements adding (sign "+") or removing (sign "-") the ``row`` (new or old) task's totals"""
+    if sign == "+":
+        return f"""
+        INSERT INTO {TASK_TOTALS}
+            VALUES (
+                coalesce({row}.status, ''), coalesce({row}.assignee_id, 0), 1, coalesce({row}.time_spent, 0)
+            )
+            ON CONFLICT DO UPDATE SET tasks = tasks + 1, time_spent = time_spent + excluded.time_spent;
+        INSERT INTO {DUE_DATE_TOTALS}
+            SELECT date({row}.end_date), coalesce({row}.status, ''), 1 WHERE {row}.end_date IS NOT NULL
+            ON CONFLICT DO UPDATE SET tasks = tasks + 1;"""
+    return f"""
+        UPDATE {TASK_TOTALS} SET tasks = tasks - 1, time_spent = time_spent - coalesce({row}.time_spent, 0)
+            WHERE status = coalesce({row}.status, '') AND assignee_id = coalesce({row}.assignee_id, 0);
+        UPDATE {DUE_DATE_TOTALS} SET tasks = tasks - 1
+            WHERE end_day = date({row}.end_date) AND status = coalesce({row}.status, '');"""
+
+
+def _add_tag(row: str, sign: str) -> str:
+    """Statement adding or removing the ``row`` task_tag link's task in its tag's totals"""
+    if sign == "+":
+        return f"""
+        INSERT INTO {TAG_TOTALS}
+            SELECT {row}.tag_id, 1, coalesce(time_spent, 0) FROM tasks WHERE id = {row}.task_id
+            ON CONFLICT DO UPDATE SET tasks = tasks + 1, time_spent = time_spent + excluded.time_spent;"""
+    # A task deleted before its links has already been taken out of its tags' totals
+    # (see the task delete trigger)
+    return f"""
+        UPDATE {TAG_TOTALS}
+            SET tasks = tasks - 1,
+                time_spent = time_spent - (SELECT coalesce(time_spent, 0) FROM tasks WHERE id = {row}.task_id)
+            WHERE tag_id = {row}.tag_id AND EXISTS (SELECT 1 FROM tasks WHERE id = {row}.task_id);"""
+
+
+SQLITE_TRIGGERS = {
+    f"{TABLE_PREFIX}task_insert": f"AFTER INSERT ON tasks BEGIN {_add_task('new', '+')} END",
+    f"{TABLE_PREFIX}task_update": f"""AFTER UPDATE OF status, assignee_id, time_spent, end_date ON tasks BEGIN
+        {_add_task('old', '-')} {_add_task('new', '+')}
+        UPDATE {TAG_TOTALS}
+            SET time_spent = time_spent + coalesce(new.time_spent, 0) - coalesce(old.time_spent, 0)
+            WHERE new.time_spent IS NOT old.time_spent
+                AND tag_id IN (SELECT tag_id FROM task_tag WHERE task_id = new.id);
+    END""",
+    f"{TABLE_PREFIX}task_delete": f"""AFTER DELETE ON tasks BEGIN {_add_task('old', '-')}
+        UPDATE {TAG_TOTALS} SET tasks = tasks - 1, time_spent = time_spent - coalesce(old.time_spent, 0)
+            WHERE tag_id IN (SELECT tag_id FROM task_tag WHERE task_id = old.id);
+    END""",
+    f"{TABLE_PREFIX}task_tag_insert": f"AFTER INSERT ON task_tag BEGIN {_add_tag('new', '+')} END",
+    f"{TABLE_PREFIX}task_tag_update": f"""AFTER UPDATE ON task_tag BEGIN
+        {_add_tag('old', '-')} {_add_tag('new', '+')}
+    END""",
+    f"{TABLE_PREFIX}task_tag_delete": f"AFTER DELETE ON task_tag BEGIN {_add_tag('old', '-')} END",
+    f"{TABLE_PREFIX}tag_delete": f"""AFTER DELETE ON tags BEGIN
+        DELETE FROM {TAG_TOTALS} WHERE tag_id = old.id;
+    END""",
+}
+
+# Bulk inserts add their rows up with ``add_totals`` instead of these (see ``insert_triggers_suspended``)
+SQLITE_INSERT_TRIGGERS = (f"{TABLE_PREFIX}task_insert", f"{TABLE_PREFIX}task_tag_insert")
+
+SQLITE_ADD_TOTALS = (
+    f"""INSERT INTO {TASK_TOTALS} VALUES (?, ?, ?, ?)
+        ON CONFLICT DO UPDATE SET tasks = tasks + excluded.tasks,
+            time_spent = time_spent + excluded.time_spent""",
+    f"""INSERT INTO {DUE_DATE_TOTALS} VALUES (?, ?, ?)
+        ON CONFLICT DO UPDATE SET tasks = tasks + excluded.tasks""",
+    f"""INSERT INTO {TAG_TOTALS} VALUES (?, ?, ?)
+        ON CONFLICT DO UPDATE SET tasks = tasks + excluded.tasks,
+            time_spent = time_spent + excluded.time_spent""",
+)
+
+SQLITE_BACKFILL = (
+    f"""INSERT INTO {TASK_TOTALS}
+        SELECT coalesce(status, ''), coalesce(assignee_id, 0), count(*), total(time_spent) FROM tasks
+        GROUP BY 1, 2""",
+    f"""INSERT INTO {DUE_DATE_TOTALS}
+        SELECT date(end_date), coalesce(status, ''), count(*) FROM tasks WHERE end_date IS NOT NULL
+        GROUP BY 1, 2""",
+    f"""INSERT INTO {TAG_TOTALS}
+        SELECT task_tag.tag_id, count(*), total(tasks.time_spent)
+        FROM task_tag JOIN tasks ON tasks.id = task_tag.task_id
+        GROUP BY 1""",
+)
+
+# For selecting from the summary tables with Core
+task_totals = table(
+    TASK_TOTALS, column("status"), column("assignee_id"), column("tasks"), column("time_spent")
+)
+due_date_totals = table(DUE_DATE_TOTALS, column("end_day"), column("status"), column("tasks"))
+tag_totals = table(TAG_TOTALS, column("tag_id"), column("tasks"), column("time_spent"))
+
+
+def create_summary_tables(connection: Connection) -> None:
+    """Create and fill the summary tables on SQLite; a no-op if they exist and on other backends"""
+    if connection.dialect.name != "sqlite" or sqlite_objects(connection, "table", [TASK_TOTALS]):
+        return
+    triggers = (f"CREATE TRIGGER {name} {body}" for name, body in SQLITE_TRIGGERS.items())
+    statements = [*SQLITE_TABLE_DDL, *triggers]
+    for statement in [*statements, *SQLITE_BACKFILL]:
+        connection.execute(text(statement))
+
+
+def drop_summary_tables(connection: Connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    statements = [
+        *(f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS),
+        *(f"DROP TABLE IF EXISTS {name}" for name in (TASK_TOTALS, DUE_DATE_TOTALS, TAG_TOTALS)),
+    ]
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+@contextmanager
+def insert_triggers_suspended(connection: Connection) -> Iterator[bool]:
+    """Suspend the SQLite insert triggers for the body of a ``with`` (see ``app.triggers``).
+
+    Yields whether tasks and task_tag links inserted meanwhile must be added
+    with ``add_totals``, which costs one upsert per group rather than per row.
+    """
+    with triggers_suspended(connection, SQLITE_TRIGGERS, SQLITE_INSERT_TRIGGERS) as suspended:
+        yield suspended
+
+
+def add_totals(connection: Connection, tasks: list[tuple], links: list[tuple]) -> None:
+    """Add new tasks, as (status, assignee_id, end_date, time_spent) rows, and their tag links, as
+    (tag_id, time_spent)"""
+    task_groups = defaultdict(lambda: [0, 0.0])
+    due_groups = defaultdict(int)
+    tag_groups = defaultdict(lambda: [0, 0.0])
+    for status, assignee_id, end_date, time_spent in tasks:
+        group = task_groups[status or "", assignee_id or 0]
+        group[0] += 1
+        group[1] += time_spent or 0
+        if end_date is not None:
+            due_groups[end_date.date().isoformat(), status or ""] += 1
+    for tag_id, time_spent in links:
+        group = tag_groups[tag_id]
+        group[0] += 1
+        group[1] += time_spent or 0
+    groups = (
+        [(*key, tasks, time_spent) for key, (tasks, time_spent) in task_groups.items()],
+        [(*key, tasks) for key, tasks in due_groups.items()],
+        [(key, tasks, time_spent) for key, (tasks, time_spent) in tag_groups.items()],
+    )
+    for statement, rows in zip(SQLITE_ADD_TOTALS, groups, strict=True):
+        if rows:
+            connection.exec_driver_sql(statement, rows)
@@ -0,0 +1,129 @@
+"""Process-local read cache for small reference tables (users, tags, columns).
+
+Entries are bounded by count (least recently used go first) and by age, and
+are tagged with the change log version of the tables they were read from. A
+lookup checks that version and treats an entry from an older version as a miss,
+so a write committed by any worker invalidates every worker's copy. The
+versions of all cached tables are read in one statement of index probes and
+kept for the rest of the transaction (until it flushes, commits or rolls back),
+so a board load pays for a single probe. Writes in this process also drop
+matching entries right away.
+
+Cached functions return plain rows (``sqlalchemy.Row``), not ORM instances, so
+a result can be shared between sessions and requests safely.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import config
+
+# Every table a cached function reads from; their versions are probed together
+CACHED_TABLES = ("column", "tag", "user")
+
+# Session.info key for the versions read in the current transaction
+VERSIONS_KEY = "kanban_cache_versions"
+
+STAT_NAMES = ("hits", "misses", "stale", "expired", "evictions", "invalidations")
+
+
+class ReadCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expires_at, version, value); the first element of every key is its tables
+        self._entries: OrderedDict[tuple, tuple[float, int, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, tables: tuple[str, ...], stat: str) -> None:
+        namespace = self._stats.setdefault(",".join(tables), dict.fromkeys(STAT_NAMES, 0))
+        namespace[stat] += 1
+
+    def get(self, key: tuple, version: int) -> tuple | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count(key[0], "misses")
+                return None
+            expires_at, entry_version, value = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self._entries[key]
+                self._count(key[0], "stale" if entry_version != version else "expired")
+                return None
+            self._entries.move_to_end(key)
+            self._count(key[0], "hits")
+            return value
+
+    def put(self, key: tuple, version: int, value: tuple) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _entry = self._entries.popitem(last=False)
+                self._count(evicted[0], "evictions")
+
+    def invalidate(self, table: str) -> None:
+        """Drop every entry read from ``table``"""
+        with self._lock:
+            for key in [key for key in self._entries if table in key[0]]:
+                del self._entries[key]
+                self._count(key[0], "invalidations")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.maxsize, "tables": dict(self._stats)}
+
+
+read_cache = ReadCache(maxsize=config.CACHE_MAX_ENTRIES, ttl=config.CACHE_TTL_SECONDS)
+
+
+def _table_versions(db: Session) -> dict[str, int]:
+    # Imported here because the CRUD modules import this one
+    from app.crud.changes import get_entity_versions
+
+    versions = db.info.get(VERSIONS_KEY)
+    if versions is None:
+        versions = db.info[VERSIONS_KEY] = get_entity_versions(db, CACHED_TABLES)
+    return versions
+
+
+@event.listens_for(Session, "after_flush")
+@event.listens_for(Session, "after_transaction_end")
+def _forget_versions(session, *args):
+    # A flush may have logged new changes, and a new transaction may see other workers' commits
+    session.info.pop(VERSIONS_KEY, None)
+
+
+def cached(*tables: str):
+    """Cache a CRUD read of ``tables`` keyed by its arguments; the function must return rows"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(db: Session, *args, **kwargs):
+            if not config.CACHE_ENABLED:
+                return fn(db, *args, **kwargs)
+
+            versions = _table_versions(db)
+            version = max(versions[table] for table in tables)
+            # The engine is part of the key so databases sharing a process never share entries
+            key = (tables, db.get_bind(), fn.__name__, args, tuple(sorted(kwargs.items())))
+            value = read_cache.get(key, version)
+            if value is None:
+                value = tuple(fn(db, *args, **kwargs))
+                read_cache.put(key, version, value)
+            # A fresh list per caller, so nobody can modify the shared entry
+            return list(value)
+
+        return wrapper
+
+    return decorator
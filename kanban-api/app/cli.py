@@ -0,0 +1,162 @@
+"""Database management commands.
+
+Usage (from the kanban-api directory)::
+
+    python -m app.cli migrate [revision]   # upgrade the schema, default "head"
+    python -m app.cli seed                 # insert the sample board if the database is empty
+    python -m app.cli seed --tasks N [--comments-per-task N] [--tags-per-task N] [--users N] [--tags N]
+                           [--seed N]
+                                           # fill an empty database with a synthetic board of N tasks
+    python -m app.cli rebalance            # rewrite column and task rank keys short, keeping order
+    python -m app.cli prune-changes [days] # drop change log entries older than days, default 30
+    python -m app.cli import tasks|comments FILE [--format csv|ndjson] [--chunk-size N]
+                                           # bulk import, format from the file suffix by default
+"""
+
+import argparse
+import json
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Schema that create_all produced before migrations existed
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(configure_logger: bool = True) -> Config:
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.attributes["configure_logger"] = configure_logger
+    return cfg
+
+
+def migrate(revision: str = "head", configure_logger: bool = True) -> None:
+    """Upgrade the database to ``revision``, adopting databases created by create_all"""
+    cfg = alembic_config(configure_logger=configure_logger)
+
+    table_names = inspect(engine).get_table_names()
+    if table_names and "alembic_version" not in table_names:
+        command.stamp(cfg, BASELINE_REVISION)
+
+    command.upgrade(cfg, revision)
+
+
+def seed() -> None:
+    from app.init_db import init_db
+
+    init_db()
+
+
+def seed_synthetic(tasks: int, **options) -> int:
+    from app.database import SessionLocal
+    from app.init_db import init_synthetic_db
+
+    db = SessionLocal()
+    try:
+        def progress(imported: int) -> None:
+            print(f"{imported} tasks imported", file=sys.stderr)
+
+        return init_synthetic_db(db, tasks, progress=progress, **options)
+    finally:
+        db.close()
+
+
+def rebalance() -> int:
+    from app.crud.board import rebalance_board_ranks
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return rebalance_board_ranks(db)
+    finally:
+        db.close()
+
+
+def prune_changes(days: int = 30) -> int:
+    from app.crud.changes import prune_changes as prune
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return prune(db, timedelta(days=days))
+    finally:
+        db.close()
+
+
+def import_file(kind: str, path: Path, fmt: str | None = None, chunk_size: int | None = None) -> dict:
+    """Import ``path`` printing progress to stderr; returns the summary"""
+    from app.database import SessionLocal
+    from app.importer import IMPORT_CHUNK_SIZE, import_stream
+
+    fmt = fmt or ("ndjson" if path.suffix.lower() in (".ndjson", ".jsonl") else "csv")
+    db = SessionLocal()
+    try:
+        with path.open("rb") as stream:
+            for event in import_stream(db, kind, stream, fmt, chunk_size or IMPORT_CHUNK_SIZE):
+                if event["type"] == "progress":
+                    print(f"{event['imported']} imported, {event['failed']} failed", file=sys.stderr)
+        return event
+    finally:
+        db.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Kanban API database management")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subcommands.add_parser("migrate", help="apply Alembic migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head")
+
+    seed_parser = subcommands.add_parser("seed", help="insert sample data into an empty database")
+    seed_parser.add_argument(
+        "--tasks", type=int, help="synthetic board of this many tasks instead of the sample"
+    )
+    seed_parser.add_argument("--comments-per-task", type=int, default=2)
+    seed_parser.add_argument("--tags-per-task", type=int, default=2)
+    seed_parser.add_argument("--users", type=int, default=50)
+    seed_parser.add_argument("--tags", type=int, default=30)
+    seed_parser.add_argument("--seed", type=int, default=0, help="random seed, for a repeatable board")
+    subcommands.add_parser("rebalance", help="re-rank columns and tasks with short keys")
+
+    prune_parser = subcommands.add_parser("prune-changes", help="drop old change log entries")
+    prune_parser.add_argument("days", nargs="?", type=int, default=30)
+
+    import_parser = subcommands.add_parser("import", help="bulk import tasks or comments from CSV or NDJSON")
+    import_parser.add_argument("kind", choices=("tasks", "comments"))
+    import_parser.add_argument("path", type=Path)
+    import_parser.add_argument("--format", choices=("csv", "ndjson"))
+    import_parser.add_argument("--chunk-size", type=int)
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        migrate(args.revision)
+    elif args.command == "seed" and args.tasks is not None:
+        imported = seed_synthetic(
+            args.tasks, comments_per_task=args.comments_per_task, tags_per_task=args.tags_per_task,
+            users=args.users, tags=args.tags, seed=args.seed,
+        )
+        print(f"Seeded {imported} tasks")
+    elif args.command == "seed":
+        seed()
+    elif args.command == "rebalance":
+        print(f"Re-ranked {rebalance()} rows")
+    elif args.command == "prune-changes":
+        print(f"Pruned {prune_changes(args.days)} change log entries")
+    elif args.command == "import":
+        summary = import_file(args.kind, args.path, args.format, args.chunk_size)
+        for error in summary["errors"]:
+            print(json.dumps(error))
+        print(f"Imported {summary['imported']} {args.kind}, {summary['failed']} failed")
+        if summary["failed"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
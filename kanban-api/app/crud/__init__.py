@@ -3,3 +3,8 @@ from app.crud.task import *
 from app.crud.user import *
 from app.crud.comment import *
 from app.crud.tag import *
+from app.crud.board import *
+from app.crud.changes import *
+from app.crud.search import *
+from app.crud.analytics import *
+from app.crud.time_entry import *
@@ -0,0 +1,87 @@
+"""Session-agnostic access to the CRUD layer.
+
+``run`` executes any function from ``app.crud`` on the request's session,
+whichever kind ``app.database.get_session`` provides: a ``Session`` in the
+threadpool, or an ``AsyncSession``'s connection through ``run_sync``, where the
+queries go through the async driver on the event loop and no threadpool worker
+is held. The routers' async handlers are written once against ``run`` and the
+CRUD logic stays sync.
+"""
+
+import functools
+from collections.abc import Callable
+from typing import Any, get_args
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import profiling
+from app.database import AnySession
+
+
+def _nested_schema(annotation) -> type[BaseModel] | None:
+    """The model in a field's annotation (``Comment``, ``List[Comment]``, ``Optional[User]``), if any"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        if (nested := _nested_schema(arg)) is not None:
+            return nested
+    return None
+
+
+@functools.cache
+def _fields(schema: type[BaseModel], cls: type) -> tuple[list[str], list[tuple[str, type[BaseModel]]]]:
+    """The attributes ``schema`` reads that ``cls`` maps, and the fields holding nested schemas"""
+    mapped = [name for name in schema.model_fields if name in inspect(cls).attrs]
+    nested = [
+        (name, inner)
+        for name, field in schema.model_fields.items()
+        if (inner := _nested_schema(field.annotation)) is not None
+    ]
+    return mapped, nested
+
+
+def _load(schema: type[BaseModel], obj) -> None:
+    """Load every attribute of ``obj``, and of its related objects, that ``schema`` reads and is not
+    loaded yet.
+
+    A load waits on the async driver by switching greenlets. Switching from
+    inside pydantic-core's native validator corrupts the stack once other
+    requests' greenlets run meanwhile, so loads happen here, in Python frames.
+    """
+    state = inspect(obj, raiseerr=False)
+    if state is None:
+        return
+    mapped, nested = _fields(schema, type(obj))
+    for name in mapped:
+        if name not in state.dict:
+            getattr(obj, name)
+    for name, nested_schema in nested:
+        value = getattr(obj, name, None)
+        for item in value if isinstance(value, list) else [value]:
+            if item is not None:
+                _load(nested_schema, item)
+
+
+async def run(
+    db: AnySession, fn: Callable[..., Any], *args, schema: type[BaseModel] | None = None, **kwargs
+):
+    """Await ``fn(session, *args, **kwargs)``, loading what ``schema`` reads of the result (see ``_load``).
+
+    The loads happen where the query ran, in the threadpool or the same
+    greenlet, so validating the result against the endpoint's response model
+    afterwards, on the event loop, never queries.
+    """
+
+    def call(session):
+        result = fn(session, *args, **kwargs)
+        if schema is not None and result is not None and not isinstance(result, bool):
+            for item in result if isinstance(result, list) else [result]:
+                _load(schema, item)
+        return result
+
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(call)
+    return await run_in_threadpool(profiling.attributed(call), db)
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session
+
+from app.analytics import due_date_totals, tag_totals, task_totals
+from app.crud.column import get_columns
+from app.crud.tag import get_tags
+from app.crud.user import get_users
+from app.models.models import Task, task_tag
+
+
+def _use_summary_tables(db: Session, live: bool) -> bool:
+    # The summary tables only exist on SQLite (see app.analytics)
+    return not live and db.get_bind().dialect.name == "sqlite"
+
+def _task_totals(db: Session, live: bool) -> list[Row]:
+    """(status, assignee_id, tasks, time_spent) rows, with '' and 0 for a missing status or assignee"""
+    if _use_summary_tables(db, live):
+        return db.execute(select(task_totals).where(task_totals.c.tasks != 0)).all()
+    status = func.coalesce(Task.status, "")
+    assignee_id = func.coalesce(Task.assignee_id, 0)
+    statement = select(
+        status, assignee_id, func.count(), func.coalesce(func.sum(Task.time_spent), 0)
+    ).group_by(status, assignee_id)
+    return db.execute(statement).all()
+
+def _overdue_counts(db: Session, now: datetime, live: bool) -> dict[str, int]:
+    """Tasks with an end date before ``now``, per status"""
+    status = func.coalesce(Task.status, "")
+    due = select(status, func.count()).group_by(status)
+    if not _use_summary_tables(db, live):
+        return dict(db.execute(due.where(Task.end_date < now)).all())
+    # Whole days from the totals; today's tasks, already due or not, are few enough to count through
+    # ix_tasks_end_date
+    today = datetime(now.year, now.month, now.day)
+    counts = defaultdict(int, db.execute(
+        select(due_date_totals.c.status, func.sum(due_date_totals.c.tasks))
+        .where(due_date_totals.c.end_day < today.date().isoformat())
+        .group_by(due_date_totals.c.status)
+    ).all())
+    for key, count in db.execute(due.where(Task.end_date >= today, Task.end_date < now)).all():
+        counts[key] += count
+    return counts
+
+def _tag_totals(db: Session, live: bool) -> dict[int, tuple[int, float]]:
+    """tag id -> (tasks, time_spent)"""
+    if _use_summary_tables(db, live):
+        rows = db.execute(select(tag_totals).where(tag_totals.c.tasks != 0)).all()
+    else:
+        rows = db.execute(
+            select(task_tag.c.tag_id, func.count(), func.coalesce(func.sum(Task.time_spent), 0))
+            .join(Task, Task.id == task_tag.c.task_id)
+            .group_by(task_tag.c.tag_id)
+        ).all()
+    return {tag_id: (tasks, time_spent) for tag_id, tasks, time_spent in rows}
+
+def _columns(db: Session, statuses) -> list[tuple[str, str | None]]:
+    """(id, title) of every column in board order, then any other status tasks have"""
+    columns = [(row.id, row.title) for row in get_columns(db, limit=None)]
+    known = {column_id for column_id, _ in columns}
+    return columns + [(status, None) for status in sorted(set(statuses) - known)]
+
+def _user_names(db: Session) -> dict[int, str]:
+    return {row.id: row.name for row in get_users(db, limit=None)}
+
+def get_board_summary(db: Session, now: datetime | None = None, live: bool = False) -> dict:
+    """Task counts per column and per assignee, and overdue counts as of ``now`` (UTC).
+
+    Reads the summary tables where they exist, so the cost does not grow with
+    the number of tasks; ``live`` computes the same with GROUP BY queries over
+    ``tasks`` instead.
+    """
+    now = now or datetime.utcnow()
+    totals = _task_totals(db, live)
+    overdue = _overdue_counts(db, now, live)
+
+    by_status = defaultdict(int)
+    by_assignee = defaultdict(lambda: defaultdict(int))
+    for status, assignee_id, tasks, _time_spent in totals:
+        by_status[status] += tasks
+        by_assignee[assignee_id][status] += tasks
+    names = _user_names(db)
+    return {
+        "as_of": now,
+        "tasks": sum(by_status.values()),
+        "overdue": sum(overdue.values()),
+        "columns": [
+            {
+                "id": column_id, "title": title,
+                "tasks": by_status.get(column_id, 0), "overdue": overdue.get(column_id, 0),
+            }
+            for column_id, title in _columns(db, [*by_status, *overdue])
+        ],
+        # Most loaded first; unassigned tasks are the entry without an id
+        "assignees": sorted(
+            (
+                {
+                    "id": assignee_id or None, "name": names.get(assignee_id),
+                    "tasks": sum(counts.values()), "by_column": dict(counts),
+                }
+                for assignee_id, counts in by_assignee.items()
+            ),
+            key=lambda entry: (-entry["tasks"], entry["id"] or 0),
+        ),
+    }
+
+def get_time_report(db: Session, live: bool = False) -> dict:
+    """Total ``time_spent`` (seconds) overall and per tag, assignee and column; ``live`` as for
+    ``get_board_summary``"""
+    by_status = defaultdict(lambda: [0, 0.0])
+    by_assignee = defaultdict(lambda: [0, 0.0])
+    for status, assignee_id, tasks, time_spent in _task_totals(db, live):
+        for entry in (by_status[status], by_assignee[assignee_id]):
+            entry[0] += tasks
+            entry[1] += time_spent
+    tags = _tag_totals(db, live)
+    names = _user_names(db)
+    return {
+        "total": sum(time_spent for _, time_spent in by_status.values()),
+        "by_tag": [
+            {"id": row.id, "name": row.name, "tasks": tags[row.id][0], "time_spent": tags[row.id][1]}
+            for row in get_tags(db, limit=None)
+            if row.id in tags
+        ],
+        "by_assignee": [
+            {
+                "id": assignee_id or None, "name": names.get(assignee_id),
+                "tasks": tasks, "time_spent": time_spent,
+            }
+            for assignee_id, (tasks, time_spent) in sorted(by_assignee.items())
+        ],
+        "by_column": [
+            {
+                "id": column_id, "title": title,
+                "tasks": by_status[column_id][0], "time_spent": by_status[column_id][1],
+            }
+            for column_id, title in _columns(db, by_status)
+            if column_id in by_status
+        ],
+    }
@@ -0,0 +1,72 @@
+from sqlalchemy.orm import Session
+
+from app.cache import read_cache
+from app.crud.changes import get_version
+from app.crud.column import get_columns, rebalance_column_ranks
+from app.crud.tag import get_tags
+from app.crud.task import (
+    TASK_LOAD_OPTIONS,
+    get_task_relation_rows,
+    get_task_summary_rows,
+    rebalance_task_ranks,
+)
+from app.crud.user import get_users
+from app.models.models import Task
+
+
+def get_board(db: Session) -> dict:
+    """Load everything needed to render the board in a fixed number of queries.
+
+    Columns, users and tags come from the read cache (a version probe each, plus
+    one query on a miss); tasks are one query plus one selectin query per
+    eager-loaded relationship, regardless of task count.
+    The change log version is read first, so replaying changes after it never
+    misses a write that landed while the snapshot was loading.
+    """
+    version = get_version(db)
+    columns = get_columns(db, limit=None)
+    tasks = (
+        db.query(Task)
+        .options(*TASK_LOAD_OPTIONS)
+        .order_by(Task.rank, Task.id)
+        .all()
+    )
+    users = get_users(db, limit=None)
+    tags = get_tags(db, limit=None)
+    return {"version": version, "columns": columns, "tasks": tasks, "users": users, "tags": tags}
+
+def get_board_rows(db: Session, task_columns, comment_columns, tag_columns) -> dict:
+    """``get_board`` as Core rows, plus every task's comment rows and (task_id, tag) rows"""
+    version = get_version(db)
+    columns = get_columns(db, limit=None)
+    tasks = db.query(*task_columns).order_by(Task.rank, Task.id).all()
+    comments, task_tags = get_task_relation_rows(db, None, comment_columns, tag_columns)
+    users = get_users(db, limit=None)
+    tags = get_tags(db, limit=None)
+    return {
+        "version": version, "columns": columns, "tasks": tasks, "comments": comments, "task_tags": task_tags,
+        "users": users, "tags": tags,
+    }
+
+def get_board_summary_rows(db: Session, task_columns) -> dict:
+    """``get_board_rows`` for task summaries: comment counts and (task_id, tag_id) rows instead of
+    comments and tags"""
+    version = get_version(db)
+    columns = get_columns(db, limit=None)
+    tasks = db.query(*task_columns).order_by(Task.rank, Task.id).all()
+    comment_counts, tag_ids = get_task_summary_rows(db, None)
+    users = get_users(db, limit=None)
+    tags = get_tags(db, limit=None)
+    return {
+        "version": version, "columns": columns, "tasks": tasks, "comment_counts": comment_counts,
+        "tag_ids": tag_ids, "users": users, "tags": tags,
+    }
+
+def rebalance_board_ranks(db: Session) -> int:
+    """Re-rank every column and the tasks in each, keeping the current order"""
+    count = rebalance_column_ranks(db, commit=False)
+    for (status,) in db.query(Task.status).distinct():
+        count += rebalance_task_ranks(db, status, commit=False)
+    db.commit()
+    read_cache.invalidate("column")
+    return count
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.crud.task import BULK_LOOKUP_CHUNK, TASK_LOAD_OPTIONS
+from app.models.models import Change, Comment, KanbanColumn, Tag, Task
+
+# Change log entity name -> (model, id type, key in the response)
+CHANGE_ENTITIES = {
+    "task": (Task, int, "tasks"),
+    "column": (KanbanColumn, str, "columns"),
+    "comment": (Comment, int, "comments"),
+    "tag": (Tag, int, "tags"),
+}
+
+
+def get_version(db: Session) -> int:
+    """Newest change log id; 0 for a database with no logged changes"""
+    return db.query(func.max(Change.id)).scalar() or 0
+
+
+def get_entity_versions(db: Session, entities: tuple[str, ...]) -> dict[str, int]:
+    """Newest change log id for each of ``entities``, in one statement of index probes"""
+    latest = [
+        select(func.max(Change.id)).where(Change.entity == entity).scalar_subquery() for entity in entities
+    ]
+    versions = db.execute(select(*latest)).one()
+    return {entity: version or 0 for entity, version in zip(entities, versions, strict=True)}
+
+
+def get_entity_version(db: Session, entities: tuple[str, ...]) -> int:
+    """Newest change log id touching any of ``entities``"""
+    return max(get_entity_versions(db, entities).values(), default=0)
+
+
+def _load_rows(db: Session, model, ids: list, options=()) -> list:
+    rows = []
+    for start in range(0, len(ids), BULK_LOOKUP_CHUNK):
+        chunk = ids[start:start + BULK_LOOKUP_CHUNK]
+        rows.extend(db.query(model).options(*options).filter(model.id.in_(chunk)).order_by(model.id))
+    return rows
+
+
+def get_changes(db: Session, since: int, limit: int = 1000) -> dict:
+    """Rows changed after version ``since``: current state for live rows, ids for deleted ones.
+
+    Reads at most ``limit`` log entries, so the cost follows churn rather than
+    board size; ``has_more`` says whether to ask again from the returned
+    version. ``reset`` means entries after ``since`` were pruned and the client
+    must reload the board.
+    """
+    newest = get_version(db)
+    oldest = db.query(func.min(Change.id)).scalar()
+    # A version from the future means the database was replaced; an old one that entries were pruned
+    if since > newest or (oldest is not None and since < oldest - 1):
+        return {"version": newest, "reset": True}
+
+    entries = (
+        db.query(Change.id, Change.entity, Change.entity_id, Change.op)
+        .filter(Change.id > since)
+        .order_by(Change.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # The last entry for a row decides whether it is sent as a row or a tombstone
+    latest_ops: dict[tuple[str, str], str] = {}
+    for entry in entries:
+        latest_ops[entry.entity, entry.entity_id] = entry.op
+
+    live: dict[str, list] = {entity: [] for entity in CHANGE_ENTITIES}
+    deleted: dict[str, list] = {entity: [] for entity in CHANGE_ENTITIES}
+    for (entity, entity_id), op in latest_ops.items():
+        if entity in CHANGE_ENTITIES:
+            id_type = CHANGE_ENTITIES[entity][1]
+            (deleted if op == "delete" else live)[entity].append(id_type(entity_id))
+
+    changes = {"version": entries[-1].id if entries else since, "has_more": has_more, "deleted": {}}
+    for entity, (model, _id_type, key) in CHANGE_ENTITIES.items():
+        rows = _load_rows(db, model, live[entity], TASK_LOAD_OPTIONS if model is Task else ())
+        # Rows removed without a logged delete (e.g. by raw SQL) are reported as deleted too
+        found = {row.id for row in rows}
+        changes[key] = rows
+        changes["deleted"][key] = sorted(deleted[entity] + [id_ for id_ in live[entity] if id_ not in found])
+    return changes
+
+
+def prune_changes(db: Session, older_than: timedelta) -> int:
+    """Delete change log entries older than ``older_than``, always keeping the newest one.
+
+    Clients holding a version from before the cut are told to reset.
+    """
+    newest = get_version(db)
+    deleted = (
+        db.query(Change)
+        .filter(Change.changed_at < datetime.utcnow() - older_than, Change.id < newest)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
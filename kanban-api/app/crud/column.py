@@ -1,19 +1,74 @@
+from sqlalchemy import Row, update
 from sqlalchemy.orm import Session
 
-from app.models.models import KanbanColumn
-from app.schemas.column import ColumnCreate, ColumnUpdate
+from app import events
+from app.cache import cached, read_cache
+from app.models.models import KanbanColumn, Task
+from app.ranking import rank_between, ranks_between
+from app.schemas.column import ColumnCreate, ColumnMove, ColumnUpdate
+
+# Board order; rows without a rank yet (pre-migration data) fall back to position
+COLUMN_ORDER = (KanbanColumn.rank, KanbanColumn.position, KanbanColumn.id)
 
 
 def get_column(db: Session, column_id: str) -> KanbanColumn | None:
     return db.query(KanbanColumn).filter(KanbanColumn.id == column_id).first()
 
-def get_columns(db: Session, skip: int = 0, limit: int = 100) -> list[KanbanColumn]:
-    return db.query(KanbanColumn).order_by(KanbanColumn.position).offset(skip).limit(limit).all()
+@cached("column")
+def get_columns(db: Session, skip: int = 0, limit: int | None = 100) -> list[Row]:
+    # Plain rows rather than KanbanColumn instances, so the result can be cached and shared across sessions
+    return db.query(*KanbanColumn.__table__.columns).order_by(*COLUMN_ORDER).offset(skip).limit(limit).all()
+
+def get_column_positions(db: Session) -> dict[str, int]:
+    """Zero-based place of each column on the board, reported to clients as its position"""
+    return {id_: i for i, (id_,) in enumerate(db.query(KanbanColumn.id).order_by(*COLUMN_ORDER))}
+
+def get_column_task_ids(db: Session, column_ids: list[str] | None = None) -> dict[str, list[int]]:
+    # Select only (column_id, task_id) pairs so full Task rows are never loaded
+    query = db.query(Task.status, Task.id)
+    if column_ids is not None:
+        query = query.filter(Task.status.in_(column_ids))
+
+    task_ids: dict[str, list[int]] = {}
+    for column_id, task_id in query.order_by(Task.status, Task.rank, Task.id):
+        task_ids.setdefault(column_id, []).append(task_id)
+    return task_ids
+
+def _ranked_columns(db: Session, exclude_id: str | None = None) -> list[tuple[str, str | None]]:
+    query = db.query(KanbanColumn.id, KanbanColumn.rank)
+    if exclude_id is not None:
+        query = query.filter(KanbanColumn.id != exclude_id)
+    return [tuple(row) for row in query.order_by(*COLUMN_ORDER)]
+
+def _rank_between_columns(db: Session, exclude_id: str | None, bounds) -> str:
+    """Rank a column between the neighbours ``bounds(columns)`` picks, re-ranking once if they collide.
+
+    ``bounds`` receives the other columns as ordered (id, rank) pairs and returns
+    the (lower, upper) pair to insert between, each a pair or None.
+    """
+    for _ in range(2):
+        lower, upper = bounds(_ranked_columns(db, exclude_id))
+        lower_rank = lower[1] if lower else None
+        upper_rank = upper[1] if upper else None
+        usable = (lower is None or lower_rank is not None) and (upper is None or upper_rank is not None)
+        if usable and (lower_rank is None or upper_rank is None or lower_rank < upper_rank):
+            return rank_between(lower_rank, upper_rank)
+        rebalance_column_ranks(db, commit=False)
+    raise ValueError("Could not rank column")
+
+def _at_index(index: int | None):
+    def bounds(columns):
+        at = len(columns) if index is None else max(0, min(index, len(columns)))
+        return (columns[at - 1] if at > 0 else None), (columns[at] if at < len(columns) else None)
+    return bounds
 
 def create_column(db: Session, column: ColumnCreate) -> KanbanColumn:
-    db_column = KanbanColumn(id=column.id, title=column.title, position=column.position)
+    # The stored position only orders rows without a rank; the rank places the column
+    db_column = KanbanColumn(id=column.id, title=column.title, position=column.position or 0)
+    db_column.rank = _rank_between_columns(db, None, _at_index(column.position))
     db.add(db_column)
     db.commit()
+    read_cache.invalidate("column")
     db.refresh(db_column)
     return db_column
 
@@ -23,13 +78,61 @@ def update_column(db: Session, column_id: str, column: ColumnUpdate) -> KanbanCo
         return None
     
     update_data = column.dict(exclude_unset=True)
+    if update_data.get("position") is not None:
+        db_column.rank = _rank_between_columns(db, column_id, _at_index(update_data["position"]))
     for key, value in update_data.items():
         setattr(db_column, key, value)
     
     db.commit()
+    read_cache.invalidate("column")
     db.refresh(db_column)
     return db_column
 
+def move_column(db: Session, column_id: str, move: ColumnMove) -> KanbanColumn | None:
+    """Place a column between two neighbours on the board, writing only the moved row.
+
+    Raises ValueError if a neighbour does not exist or is the column itself.
+    """
+    db_column = get_column(db, column_id)
+    if db_column is None:
+        return None
+    if column_id in (move.after_id, move.before_id):
+        raise ValueError("A column cannot be its own neighbour")
+
+    def bounds(columns):
+        index = {id_: i for i, (id_, _) in enumerate(columns)}
+        for neighbour_id in (move.after_id, move.before_id):
+            if neighbour_id is not None and neighbour_id not in index:
+                raise ValueError(f"Column {neighbour_id} not found")
+        if move.after_id is not None:
+            at = index[move.after_id] + 1
+            if move.before_id is not None and index[move.before_id] != at:
+                raise ValueError(f"Column {move.before_id} does not follow {move.after_id}")
+        elif move.before_id is not None:
+            at = index[move.before_id]
+        else:
+            at = len(columns)
+        return _at_index(at)(columns)
+
+    db_column.rank = _rank_between_columns(db, column_id, bounds)
+    db.commit()
+    read_cache.invalidate("column")
+    db.refresh(db_column)
+    return db_column
+
+def rebalance_column_ranks(db: Session, commit: bool = True) -> int:
+    """Rewrite column rank keys evenly spaced and short, keeping the current order"""
+    column_ids = [column_id for column_id, _ in _ranked_columns(db)]
+    ranks = ranks_between(None, None, len(column_ids))
+    if column_ids:
+        rows = [{"id": id_, "rank": rank} for id_, rank in zip(column_ids, ranks, strict=True)]
+        db.execute(update(KanbanColumn), rows)
+        events.record(db, "column", "update", rows)
+    if commit:
+        db.commit()
+        read_cache.invalidate("column")
+    return len(column_ids)
+
 def delete_column(db: Session, column_id: str) -> bool:
     db_column = get_column(db, column_id)
     if db_column is None:
@@ -37,4 +140,5 @@ def delete_column(db: Session, column_id: str) -> bool:
     
     db.delete(db_column)
     db.commit()
+    read_cache.invalidate("column")
     return True
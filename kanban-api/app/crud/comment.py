@@ -7,8 +7,12 @@ from app.schemas.comment import CommentCreate, CommentUpdate
 def get_comment(db: Session, comment_id: int) -> Optional[Comment]:
     return db.query(Comment).filter(Comment.id == comment_id).first()
 
-def get_comments_by_task(db: Session, task_id: int, skip: int = 0, limit: int = 100) -> List[Comment]:
-    return db.query(Comment).filter(Comment.task_id == task_id).offset(skip).limit(limit).all()
+def get_comments_by_task(
+    db: Session, task_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None
+) -> List[Comment]:
+    query = db.query(Comment).filter(Comment.task_id == task_id).order_by(Comment.id)
+    query = query.filter(Comment.id > after_id) if after_id is not None else query.offset(skip)
+    return query.limit(limit).all()
 
 def create_comment(db: Session, comment: CommentCreate) -> Comment:
     db_comment = Comment(
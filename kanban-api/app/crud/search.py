@@ -0,0 +1,140 @@
+from sqlalchemy import Row, func, literal_column, select, true, union
+from sqlalchemy.orm import Session
+
+from app.models.models import Comment, Task
+from app.search import (
+    HIGHLIGHT_END,
+    HIGHLIGHT_START,
+    MAX_RANKED_MATCHES,
+    SEARCH_TABLE,
+    SNIPPET_WORDS,
+    TS_CONFIG,
+    comment_vector,
+    fts5_query,
+    query_terms,
+    search_table,
+    task_vector,
+    tsquery,
+)
+
+
+def _sqlite_page(db: Session, match, condition, ranked: bool, skip: int, limit: int) -> list[Row]:
+    """A page of the matches meeting ``condition``, by BM25 if ``ranked`` else newest first"""
+    fts = literal_column(SEARCH_TABLE)
+    # Highlights and scores are only built for the page returned
+    page = (
+        select(
+            search_table.c.rowid.label("task_id"),
+            func.highlight(fts, 0, HIGHLIGHT_START, HIGHLIGHT_END).label("highlight"),
+            func.snippet(fts, -1, HIGHLIGHT_START, HIGHLIGHT_END, "…", SNIPPET_WORDS).label("snippet"),
+            (-search_table.c.rank).label("score"),
+        )
+        .where(match, condition)
+        .order_by(search_table.c.rank if ranked else search_table.c.rowid.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    order = (page.c.score.desc(), Task.id) if ranked else (Task.id.desc(),)
+    statement = (
+        select(Task.id, Task.title, Task.status, page.c.highlight, page.c.snippet, page.c.score)
+        .join_from(page, Task, Task.id == page.c.task_id)
+        .order_by(*order)
+    )
+    return db.execute(statement).all()
+
+def _sqlite_search(db: Session, terms: list[str], skip: int, limit: int) -> list[Row]:
+    fts = literal_column(SEARCH_TABLE)
+    match = fts.op("MATCH")(fts5_query(terms))
+    rowid = search_table.c.rowid
+    # Lowest rowid among the newest MAX_RANKED_MATCHES matches, None if there are fewer;
+    # FTS5 walks its rowid order without ranking
+    newest = select(rowid).where(match).order_by(rowid.desc())
+    floor = db.scalar(newest.offset(MAX_RANKED_MATCHES - 1).limit(1))
+    if floor is None:
+        return _sqlite_page(db, match, true(), True, skip, limit)
+    results = _sqlite_page(db, match, rowid >= floor, True, skip, limit)
+    if len(results) < limit:
+        # The older matches follow the ranked ones, newest first
+        older_skip = max(0, skip - MAX_RANKED_MATCHES)
+        results += _sqlite_page(db, match, rowid < floor, False, older_skip, limit - len(results))
+    return results
+
+def _postgres_page(db: Session, terms: list[str], matches, ranked: bool, skip: int, limit: int) -> list[Row]:
+    """A page of the tasks in ``matches``, by ts_rank if ``ranked`` else newest first"""
+    config = literal_column(f"'{TS_CONFIG}'")
+    query = func.to_tsquery(config, tsquery(terms))
+    # Written like the indexed expressions so the planner uses ix_tasks_search and ix_comments_search
+    task_document = literal_column(f"({task_vector('tasks.')})")
+    comment_document = literal_column(comment_vector("comments."))
+
+    comment_rank = select(func.max(func.ts_rank(comment_document, query))).where(Comment.task_id == Task.id)
+    score = (
+        func.ts_rank(task_document, query) + 0.25 * func.coalesce(comment_rank.scalar_subquery(), 0)
+    ).label("score")
+    page = (
+        select(Task.id, Task.title, Task.status, Task.description, score)
+        .join_from(matches, Task, Task.id == matches.c.task_id)
+        .order_by(*((score.desc(), Task.id) if ranked else (Task.id.desc(),)))
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+
+    comments = (
+        select(func.string_agg(Comment.text, " ")).where(Comment.task_id == page.c.id).scalar_subquery()
+    )
+    options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}"
+    statement = select(
+        page.c.id,
+        page.c.title,
+        page.c.status,
+        func.ts_headline(
+            config, func.coalesce(page.c.title, ""), query, f"{options}, HighlightAll=true"
+        ).label("highlight"),
+        func.ts_headline(
+            config,
+            func.concat_ws(" ", page.c.description, comments),
+            query,
+            f"{options}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}",
+        ).label("snippet"),
+        page.c.score,
+    ).order_by(*((page.c.score.desc(), page.c.id) if ranked else (page.c.id.desc(),)))
+    return db.execute(statement).all()
+
+def _postgres_search(db: Session, terms: list[str], skip: int, limit: int) -> list[Row]:
+    config = literal_column(f"'{TS_CONFIG}'")
+    query = func.to_tsquery(config, tsquery(terms))
+    task_document = literal_column(f"({task_vector('tasks.')})")
+    comment_document = literal_column(comment_vector("comments."))
+
+    matches = union(
+        select(Task.id.label("task_id")).where(task_document.op("@@")(query)),
+        select(Comment.task_id).where(comment_document.op("@@")(query)),
+    ).subquery()
+    newest = select(matches.c.task_id).order_by(matches.c.task_id.desc())
+    # As on SQLite: the newest MAX_RANKED_MATCHES matches are ranked and the older ones follow, newest first
+    floor = db.scalar(newest.offset(MAX_RANKED_MATCHES - 1).limit(1))
+    if floor is None:
+        return _postgres_page(db, terms, matches, True, skip, limit)
+    ranked = select(matches.c.task_id).where(matches.c.task_id >= floor).subquery()
+    results = _postgres_page(db, terms, ranked, True, skip, limit)
+    if len(results) < limit:
+        older = select(matches.c.task_id).where(matches.c.task_id < floor).subquery()
+        older_skip = max(0, skip - MAX_RANKED_MATCHES)
+        results += _postgres_page(db, terms, older, False, older_skip, limit - len(results))
+    return results
+
+def search_tasks(db: Session, q: str, skip: int = 0, limit: int = 20) -> list[Row]:
+    """Tasks matching every word of ``q`` (the last as a prefix) in their title, description or comments.
+
+    The newest ``MAX_RANKED_MATCHES`` matches come first, best first; any
+    older matches follow them unranked, newest first, so paging reaches every
+    match.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return _postgres_search(db, terms, skip, limit)
+    return _sqlite_search(db, terms, skip, limit)
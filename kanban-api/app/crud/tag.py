@@ -1,6 +1,8 @@
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.cache import cached, read_cache
 from app.models.models import Tag
 from app.schemas.tag import TagCreate, TagUpdate
 
@@ -10,8 +12,14 @@ def get_tag(db: Session, tag_id: int) -> Optional[Tag]:
 def get_tag_by_name(db: Session, name: str) -> Optional[Tag]:
     return db.query(Tag).filter(Tag.name == name).first()
 
-def get_tags(db: Session, skip: int = 0, limit: int = 100) -> List[Tag]:
-    return db.query(Tag).offset(skip).limit(limit).all()
+@cached("tag")
+def get_tags(
+    db: Session, skip: int = 0, limit: Optional[int] = 100, after_id: Optional[int] = None
+) -> List[Row]:
+    # Plain rows rather than Tag instances, so the result can be cached and shared across sessions
+    query = db.query(*Tag.__table__.columns).order_by(Tag.id)
+    query = query.filter(Tag.id > after_id) if after_id is not None else query.offset(skip)
+    return query.limit(limit).all()
 
 def create_tag(db: Session, tag: TagCreate) -> Tag:
     # Check if tag already exists
@@ -23,6 +31,7 @@ def create_tag(db: Session, tag: TagCreate) -> Tag:
     db_tag = Tag(name=tag.name)
     db.add(db_tag)
     db.commit()
+    read_cache.invalidate("tag")
     db.refresh(db_tag)
     return db_tag
 
@@ -36,6 +45,7 @@ def update_tag(db: Session, tag_id: int, tag: TagUpdate) -> Optional[Tag]:
         setattr(db_tag, key, value)
     
     db.commit()
+    read_cache.invalidate("tag")
     db.refresh(db_tag)
     return db_tag
 
@@ -46,4 +56,5 @@ def delete_tag(db: Session, tag_id: int) -> bool:
     
     db.delete(db_tag)
     db.commit()
+    read_cache.invalidate("tag")
     return True
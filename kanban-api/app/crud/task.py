@@ -1,18 +1,155 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, case, exists, func, insert, intersect, select, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from datetime import datetime
 
-from app.models.models import Task, Tag
-from app.schemas.task import TaskCreate, TaskUpdate, TaskTimeTrackingUpdate
+from app import events
+from app.crud.time_entry import start_time_entry, stop_time_entry
+from app.models.models import Comment, KanbanColumn, Task, Tag, task_tag
+from app.ranking import rank_between, ranks_between
+from app.schemas.task import (
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskFilter,
+    TaskMove,
+    TaskTimeTrackingUpdate,
+    TaskUpdate,
+)
+
+# Task responses embed comments and tags; load them in bulk rather than per task
+TASK_LOAD_OPTIONS = (selectinload(Task.comments), selectinload(Task.tags))
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+BULK_LOOKUP_CHUNK = 500
 
 def get_task(db: Session, task_id: int) -> Optional[Task]:
-    return db.query(Task).filter(Task.id == task_id).first()
+    return db.query(Task).options(*TASK_LOAD_OPTIONS).filter(Task.id == task_id).first()
+
+# Sort keys for task lists; priority sorts by importance rather than alphabetically
+SORT_COLUMNS = {
+    "id": Task.id,
+    "title": Task.title,
+    "status": Task.status,
+    "priority": case({"low": 0, "medium": 1, "high": 2}, value=Task.priority, else_=1),
+    "start_date": Task.start_date,
+    "end_date": Task.end_date,
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "time_spent": Task.time_spent,
+    "rank": Task.rank,
+}
+
+def _tag_predicate(tag_ids: List[int], match: str):
+    if match == "all":
+        # Tasks carrying every tag. Ordered, each tag's task ids come straight from ix_task_tag_tag_id_task_id
+        # and SQLite merges them in one pass, rather than building a temporary B-tree of each
+        tagged = intersect(*(
+            select(task_tag.c.task_id).where(task_tag.c.tag_id == tag_id) for tag_id in tag_ids
+        ))
+        return Task.id.in_(tagged.order_by(task_tag.c.task_id))
+    return exists().where(task_tag.c.task_id == Task.id, task_tag.c.tag_id.in_(tag_ids))
 
-def get_tasks(db: Session, status: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[Task]:
-    query = db.query(Task)
+def filter_tasks(query, filters: TaskFilter):
+    """Narrow a task query with ``filters``, all in SQL"""
+    if filters.assignee_id:
+        query = query.filter(Task.assignee_id.in_(filters.assignee_id))
+    if filters.priority:
+        query = query.filter(Task.priority.in_(filters.priority))
+    if filters.tag_id:
+        query = query.filter(_tag_predicate(sorted(set(filters.tag_id)), filters.tag_match))
+    bounds = (
+        (Task.start_date, filters.start_date_from, filters.start_date_to),
+        (Task.end_date, filters.end_date_from, filters.end_date_to),
+    )
+    for column, low, high in bounds:
+        if low is not None:
+            query = query.filter(column >= low)
+        if high is not None:
+            query = query.filter(column <= high)
+    if filters.is_tracking is not None:
+        query = query.filter(Task.is_tracking == filters.is_tracking)
+    if filters.updated_since is not None:
+        query = query.filter(Task.updated_at >= filters.updated_since)
+    return query
+
+def _task_page(
+    query, status: Optional[str], skip: int, limit: int, after_id: Optional[int],
+    filters: Optional[TaskFilter] = None, order_by: Optional[List[tuple]] = None,
+):
     if status:
         query = query.filter(Task.status == status)
-    return query.offset(skip).limit(limit).all()
+    if filters is not None:
+        query = filter_tasks(query, filters)
+    if order_by:
+        # Tasks without a date sort last either way; id keeps pages stable between equal keys
+        query = query.order_by(*(
+            (SORT_COLUMNS[key].desc() if descending else SORT_COLUMNS[key].asc()).nulls_last()
+            for key, descending in order_by
+        ))
+        if "id" not in dict(order_by):
+            query = query.order_by(Task.id)
+        return query.offset(skip).limit(limit)
+    # Keyset pagination seeks straight to the next page; offset walks and discards skipped rows
+    query = query.order_by(Task.id)
+    query = query.filter(Task.id > after_id) if after_id is not None else query.offset(skip)
+    return query.limit(limit)
+
+def get_tasks(
+    db: Session, status: Optional[str] = None, skip: int = 0, limit: int = 100,
+    after_id: Optional[int] = None, filters: Optional[TaskFilter] = None,
+    order_by: Optional[List[tuple]] = None,
+) -> List[Task]:
+    """A page of tasks in id order, or by ``order_by`` (key, descending) pairs, which pages by
+    ``skip`` only"""
+    query = db.query(Task).options(*TASK_LOAD_OPTIONS)
+    return _task_page(query, status, skip, limit, after_id, filters, order_by).all()
+
+def get_task_rows(
+    db: Session, columns, status: Optional[str] = None, skip: int = 0, limit: int = 100,
+    after_id: Optional[int] = None, filters: Optional[TaskFilter] = None,
+    order_by: Optional[List[tuple]] = None,
+) -> List[Row]:
+    """The page ``get_tasks`` returns, as Core rows of ``columns`` without comments or tags"""
+    return _task_page(db.query(*columns), status, skip, limit, after_id, filters, order_by).all()
+
+def _chunked_rows(query, column, ids: Optional[List]) -> List[Row]:
+    if ids is None:
+        return query.all()
+    rows = []
+    for start in range(0, len(ids), BULK_LOOKUP_CHUNK):
+        rows.extend(query.filter(column.in_(ids[start:start + BULK_LOOKUP_CHUNK])))
+    return rows
+
+def get_task_tag_rows(db: Session, task_ids: Optional[List[int]], tag_columns) -> List[Row]:
+    """(task_id, *tag_columns) rows for ``task_ids``, or for every task when None"""
+    query = db.query(task_tag.c.task_id, *tag_columns).join(Tag, Tag.id == task_tag.c.tag_id).order_by(Tag.id)
+    return _chunked_rows(query, task_tag.c.task_id, task_ids)
+
+def get_task_relation_rows(
+    db: Session, task_ids: Optional[List[int]], comment_columns, tag_columns
+) -> tuple[List[Row], List[Row]]:
+    """Comment rows and (task_id, *tag_columns) rows for ``task_ids``, or for every task when None"""
+    comments = db.query(*comment_columns).order_by(Comment.id)
+    return _chunked_rows(comments, Comment.task_id, task_ids), get_task_tag_rows(db, task_ids, tag_columns)
+
+def get_task_summary_rows(db: Session, task_ids: Optional[List[int]]) -> tuple[List[Row], List[Row]]:
+    """(task_id, comment_count) rows of tasks with comments and (task_id, tag_id) rows, for
+    ``task_ids`` or every task when None.
+
+    The counts come from one grouped query over ix_comments_task_id, so no comment row is read.
+    """
+    comment_counts = db.query(Comment.task_id, func.count().label("comment_count")).group_by(Comment.task_id)
+    # In primary key order, which lists each task's tags by id
+    tag_ids = db.query(task_tag.c.task_id, task_tag.c.tag_id).order_by(task_tag.c.task_id, task_tag.c.tag_id)
+    return (
+        _chunked_rows(comment_counts, Comment.task_id, task_ids),
+        _chunked_rows(tag_ids, task_tag.c.task_id, task_ids),
+    )
+
+def _last_rank(db: Session, status: Optional[str]) -> Optional[str]:
+    # Highest rank in the column, read from the end of ix_tasks_status_rank
+    return db.query(Task.rank).filter(Task.status == status).order_by(Task.rank.desc()).limit(1).scalar()
 
 def create_task(db: Session, task: TaskCreate) -> Task:
     db_task = Task(
@@ -22,7 +159,8 @@ def create_task(db: Session, task: TaskCreate) -> Task:
         end_date=task.end_date,
         status=task.status,
         priority=task.priority,
-        assignee_id=task.assignee_id
+        assignee_id=task.assignee_id,
+        rank=rank_between(_last_rank(db, task.status), None)
     )
     db.add(db_task)
     db.commit()
@@ -35,6 +173,9 @@ def update_task(db: Session, task_id: int, task: TaskUpdate) -> Optional[Task]:
         return None
     
     update_data = task.dict(exclude_unset=True)
+    # A task moved to another column goes to the end of it
+    if "status" in update_data and update_data["status"] != db_task.status:
+        db_task.rank = rank_between(_last_rank(db, update_data["status"]), None)
     for key, value in update_data.items():
         setattr(db_task, key, value)
     
@@ -43,6 +184,152 @@ def update_task(db: Session, task_id: int, task: TaskUpdate) -> Optional[Task]:
     db.refresh(db_task)
     return db_task
 
+def _neighbour_rank(db: Session, task_id: int, status: str) -> Optional[str]:
+    row = db.query(Task.rank).filter(Task.id == task_id, Task.status == status).first()
+    if row is None:
+        raise ValueError(f"Task {task_id} is not in column {status}")
+    return row.rank
+
+def _move_bounds(db: Session, task_id: int, move: TaskMove) -> tuple:
+    siblings = db.query(Task.rank).filter(Task.status == move.status, Task.id != task_id)
+    if move.after_id is not None:
+        lower = _neighbour_rank(db, move.after_id, move.status)
+        if move.before_id is not None:
+            upper = _neighbour_rank(db, move.before_id, move.status)
+        elif lower is None:
+            upper = None
+        else:
+            upper = siblings.filter(Task.rank > lower).order_by(Task.rank).limit(1).scalar()
+    elif move.before_id is not None:
+        upper = _neighbour_rank(db, move.before_id, move.status)
+        lower = None if upper is None else (
+            siblings.filter(Task.rank < upper).order_by(Task.rank.desc()).limit(1).scalar()
+        )
+    else:
+        lower, upper = siblings.order_by(Task.rank.desc()).limit(1).scalar(), None
+    return lower, upper
+
+def _check_bounds_order(move: TaskMove, lower: Optional[str], upper: Optional[str]) -> None:
+    if lower is not None and upper is not None and lower > upper:
+        raise ValueError(f"Task {move.before_id} does not come after task {move.after_id}")
+
+def _bounds_usable(move: TaskMove, lower: Optional[str], upper: Optional[str]) -> bool:
+    # Unranked neighbours or colliding keys can only be fixed by re-ranking the column
+    if (move.after_id is not None and lower is None) or (move.before_id is not None and upper is None):
+        return False
+    return lower is None or upper is None or lower < upper
+
+def move_task(db: Session, task_id: int, move: TaskMove) -> Optional[Task]:
+    """Place a task in a column between two neighbours, writing only the moved row.
+
+    Raises ValueError if the column or a neighbour is not valid for the move.
+    """
+    db_task = get_task(db, task_id)
+    if db_task is None:
+        return None
+    if db.query(KanbanColumn.id).filter(KanbanColumn.id == move.status).first() is None:
+        raise ValueError(f"Column {move.status} not found")
+    if task_id in (move.after_id, move.before_id):
+        raise ValueError("A task cannot be its own neighbour")
+    if move.after_id is not None and move.after_id == move.before_id:
+        raise ValueError("after_id and before_id must be different tasks")
+
+    lower, upper = _move_bounds(db, task_id, move)
+    _check_bounds_order(move, lower, upper)
+    if not _bounds_usable(move, lower, upper):
+        rebalance_task_ranks(db, move.status, commit=False)
+        lower, upper = _move_bounds(db, task_id, move)
+        # Re-ranking orders neighbours with equal keys by id
+        _check_bounds_order(move, lower, upper)
+
+    db_task.status = move.status
+    db_task.rank = rank_between(lower, upper)
+    db_task.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(db_task)
+    return db_task
+
+def rebalance_task_ranks(db: Session, status: str, commit: bool = True) -> int:
+    """Rewrite a column's rank keys evenly spaced and short, keeping the current order"""
+    query = db.query(Task.id).filter(Task.status == status).order_by(Task.rank, Task.id)
+    task_ids = [task_id for (task_id,) in query]
+    ranks = ranks_between(None, None, len(task_ids))
+    if task_ids:
+        rows = [{"id": task_id, "rank": rank} for task_id, rank in zip(task_ids, ranks, strict=True)]
+        db.execute(update(Task), rows)
+        events.record(db, "task", "update", rows)
+    if commit:
+        db.commit()
+    return len(task_ids)
+
+def _existing_task_statuses(db: Session, task_ids: List[int]) -> dict:
+    existing = {}
+    for start in range(0, len(task_ids), BULK_LOOKUP_CHUNK):
+        chunk = task_ids[start:start + BULK_LOOKUP_CHUNK]
+        existing.update(db.query(Task.id, Task.status).filter(Task.id.in_(chunk)).all())
+    return existing
+
+def _assign_appended_ranks(db: Session, rows: List[dict]) -> None:
+    # Rows landing in the same column get consecutive keys after its current last task
+    by_status = {}
+    for row in rows:
+        by_status.setdefault(row["status"], []).append(row)
+    for status, status_rows in by_status.items():
+        ranks = ranks_between(_last_rank(db, status), None, len(status_rows))
+        for row, rank in zip(status_rows, ranks, strict=True):
+            row["rank"] = rank
+
+def bulk_create_tasks(db: Session, tasks: List[TaskCreate]) -> List[TaskBulkResult]:
+    column_ids = {column_id for (column_id,) in db.query(KanbanColumn.id)}
+
+    results = [TaskBulkResult(index=i) for i in range(len(tasks))]
+    rows, row_results = [], []
+    for result, task in zip(results, tasks, strict=True):
+        if task.status not in column_ids:
+            result.ok, result.error = False, "Column not found"
+            continue
+        rows.append(task.model_dump())
+        row_results.append(result)
+
+    _assign_appended_ranks(db, rows)
+    if rows:
+        # One executemany INSERT ... RETURNING for the whole batch, committed once
+        statement = insert(Task).returning(Task.id, sort_by_parameter_order=True)
+        task_ids = db.execute(statement, rows).scalars().all()
+        for result, task_id in zip(row_results, task_ids, strict=True):
+            result.id = task_id
+        created = [{"id": task_id, **row} for task_id, row in zip(task_ids, rows, strict=True)]
+        events.record(db, "task", "create", created)
+        db.commit()
+    return results
+
+def bulk_update_tasks(db: Session, tasks: List[TaskBulkUpdate]) -> List[TaskBulkResult]:
+    column_ids = {column_id for (column_id,) in db.query(KanbanColumn.id)}
+    existing = _existing_task_statuses(db, [task.id for task in tasks])
+    now = datetime.utcnow()
+
+    results = [TaskBulkResult(index=i, id=task.id) for i, task in enumerate(tasks)]
+    rows, moved_rows = [], []
+    for result, task in zip(results, tasks, strict=True):
+        update_data = task.model_dump(exclude_unset=True)
+        if task.id not in existing:
+            result.ok, result.error = False, "Task not found"
+        elif "status" in update_data and update_data["status"] not in column_ids:
+            result.ok, result.error = False, "Column not found"
+        else:
+            update_data["updated_at"] = now
+            rows.append(update_data)
+            if "status" in update_data and update_data["status"] != existing[task.id]:
+                moved_rows.append(update_data)
+
+    _assign_appended_ranks(db, moved_rows)
+    if rows:
+        # ORM bulk UPDATE by primary key: rows sharing the same keys go out as one executemany
+        db.execute(update(Task), rows)
+        events.record(db, "task", "update", rows)
+        db.commit()
+    return results
+
 def delete_task(db: Session, task_id: int) -> bool:
     db_task = get_task(db, task_id)
     if db_task is None:
@@ -53,23 +340,22 @@ def delete_task(db: Session, task_id: int) -> bool:
     return True
 
 def update_task_time_tracking(db: Session, task_id: int, time_tracking: TaskTimeTrackingUpdate) -> Optional[Task]:
-    db_task = get_task(db, task_id)
-    if db_task is None:
+    """Start or stop tracking (see ``app.crud.time_entry``); the client's start time is ignored.
+
+    Asking for the state the task is already in, or is put in by a concurrent
+    request, leaves it unchanged.
+    """
+    if db.get(Task, task_id) is None:
         return None
-    
-    # If stopping time tracking, calculate time spent
-    if db_task.is_tracking and not time_tracking.is_tracking:
-        if db_task.tracking_start_time:
-            time_diff = datetime.utcnow() - db_task.tracking_start_time
-            db_task.time_spent += time_diff.total_seconds()
-    
-    db_task.is_tracking = time_tracking.is_tracking
-    db_task.tracking_start_time = time_tracking.tracking_start_time
-    db_task.updated_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(db_task)
-    return db_task
+    try:
+        if time_tracking.is_tracking:
+            start_time_entry(db, task_id)
+        else:
+            stop_time_entry(db, task_id)
+    except ValueError:
+        pass
+    db.expire_all()
+    return get_task(db, task_id)
 
 def add_tag_to_task(db: Session, task_id: int, tag_id: int) -> Optional[Task]:
     db_task = get_task(db, task_id)
@@ -78,11 +364,12 @@ def add_tag_to_task(db: Session, task_id: int, tag_id: int) -> Optional[Task]:
     if db_task is None or db_tag is None:
         return None
     
-    db_task.tags.append(db_tag)
-    db_task.updated_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(db_task)
+    if db_tag not in db_task.tags:
+        db_task.tags.append(db_tag)
+        db_task.updated_at = datetime.utcnow()
+        
+        db.commit()
+        db.refresh(db_task)
     return db_task
 
 def remove_tag_from_task(db: Session, task_id: int, tag_id: int) -> Optional[Task]:
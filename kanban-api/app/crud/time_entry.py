@@ -0,0 +1,150 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import events
+from app.models.models import Task, TimeEntry, TimeRollup
+
+# Dimensions the rollup can be summed over, grouped on the primary key's columns so they come out in its order
+ROLLUP_KEYS = {"day": TimeRollup.day, "user": TimeRollup.user_id, "task": TimeRollup.task_id}
+
+def start_time_entry(db: Session, task_id: int, user_id: int | None = None) -> TimeEntry | None:
+    """Open a time entry on the task at the server's clock, for ``user_id`` or else the task's assignee.
+
+    Raises ValueError if the task already has a running entry; ix_time_entries_active
+    lets only one of two concurrent starts through.
+    """
+    db_task = db.get(Task, task_id)
+    if db_task is None:
+        return None
+    now = datetime.utcnow()
+    db_entry = TimeEntry(task_id=task_id, user_id=user_id or db_task.assignee_id, started_at=now)
+    db.add(db_entry)
+    db_task.is_tracking = True
+    db_task.tracking_start_time = now
+    db_task.updated_at = now
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise ValueError("Task is already being tracked") from exc
+    db.refresh(db_entry)
+    return db_entry
+
+def _rollup_rows(
+    task_id: int, user_id: int | None, started_at: datetime, stopped_at: datetime
+) -> list[dict]:
+    """The entry's seconds per day it covers"""
+    rows = []
+    start = started_at
+    while start < stopped_at:
+        end = min(stopped_at, datetime.combine(start.date() + timedelta(days=1), datetime.min.time()))
+        seconds = (end - start).total_seconds()
+        rows.append({"day": start.date(), "user_id": user_id or 0, "task_id": task_id, "seconds": seconds})
+        start = end
+    return rows
+
+def _add_to_rollup(db: Session, rows: list[dict]) -> None:
+    if not rows:
+        return
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = insert(TimeRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=[TimeRollup.day, TimeRollup.user_id, TimeRollup.task_id],
+        set_={"seconds": TimeRollup.seconds + statement.excluded.seconds},
+    )
+    db.execute(statement, rows)
+
+def stop_time_entry(db: Session, task_id: int) -> TimeEntry | None:
+    """Close the task's running entry at the server's clock and add its seconds to the task and the rollup.
+
+    Every write is a single UPDATE or upsert adding to what is stored, so
+    concurrent stops cannot lose time: the entry is closed, stopped_at and
+    seconds together, by an UPDATE only one stop can match, and the others
+    raise ValueError, as does stopping a task that is not tracked.
+    """
+    if db.get(Task, task_id) is None:
+        return None
+    running = db.execute(
+        select(TimeEntry.id, TimeEntry.user_id, TimeEntry.started_at)
+        .where(TimeEntry.task_id == task_id, TimeEntry.stopped_at.is_(None))
+    ).first()
+    if running is None:
+        db.rollback()
+        raise ValueError("Task is not being tracked")
+    now = datetime.utcnow()
+    seconds = max((now - running.started_at).total_seconds(), 0.0)
+    # Matches nothing if a concurrent stop closed the entry since it was read
+    claimed = db.execute(
+        update(TimeEntry)
+        .where(TimeEntry.id == running.id, TimeEntry.stopped_at.is_(None))
+        .values(stopped_at=now, seconds=seconds)
+        .returning(TimeEntry.id)
+    ).first()
+    if claimed is None:
+        db.rollback()
+        raise ValueError("Task is not being tracked")
+    time_spent = db.execute(
+        update(Task)
+        .where(Task.id == task_id)
+        .values(
+            time_spent=func.coalesce(Task.time_spent, 0) + seconds,
+            is_tracking=False, tracking_start_time=None, updated_at=now,
+        )
+        .returning(Task.time_spent)
+    ).scalar_one()
+    events.record(db, "task", "update", [
+        {
+            "id": task_id, "time_spent": time_spent, "is_tracking": False, "tracking_start_time": None,
+            "updated_at": now,
+        }
+    ])
+    _add_to_rollup(db, _rollup_rows(task_id, running.user_id, running.started_at, now))
+    db.commit()
+    return db.get(TimeEntry, running.id, populate_existing=True)
+
+def get_time_entries(
+    db: Session, task_id: int, skip: int = 0, limit: int = 100, after_id: int | None = None
+) -> list[TimeEntry] | None:
+    """The task's entries, oldest first, running one included"""
+    if db.get(Task, task_id) is None:
+        return None
+    query = db.query(TimeEntry).filter(TimeEntry.task_id == task_id).order_by(TimeEntry.id)
+    if after_id is not None:
+        return query.filter(TimeEntry.id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+def get_active_time_entries(db: Session, user_id: int | None = None) -> list[TimeEntry]:
+    """Running entries, read from ix_time_entries_active alone"""
+    query = db.query(TimeEntry).filter(TimeEntry.stopped_at.is_(None))
+    if user_id is not None:
+        query = query.filter(TimeEntry.user_id == user_id)
+    return query.order_by(TimeEntry.task_id).all()
+
+def get_time_rollup(
+    db: Session,
+    start: date | None = None,
+    end: date | None = None,
+    user_id: int | None = None,
+    task_id: int | None = None,
+    by: list[str] = ("day", "user"),
+) -> list[Row]:
+    """Seconds tracked from ``start`` to ``end`` (inclusive), summed per each of ``by`` (see ROLLUP_KEYS)"""
+    keys = [ROLLUP_KEYS[key] for key in by]
+    # User 0 stands for entries without a user
+    selected = [func.nullif(key, 0).label("user_id") if key is TimeRollup.user_id else key for key in keys]
+    statement = select(*selected, func.coalesce(func.sum(TimeRollup.seconds), 0).label("seconds"))
+    if start is not None:
+        statement = statement.where(TimeRollup.day >= start)
+    if end is not None:
+        statement = statement.where(TimeRollup.day <= end)
+    if user_id is not None:
+        statement = statement.where(TimeRollup.user_id == user_id)
+    if task_id is not None:
+        statement = statement.where(TimeRollup.task_id == task_id)
+    if keys:
+        statement = statement.group_by(*keys).order_by(*keys)
+    return db.execute(statement).all()
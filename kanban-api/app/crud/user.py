@@ -1,19 +1,28 @@
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.cache import cached, read_cache
 from app.models.models import User
 from app.schemas.user import UserCreate, UserUpdate
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+@cached("user")
+def get_users(
+    db: Session, skip: int = 0, limit: Optional[int] = 100, after_id: Optional[int] = None
+) -> List[Row]:
+    # Plain rows rather than User instances, so the result can be cached and shared across sessions
+    query = db.query(*User.__table__.columns).order_by(User.id)
+    query = query.filter(User.id > after_id) if after_id is not None else query.offset(skip)
+    return query.limit(limit).all()
 
 def create_user(db: Session, user: UserCreate) -> User:
     db_user = User(name=user.name, avatar=user.avatar)
     db.add(db_user)
     db.commit()
+    read_cache.invalidate("user")
     db.refresh(db_user)
     return db_user
 
@@ -27,6 +36,7 @@ def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
         setattr(db_user, key, value)
     
     db.commit()
+    read_cache.invalidate("user")
     db.refresh(db_user)
     return db_user
 
@@ -37,4 +47,5 @@ def delete_user(db: Session, user_id: int) -> bool:
     
     db.delete(db_user)
     db.commit()
+    read_cache.invalidate("user")
     return True
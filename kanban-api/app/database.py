@@ -1,14 +1,86 @@
-from sqlalchemy import create_engine
+import functools
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+from app import config
+
+# Database URL, SQLite by default
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+
+# Async drivers substituted for each backend when no async URL is configured
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        if config.SQLITE_WAL:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(config.SQLITE_CACHE_SIZE)}")
+    finally:
+        cursor.close()
+
+
+def _engine_kwargs(url: URL) -> dict:
+    kwargs = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+
+    if url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+
+    if _is_memory_sqlite(url):
+        kwargs["poolclass"] = StaticPool
+    else:
+        kwargs.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+    return kwargs
+
+
+def create_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL, sqlite_pragmas: bool = True) -> Engine:
+    """Create an engine configured from app.config for SQLite or PostgreSQL"""
+    url = make_url(database_url)
+    db_engine = create_engine(url, **_engine_kwargs(url))
+    if sqlite_pragmas and url.get_backend_name() == "sqlite":
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def async_database_url(database_url: str = SQLALCHEMY_DATABASE_URL) -> URL:
+    if config.ASYNC_DATABASE_URL:
+        return make_url(config.ASYNC_DATABASE_URL)
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def create_async_db_engine(database_url: str | None = None, sqlite_pragmas: bool = True) -> AsyncEngine:
+    """Create an async engine with the same pool settings and SQLite pragmas as create_db_engine"""
+    url = make_url(database_url) if database_url else async_database_url()
+    kwargs = _engine_kwargs(url)
+    # aiosqlite defaults to NullPool for files; pool connections like the sync engine does
+    if url.get_backend_name() == "sqlite" and not _is_memory_sqlite(url):
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+    db_engine = create_async_engine(url, **kwargs)
+    if sqlite_pragmas and url.get_backend_name() == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./kanban.db"
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,6 +96,24 @@ def get_db():
     finally:
         db.close()
 
+# The async engine is only created when first used, so its driver is optional in sync mode
+@functools.cache
+def get_async_engine() -> AsyncEngine:
+    return create_async_db_engine()
+
+@functools.cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+# Dependency of the routers, which run CRUD functions on either kind of session through app.crud.aio.run
+get_session = get_async_db if config.ASYNC_DB else get_db
+AnySession = Session | AsyncSession
+
 # Initialize database
 def init_db():
     from app.models import models
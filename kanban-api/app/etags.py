@@ -0,0 +1,72 @@
+"""Conditional GET for read endpoints.
+
+A weak ETag is derived from the newest change log entry for the tables a
+response is built from, so checking whether a client's copy is current costs
+one indexed lookup. A matching ``If-None-Match`` short-circuits the request
+with ``304 Not Modified`` before the endpoint queries or serializes anything.
+
+Usage::
+
+    @router.get("/", dependencies=[Depends(conditional_get(*TASK_TABLES))])
+"""
+
+from fastapi import Depends, Request, Response
+
+from app.crud import aio
+from app.crud.changes import get_entity_version
+from app.database import AnySession, get_session
+
+# Tables each kind of response is built from
+BOARD_TABLES = ("column", "task", "comment", "tag", "user")
+COLUMN_TABLES = ("column", "task")
+TASK_TABLES = ("task", "comment", "tag")
+COMMENT_TABLES = ("comment",)
+TAG_TABLES = ("tag",)
+USER_TABLES = ("user",)
+SEARCH_TABLES = ("task", "comment")
+ANALYTICS_TABLES = ("column", "task", "tag", "user")
+# Every time entry write also updates its task
+TIME_TABLES = ("task", "user")
+
+# Clients may keep responses but must revalidate them, which a matching ETag makes cheap
+CACHE_CONTROL = "no-cache"
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": CACHE_CONTROL})
+
+
+def make_etag(version: int) -> str:
+    return f'W/"{version}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _evaluate(request: Request, response: Response, version: int) -> None:
+    etag = make_etag(version)
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def conditional_get(*entities: str):
+    """Dependency answering 304 when nothing in ``entities`` changed since the client's ETag"""
+
+    async def check(request: Request, response: Response, db: AnySession = Depends(get_session)) -> None:
+        _evaluate(request, response, await aio.run(db, get_entity_version, entities))
+
+    return check
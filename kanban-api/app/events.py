@@ -0,0 +1,305 @@
+"""Change log and live change feed for boards.
+
+Every committed change to a task, column, comment, tag or user is written to the
+``changes`` table in the same transaction (its id is the version token for
+``GET /api/board/changes``) and, while the feed is running, published as one
+compact message of deltas per commit on the board's channel. Changes are
+captured from SQLAlchemy session events, so the CRUD functions only need to
+``record`` statements that bypass the unit of work (bulk INSERT/UPDATE).
+
+Publishing goes through a broker. ``LocalBroker`` delivers within the process;
+``RedisBroker`` (KANBAN_EVENT_BROKER=redis://...) relays through Redis pub/sub so
+every uvicorn worker sees every commit, and each worker fans out to its own
+subscribers. A subscriber that falls ``EVENT_QUEUE_SIZE`` messages behind is
+dropped with a resync marker instead of growing memory without bound.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session
+
+from app import config
+from app.models.models import Change, Comment, KanbanColumn, Tag, Task, User
+
+# The app has a single board; channels keep the feed ready for more
+BOARD_CHANNEL = "board"
+
+KINDS = {Task: "task", KanbanColumn: "column", Comment: "comment", Tag: "tag", User: "user"}
+
+# Session.info key for deltas waiting for the transaction to commit
+PENDING_KEY = "kanban_changes"
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _log(db: Session, entries: list[tuple[str, str, object]]) -> int:
+    """Append (entity, op, id) entries to the change log and return the newest version"""
+    now = datetime.utcnow()
+    rows = [
+        {"entity": entity, "entity_id": str(entity_id), "op": op, "changed_at": now}
+        for entity, op, entity_id in entries
+    ]
+    # executemany with RETURNING: SQLAlchemy batches the rows into multi-row INSERTs within the driver's
+    # parameter limit, and only the newest id is needed
+    statement = insert(Change.__table__).returning(Change.__table__.c.id)
+    return max(db.connection().execute(statement, rows).scalars())
+
+
+def _queue(db: Session, version: int, deltas: list[dict]) -> None:
+    pending = db.info.setdefault(PENDING_KEY, {"changes": []})
+    pending["version"] = version
+    pending["changes"].extend(deltas)
+
+
+def record(db: Session, kind: str, op: str, rows: list[dict]) -> None:
+    """Log rows written outside the unit of work; each row must include its id"""
+    if not rows:
+        return
+    version = _log(db, [(kind, op, row["id"]) for row in rows])
+    if change_feed.running:
+        _queue(db, version, [{"type": kind, "op": op, "data": row} for row in rows])
+
+
+def _row_data(obj, changed_only: bool) -> dict:
+    """Loaded column values (only changed ones for updates), read without triggering loads"""
+    state = inspect(obj)
+    data = {}
+    for attr in state.mapper.column_attrs:
+        key = attr.key
+        if key not in state.dict:
+            continue
+        if changed_only and key != "id" and not state.attrs[key].history.has_changes():
+            continue
+        data[key] = state.dict[key]
+    tags_loaded = isinstance(obj, Task) and "tags" in state.dict
+    if tags_loaded and (not changed_only or state.attrs.tags.history.has_changes()):
+        data["tags"] = [{"id": tag.id, "name": tag.name} for tag in obj.tags]
+    return data
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    changed = []
+    for op, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            kind = KINDS.get(type(obj))
+            if kind is None or (op == "update" and not session.is_modified(obj)):
+                continue
+            changed.append((kind, op, obj))
+    if not changed:
+        return
+
+    version = _log(session, [(kind, op, obj.id) for kind, op, obj in changed])
+    if change_feed.running:
+        deltas = [
+            {
+                "type": kind,
+                "op": op,
+                "data": {"id": obj.id} if op == "delete" else _row_data(obj, changed_only=op == "update"),
+            }
+            for kind, op, obj in changed
+        ]
+        _queue(session, version, deltas)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending and change_feed.running:
+        data = json.dumps(pending, default=_json_default)
+        # Rendered once here so fan-out costs nothing per viewer; the event id lets clients resume from
+        # /changes
+        change_feed.publish(BOARD_CHANNEL, f"id: {pending['version']}\nevent: change\ndata: {data}\n\n")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+class Subscription:
+    """One viewer's bounded queue; ``None`` in the queue means it fell behind"""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, message: str) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            # Drop the backlog so the resync marker is the next thing the viewer reads
+            self._replace_backlog(None)
+            self.overflowed = True
+            return False
+
+    def _replace_backlog(self, marker) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(marker)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Hub:
+    """Per-channel fan-out to this process's subscribers (runs on the event loop)"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.channels: dict[str, set[Subscription]] = {}
+
+    def add(self, channel: str) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        self.channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def remove(self, channel: str, subscription: Subscription) -> None:
+        subscribers = self.channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.channels[channel]
+
+    def deliver(self, channel: str, message: str) -> None:
+        for subscription in list(self.channels.get(channel, ())):
+            if not subscription.offer(message):
+                self.remove(channel, subscription)
+
+
+class LocalBroker:
+    """Delivers straight to this process's hub; enough for one worker and for tests"""
+
+    async def start(self, hub: Hub) -> None:
+        self.hub = hub
+
+    async def publish(self, channel: str, message: str) -> None:
+        self.hub.deliver(channel, message)
+
+    async def stop(self) -> None:
+        pass
+
+
+class RedisBroker:
+    """Relays through Redis pub/sub so subscribers on every worker see every commit"""
+
+    PREFIX = "kanban:events:"
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("KANBAN_EVENT_BROKER=redis://... needs the redis package installed") from exc
+        self.client = redis.from_url(url)
+
+    async def start(self, hub: Hub) -> None:
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.psubscribe(self.PREFIX + "*")
+        self.reader = asyncio.create_task(self._relay(hub))
+
+    async def _relay(self, hub: Hub) -> None:
+        async for message in self.pubsub.listen():
+            if message["type"] == "pmessage":
+                channel = message["channel"].decode()[len(self.PREFIX):]
+                hub.deliver(channel, message["data"].decode())
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.client.publish(self.PREFIX + channel, message)
+
+    async def stop(self) -> None:
+        self.reader.cancel()
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+def create_broker(url: str):
+    if url == "local":
+        return LocalBroker()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported KANBAN_EVENT_BROKER: {url}")
+
+
+class ChangeFeed:
+    """Process-wide feed: thread-safe publishing into a broker, async subscribing from it"""
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.broker = None
+        self.hub: Hub | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None
+
+    async def start(
+        self, broker_url: str = config.EVENT_BROKER, queue_size: int = config.EVENT_QUEUE_SIZE
+    ) -> None:
+        self.hub = Hub(queue_size)
+        self.broker = create_broker(broker_url)
+        await self.broker.start(self.hub)
+        self.loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        if self.broker is not None:
+            self.loop = None
+            await self.broker.stop()
+            self.broker = None
+
+    def publish(self, channel: str, message: str) -> None:
+        """Hand a message to the broker; callable from the event loop or a threadpool worker"""
+        loop = self.loop
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.broker.publish(channel, message), loop)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        if self.hub is None:
+            raise RuntimeError("Change feed is not running")
+        subscription = self.hub.add(channel)
+        try:
+            yield subscription
+        finally:
+            self.hub.remove(channel, subscription)
+
+
+change_feed = ChangeFeed()
+
+
+async def sse_stream(
+    channel: str,
+    heartbeat: float = config.EVENT_HEARTBEAT_SECONDS,
+    max_age: float = config.EVENT_STREAM_MAX_SECONDS,
+) -> AsyncIterator[str]:
+    """Server-sent events for ``channel``: ``change`` per commit, ``resync`` if the viewer fell behind.
+
+    The stream ends after ``max_age`` seconds and the browser reconnects after
+    the ``retry`` delay, catching up through ``/api/board/changes``. Graceful
+    shutdown waits for open streams, so no stream keeps a worker alive for longer.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    async with change_feed.subscribe(channel) as subscription:
+        yield "retry: 3000\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                message = await asyncio.wait_for(subscription.get(), min(heartbeat, remaining))
+            except TimeoutError:
+                if loop.time() < deadline:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            yield message
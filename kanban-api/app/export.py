@@ -0,0 +1,105 @@
+"""Streaming NDJSON export of tasks and comments.
+
+Rows are read through a server-side cursor (``yield_per``) in batches of
+``EXPORT_BATCH_SIZE`` and written out as one JSON object per line, so memory
+use depends on the batch size, not on the size of the board. Each task line
+carries the task's tags; comments are exported separately. With ``gzip`` the
+stream is compressed on the fly and sent with ``Content-Encoding: gzip``.
+
+The generators open their own session on the request's engine because the
+response body is produced after the endpoint has returned.
+"""
+
+import zlib
+from collections.abc import AsyncIterator, Iterator
+
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.task import get_task_tag_rows
+from app.models.models import Comment, Task
+from app.serialization import COMMENT, TAG, TASK, task_dicts
+
+# Rows fetched from the cursor (and encoded into one chunk of the response) at a time
+EXPORT_BATCH_SIZE = 1000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def task_statement(status: str | None = None):
+    statement = select(*TASK.columns).order_by(Task.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    if status:
+        statement = statement.where(Task.status == status)
+    return statement
+
+
+def comment_statement(task_id: int | None = None):
+    statement = select(*COMMENT.columns).order_by(Comment.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    if task_id is not None:
+        statement = statement.where(Comment.task_id == task_id)
+    return statement
+
+
+class Encoder:
+    """Turns batches of dicts into NDJSON bytes, gzip-compressed if asked"""
+
+    def __init__(self, compress: bool):
+        # wbits=31 writes a gzip container rather than a raw zlib stream
+        self.compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(self, items: list[dict]) -> bytes:
+        data = b"".join(to_json(item) + b"\n" for item in items)
+        return self.compressor.compress(data) if self.compressor else data
+
+    def finish(self) -> bytes:
+        return self.compressor.flush() if self.compressor else b""
+
+
+def task_chunks(bind, status: str | None = None, compress: bool = False) -> Iterator[bytes]:
+    encoder = Encoder(compress)
+    with Session(bind) as db:
+        for rows in db.execute(task_statement(status)).partitions():
+            tag_rows = get_task_tag_rows(db, [row.id for row in rows], TAG.columns)
+            yield encoder.encode(task_dicts(rows, None, tag_rows))
+    yield encoder.finish()
+
+
+def comment_chunks(bind, task_id: int | None = None, compress: bool = False) -> Iterator[bytes]:
+    encoder = Encoder(compress)
+    with Session(bind) as db:
+        for rows in db.execute(comment_statement(task_id)).partitions():
+            yield encoder.encode(COMMENT.dicts(rows))
+    yield encoder.finish()
+
+
+async def aio_task_chunks(bind, status: str | None = None, compress: bool = False) -> AsyncIterator[bytes]:
+    """``task_chunks`` on an async engine"""
+    encoder = Encoder(compress)
+    async with AsyncSession(bind) as db:
+        result = await db.stream(task_statement(status))
+        async for rows in result.partitions():
+            tag_rows = await db.run_sync(get_task_tag_rows, [row.id for row in rows], TAG.columns)
+            yield encoder.encode(task_dicts(rows, None, tag_rows))
+    yield encoder.finish()
+
+
+async def aio_comment_chunks(
+    bind, task_id: int | None = None, compress: bool = False
+) -> AsyncIterator[bytes]:
+    """``comment_chunks`` on an async engine"""
+    encoder = Encoder(compress)
+    async with AsyncSession(bind) as db:
+        result = await db.stream(comment_statement(task_id))
+        async for rows in result.partitions():
+            yield encoder.encode(COMMENT.dicts(rows))
+    yield encoder.finish()
+
+
+def ndjson_response(chunks, filename: str, compress: bool) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE, headers=headers)
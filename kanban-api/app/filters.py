@@ -0,0 +1,79 @@
+"""Query parameters for filtering and sorting task lists.
+
+``task_filter`` and ``task_sort`` are dependencies shared by the sync and async
+task routers. Repeat a list parameter for several values
+(``?priority=high&priority=medium``); datetimes with an offset are compared as
+UTC, like the naive UTC values stored. ``sort`` takes comma-separated keys from
+``crud.task.SORT_COLUMNS``, each optionally prefixed with ``-`` for descending order.
+"""
+
+from datetime import UTC, datetime
+from typing import Literal
+
+from fastapi import HTTPException, Query
+
+from app.crud.task import SORT_COLUMNS
+from app.schemas.task import TaskFilter
+
+DEFAULT_SORT = [("id", False)]
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def task_filter(
+    assignee_id: list[int] = Query([]),
+    priority: list[str] = Query([]),
+    tag_id: list[int] = Query([]),
+    tag_match: Literal["any", "all"] = "any",
+    start_date_from: datetime | None = None,
+    start_date_to: datetime | None = None,
+    end_date_from: datetime | None = None,
+    end_date_to: datetime | None = None,
+    is_tracking: bool | None = None,
+    updated_since: datetime | None = None,
+) -> TaskFilter:
+    """Dependency collecting the task filter query parameters"""
+    return TaskFilter(
+        assignee_id=assignee_id,
+        priority=priority,
+        tag_id=tag_id,
+        tag_match=tag_match,
+        start_date_from=_naive_utc(start_date_from),
+        start_date_to=_naive_utc(start_date_to),
+        end_date_from=_naive_utc(end_date_from),
+        end_date_to=_naive_utc(end_date_to),
+        is_tracking=is_tracking,
+        updated_since=_naive_utc(updated_since),
+    )
+
+
+def parse_sort(sort: str) -> list[tuple[str, bool]]:
+    """(key, descending) pairs from e.g. ``"-priority,end_date"``; raises ValueError for unknown keys"""
+    order = []
+    for part in sort.split(","):
+        part = part.strip()
+        key = part.removeprefix("-")
+        if key not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {key or part!r}")
+        order.append((key, part.startswith("-")))
+    return order
+
+
+def task_sort(sort: str = "id") -> list[tuple[str, bool]]:
+    """Dependency decoding the ``sort`` query parameter"""
+    try:
+        return parse_sort(sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+
+def check_cursor(order: list[tuple[str, bool]], after_id: int | None) -> bool:
+    """Whether pages in ``order`` can be continued with a cursor; a cursor with any other order is a 400"""
+    keyset = order == DEFAULT_SORT
+    if after_id is not None and not keyset:
+        raise HTTPException(status_code=400, detail="Cursor pagination needs the default sort; use skip")
+    return keyset
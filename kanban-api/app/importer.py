@@ -0,0 +1,579 @@
+"""Bulk import of tasks and comments from CSV or NDJSON.
+
+Input is parsed as a stream, one record at a time, and written in chunks of
+``IMPORT_CHUNK_SIZE`` records, one transaction per chunk with executemany
+INSERTs. Users, tags and columns are resolved by name against in-memory maps
+loaded once per import; unknown users and tags are created, the way
+``crud.tag.create_tag`` returns an existing tag or makes a new one. A record
+that cannot be imported, including one that is not valid UTF-8, CSV or JSON, is
+reported with its line number and skipped; a chunk the database rejects is
+rolled back and reported as a whole.
+
+Task records::
+
+    title, status (column id or title), description, priority, start_date,
+    end_date, assignee (user name) or assignee_id, tags, time_spent,
+    created_at, updated_at, and in NDJSON optionally comments:
+    [{"text", "author" or "author_id", "timestamp"}]
+
+``tags`` is a list of names (or ``{"name": ...}`` objects, as in the NDJSON
+export) or, in CSV, names separated by ``;``. Comment records have ``task_id``,
+``text``, ``author`` or ``author_id`` and an optional ``timestamp``.
+
+``POST /api/import/{tasks,comments}`` spools the request body to a temporary
+file and streams the progress events back as NDJSON lines while it imports;
+``python -m app.cli import`` reads a file the same way.
+"""
+
+import codecs
+import csv
+import itertools
+import json
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import ExitStack
+from datetime import UTC, datetime
+from operator import itemgetter
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO
+
+from fastapi import Request
+from pydantic_core import to_json
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import analytics, events, search
+from app.cache import read_cache
+from app.crud.task import BULK_LOOKUP_CHUNK, _last_rank
+from app.models.models import Comment, KanbanColumn, Tag, Task, User, task_tag
+from app.ranking import ranks_between
+
+IMPORT_CHUNK_SIZE = 5000
+
+# Request bodies larger than this are spooled to disk rather than kept in memory
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# Errors kept for the final report; the count is always exact
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("csv", "ndjson")
+
+# Separator for several tag names in one CSV field
+CSV_TAG_SEPARATOR = ";"
+
+# The csv module rejects fields over 128 KiB by default, which long descriptions can exceed
+CSV_FIELD_SIZE_LIMIT = 16 * 1024 * 1024
+csv.field_size_limit(max(csv.field_size_limit(), CSV_FIELD_SIZE_LIMIT))
+
+TASK_COLUMNS = (
+    "title", "description", "start_date", "end_date", "status", "priority", "assignee_id", "rank",
+    "time_spent", "is_tracking", "created_at", "updated_at",
+)
+
+COMMENT_COLUMNS = ("task_id", "text", "author_id", "timestamp")
+
+
+class RecordError(ValueError):
+    """A record that cannot be imported; the message is reported with its line number"""
+
+
+def _decoded_lines(stream: BinaryIO, invalid: set[int]) -> Iterator[str]:
+    """The stream's lines as text, adding the numbers of lines that are not valid UTF-8 to ``invalid``"""
+    for number, raw in enumerate(stream, start=1):
+        if number == 1:
+            raw = raw.removeprefix(codecs.BOM_UTF8)
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            invalid.add(number)
+            line = raw.decode("utf-8", errors="replace")
+        yield line
+
+
+def _csv_records(stream: BinaryIO) -> Iterator[tuple[int, dict | RecordError]]:
+    invalid: set[int] = set()
+    reader = csv.DictReader(_decoded_lines(stream, invalid))
+    try:
+        if reader.fieldnames is None:
+            return
+    except csv.Error as e:
+        yield 1, RecordError(f"Invalid CSV header: {e}")
+        return
+    if invalid:
+        yield 1, RecordError("Invalid UTF-8 in the CSV header")
+        return
+    line = reader.line_num
+    while True:
+        # A malformed or undecodable row is reported and the reader goes on with the next line
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield line + 1, RecordError(f"Invalid CSV: {e}")
+            # The reader does not count the line it failed on
+            line = max(reader.line_num, line + 1)
+            continue
+        if invalid and any(number in invalid for number in range(line + 1, reader.line_num + 1)):
+            record = RecordError("Invalid UTF-8")
+        yield line + 1, record
+        line = reader.line_num
+
+
+def parse_records(stream: BinaryIO, fmt: str) -> Iterator[tuple[int, dict | RecordError]]:
+    """Yield (line number, record or RecordError) from a CSV (with a header row) or NDJSON byte stream"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    if fmt == "csv":
+        yield from _csv_records(stream)
+        return
+
+    invalid: set[int] = set()
+    for line, raw in enumerate(_decoded_lines(stream, invalid), start=1):
+        if not raw.strip():
+            continue
+        if line in invalid:
+            yield line, RecordError("Invalid UTF-8")
+            continue
+        try:
+            record = json.loads(raw)
+        except ValueError as e:
+            yield line, RecordError(f"Invalid JSON: {e}")
+            continue
+        yield line, record if isinstance(record, dict) else RecordError("Expected a JSON object")
+
+
+def chunked(records: Iterable, size: int = IMPORT_CHUNK_SIZE) -> Iterator[list]:
+    iterator = iter(records)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _text(record: dict, key: str) -> str | None:
+    value = record.get(key)
+    if value is None or value == "":
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _required_text(record: dict, key: str) -> str:
+    value = _text(record, key)
+    if value is None:
+        raise RecordError(f"Missing {key}")
+    return value
+
+
+def _datetime(record: dict, key: str) -> datetime | None:
+    value = _text(record, key)
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise RecordError(f"Invalid {key}: {value!r}") from None
+    # Stored as naive UTC, like datetime.utcnow() elsewhere
+    return parsed.astimezone(UTC).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _number(record: dict, key: str, kind: type):
+    value = record.get(key)
+    if value is None or value == "":
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise RecordError(f"Invalid {key}: {value!r}") from None
+
+
+def _tag_names(value) -> list[str]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        names = value.split(CSV_TAG_SEPARATOR)
+    elif isinstance(value, list):
+        names = [item.get("name") if isinstance(item, dict) else item for item in value]
+    else:
+        raise RecordError("Invalid tags")
+    names = [name.strip() for name in names if isinstance(name, str) and name.strip()]
+    # Keep the first occurrence of each name
+    return list(dict.fromkeys(names))
+
+
+class ImportReport:
+    """Running totals for one import"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, message: str) -> dict:
+        self.failed += 1
+        error = {"line": line, "error": message}
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+        return error
+
+    def summary(self) -> dict:
+        return {"kind": self.kind, "imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+
+class Importer(ABC):
+    """Imports chunks of parsed records; subclasses prepare and insert rows for one kind"""
+
+    kind = ""
+    # Read cache tables to invalidate after a chunk that may have created users or tags
+    cached_tables: tuple[str, ...] = ()
+
+    def __init__(self):
+        self.report = ImportReport(self.kind)
+        self.users: dict[str, int] | None = None
+        self.tags: dict[str, int] | None = None
+
+    def load_maps(self, db: Session) -> None:
+        self.users = {name: id_ for id_, name in db.execute(select(User.id, User.name)) if name is not None}
+        self.tags = {name: id_ for id_, name in db.execute(select(Tag.id, Tag.name)) if name is not None}
+        self.user_ids = set(db.execute(select(User.id)).scalars())
+
+    def import_chunk(self, db: Session, records: list[tuple[int, dict | RecordError]]) -> dict:
+        """Import one chunk in its own transaction; returns a progress event with the chunk's errors"""
+        if self.users is None:
+            self.load_maps(db)
+
+        errors, prepared = [], []
+        for line, record in records:
+            try:
+                if isinstance(record, RecordError):
+                    raise record
+                prepared.append((line, self.prepare(record)))
+            except RecordError as e:
+                errors.append(self.report.error(line, str(e)))
+
+        prepared = self.check(db, prepared, errors)
+        if prepared:
+            try:
+                self.insert(db, [row for _, row in prepared])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                # Names created in the rolled back transaction are gone again
+                self.users = None
+                errors.extend(self.report.error(line, f"Chunk rejected: {e.__class__.__name__}: {e}")
+                              for line, _ in prepared)
+            else:
+                self.report.imported += len(prepared)
+                for table in self.cached_tables:
+                    read_cache.invalidate(table)
+
+        return {
+            "type": "progress", "imported": self.report.imported, "failed": self.report.failed,
+            "errors": errors,
+        }
+
+    @abstractmethod
+    def prepare(self, record: dict) -> dict:
+        """The row for a record, with users as ids or names to create; raises RecordError"""
+
+    def check(
+        self, db: Session, prepared: list[tuple[int, dict]], errors: list[dict]
+    ) -> list[tuple[int, dict]]:
+        """Drop rows that refer to missing rows, adding their errors; runs before ``insert``"""
+        return prepared
+
+    @abstractmethod
+    def insert(self, db: Session, rows: list[dict]) -> None:
+        """Insert the rows that passed ``prepare`` and ``check``, creating the users and tags they name"""
+
+    def _user_id(self, record: dict, name_key: str, id_key: str) -> int | str | None:
+        """An id, or a name to resolve once new users are created"""
+        user_id = _number(record, id_key, int)
+        if user_id is not None:
+            if user_id not in self.user_ids:
+                raise RecordError(f"User not found: {user_id}")
+            return user_id
+        return _text(record, name_key)
+
+    def _create_names(self, db: Session, model, names: Iterable, known: dict[str, int]) -> None:
+        """Create the ``names`` (ids are skipped) not in ``known`` and add them to it"""
+        names = sorted({name for name in names if isinstance(name, str)} - known.keys())
+        if not names:
+            return
+        rows = [{"name": name} for name in names]
+        created = db.execute(insert(model.__table__).returning(model.id, model.name), rows).all()
+        known.update((name, id_) for id_, name in created)
+        if model is User:
+            self.user_ids.update(id_ for id_, _ in created)
+        events.record(db, events.KINDS[model], "create", [{"id": id_, "name": name} for id_, name in created])
+
+    def _insert_ids(self, db: Session, table, keys: tuple[str, ...], rows: list[tuple]) -> list[int]:
+        """executemany INSERT of value tuples for ``keys``, returning the new ids in the order of ``rows``"""
+        if db.get_bind().dialect.name != "sqlite":
+            statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            return db.execute(statement, [dict(zip(keys, row, strict=True)) for row in rows]).scalars().all()
+
+        # sort_by_parameter_order makes SQLite insert row by row. Instead the rows go to the driver's
+        # executemany, and since the transaction holds the write lock, SQLite gives them consecutive ids
+        _executemany(db, table, keys, rows)
+        last = db.execute(select(func.last_insert_rowid())).scalar()
+        first = last - len(rows) + 1
+        if db.execute(select(func.count()).where(table.c.id.between(first, last))).scalar() != len(rows):
+            raise RuntimeError(f"{table.name} ids were not assigned consecutively")
+        return list(range(first, last + 1))
+
+
+class TaskImporter(Importer):
+    kind = "task"
+    cached_tables = ("user", "tag")
+
+    def load_maps(self, db: Session) -> None:
+        super().load_maps(db)
+        self.columns = {}
+        for id_, title in db.execute(select(KanbanColumn.id, KanbanColumn.title)):
+            if title:
+                self.columns.setdefault(title.lower(), id_)
+            self.columns[id_] = id_
+
+    def _comment(self, comment) -> dict:
+        if not isinstance(comment, dict):
+            raise RecordError("Invalid comments")
+        return {
+            "text": _required_text(comment, "text"),
+            "author_id": self._user_id(comment, "author", "author_id"),
+            "timestamp": _datetime(comment, "timestamp"),
+        }
+
+    def prepare(self, record: dict) -> dict:
+        status = _required_text(record, "status")
+        column_id = self.columns.get(status, self.columns.get(status.lower()))
+        if column_id is None:
+            raise RecordError(f"Column not found: {status}")
+
+        tags = _tag_names(record.get("tags"))
+        comments = record.get("comments") or []
+        if not isinstance(comments, list):
+            raise RecordError("Invalid comments")
+
+        created_at = _datetime(record, "created_at")
+        return {
+            "title": _required_text(record, "title"),
+            "description": _text(record, "description"),
+            "start_date": _datetime(record, "start_date"),
+            "end_date": _datetime(record, "end_date"),
+            "status": column_id,
+            "priority": _text(record, "priority") or "medium",
+            "assignee_id": self._user_id(record, "assignee", "assignee_id"),
+            "rank": None,
+            "time_spent": _number(record, "time_spent", float) or 0.0,
+            "is_tracking": False,
+            "created_at": created_at,
+            "updated_at": _datetime(record, "updated_at") or created_at,
+            "_tags": tags,
+            "_comments": [self._comment(comment) for comment in comments],
+        }
+
+    def insert(self, db: Session, rows: list[dict]) -> None:
+        # Only names of rows being inserted, so a rejected record creates no user or tag
+        user_names = [row["assignee_id"] for row in rows]
+        user_names += [comment["author_id"] for row in rows for comment in row["_comments"]]
+        self._create_names(db, User, user_names, self.users)
+        self._create_names(db, Tag, [name for row in rows for name in row["_tags"]], self.tags)
+
+        now = datetime.utcnow()
+        by_status: dict[str, list[dict]] = {}
+        for row in rows:
+            if isinstance(row["assignee_id"], str):
+                row["assignee_id"] = self.users[row["assignee_id"]]
+            row["created_at"] = row["created_at"] or now
+            row["updated_at"] = row["updated_at"] or now
+            by_status.setdefault(row["status"], []).append(row)
+        # Imported tasks go to the end of their column, in file order
+        for status, status_rows in by_status.items():
+            ranks = ranks_between(_last_rank(db, status), None, len(status_rows))
+            for row, rank in zip(status_rows, ranks, strict=True):
+                row["rank"] = rank
+
+        connection = db.connection()
+        with (
+            search.insert_triggers_suspended(connection) as index_rows,
+            analytics.insert_triggers_suspended(connection) as add_totals,
+        ):
+            task_values = list(map(itemgetter(*TASK_COLUMNS), rows))
+            task_ids = self._insert_ids(db, Task.__table__, TASK_COLUMNS, task_values)
+
+            links, comments, indexed = [], [], []
+            for task_id, row in zip(task_ids, rows, strict=True):
+                links.extend((task_id, self.tags[name]) for name in row["_tags"])
+                for comment in row["_comments"]:
+                    author_id = comment["author_id"]
+                    if isinstance(author_id, str):
+                        author_id = self.users[author_id]
+                    comments.append((task_id, comment["text"], author_id, comment["timestamp"] or now))
+                if index_rows:
+                    comment_text = "\n".join(comment["text"] for comment in row["_comments"]) or None
+                    indexed.append((task_id, row["title"], row["description"], comment_text))
+
+            if links:
+                _executemany(db, task_tag, ("task_id", "tag_id"), links)
+            if comments:
+                comment_ids = self._insert_ids(db, Comment.__table__, COMMENT_COLUMNS, comments)
+            search.index_tasks(connection, indexed)
+            if add_totals:
+                analytics.add_totals(
+                    connection,
+                    [(row["status"], row["assignee_id"], row["end_date"], row["time_spent"]) for row in rows],
+                    [(self.tags[name], row["time_spent"]) for row in rows for name in row["_tags"]],
+                )
+
+        logged = _logged(task_ids, TASK_COLUMNS, task_values)
+        if events.change_feed.running:
+            for delta, row in zip(logged, rows, strict=True):
+                delta["tags"] = [{"id": self.tags[name], "name": name} for name in row["_tags"]]
+        events.record(db, "task", "create", logged)
+        if comments:
+            events.record(db, "comment", "create", _logged(comment_ids, COMMENT_COLUMNS, comments))
+
+
+class CommentImporter(Importer):
+    kind = "comment"
+    cached_tables = ("user",)
+
+    def prepare(self, record: dict) -> dict:
+        task_id = _number(record, "task_id", int)
+        if task_id is None:
+            raise RecordError("Missing task_id")
+        author_id = self._user_id(record, "author", "author_id")
+        if author_id is None:
+            raise RecordError("Missing author")
+        return {
+            "task_id": task_id,
+            "text": _required_text(record, "text"),
+            "author_id": author_id,
+            "timestamp": _datetime(record, "timestamp"),
+        }
+
+    def check(
+        self, db: Session, prepared: list[tuple[int, dict]], errors: list[dict]
+    ) -> list[tuple[int, dict]]:
+        task_ids = sorted({row["task_id"] for _, row in prepared})
+        existing = set()
+        for start in range(0, len(task_ids), BULK_LOOKUP_CHUNK):
+            chunk = task_ids[start:start + BULK_LOOKUP_CHUNK]
+            existing.update(db.execute(select(Task.id).where(Task.id.in_(chunk))).scalars())
+
+        kept = []
+        for line, row in prepared:
+            if row["task_id"] in existing:
+                kept.append((line, row))
+            else:
+                errors.append(self.report.error(line, f"Task not found: {row['task_id']}"))
+        return kept
+
+    def insert(self, db: Session, rows: list[dict]) -> None:
+        self._create_names(db, User, [row["author_id"] for row in rows], self.users)
+
+        now = datetime.utcnow()
+        for row in rows:
+            if isinstance(row["author_id"], str):
+                row["author_id"] = self.users[row["author_id"]]
+            row["timestamp"] = row["timestamp"] or now
+        comment_values = list(map(itemgetter(*COMMENT_COLUMNS), rows))
+        connection = db.connection()
+        with search.insert_triggers_suspended(connection) as reindex:
+            comment_ids = self._insert_ids(db, Comment.__table__, COMMENT_COLUMNS, comment_values)
+            if reindex:
+                search.reindex_comments(connection, sorted({row["task_id"] for row in rows}))
+        events.record(db, "comment", "create", _logged(comment_ids, COMMENT_COLUMNS, comment_values))
+
+
+def _logged(ids: list[int], keys: tuple[str, ...], rows: list[tuple]) -> list[dict]:
+    """Rows for ``events.record``; only a running change feed needs more than the ids"""
+    if not events.change_feed.running:
+        return [{"id": id_} for id_ in ids]
+    return [{"id": id_, **dict(zip(keys, row, strict=True))} for id_, row in zip(ids, rows, strict=True)]
+
+
+def _executemany(db: Session, table, keys: tuple[str, ...], rows: list[tuple]) -> None:
+    """INSERT ``rows`` of values for ``keys`` with one executemany.
+
+    On SQLite the statement goes straight to the DBAPI cursor, compiled once,
+    with only the columns whose type has a bind processor (dates) converted;
+    that costs far less per row than SQLAlchemy's generic parameter handling.
+    """
+    dialect = db.get_bind().dialect
+    if dialect.name != "sqlite":
+        db.execute(insert(table), [dict(zip(keys, row, strict=True)) for row in rows])
+        return
+    compiled = insert(table).compile(dialect=dialect, column_keys=list(keys))
+    # The qmark parameters follow the table's column order, which need not be the order of ``keys``
+    order = [keys.index(name) for name in compiled.positiontup]
+    if order != list(range(len(keys))):
+        rows = list(map(itemgetter(*order), rows))
+    processors = [
+        (i, processor) for i, name in enumerate(compiled.positiontup)
+        if (processor := table.c[name].type.dialect_impl(dialect).bind_processor(dialect)) is not None
+    ]
+    if processors:
+        params = []
+        for row in rows:
+            values = list(row)
+            for i, processor in processors:
+                values[i] = processor(values[i])
+            params.append(tuple(values))
+        rows = params
+    db.connection().exec_driver_sql(compiled.string, rows)
+
+
+IMPORTERS = {"tasks": TaskImporter, "comments": CommentImporter}
+
+
+def import_stream(db: Session, kind: str, stream: BinaryIO, fmt: str,
+                  chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[dict]:
+    """Import ``stream`` chunk by chunk, yielding a progress event per chunk and a final summary"""
+    importer = IMPORTERS[kind]()
+    for chunk in chunked(parse_records(stream, fmt), chunk_size):
+        yield importer.import_chunk(db, chunk)
+    yield {"type": "done", **importer.report.summary()}
+
+
+def request_format(fmt: str | None, content_type: str | None) -> str:
+    """The ``format`` query parameter, or else the one the Content-Type names (CSV by default)"""
+    if fmt:
+        return fmt
+    return "ndjson" if content_type and "json" in content_type else "csv"
+
+
+async def spool_body(request: Request) -> SpooledTemporaryFile:
+    """Copy the request body to a temporary file (in memory while small) so it can be parsed lazily.
+
+    The caller owns the returned file; it is closed here if the body cannot be
+    read, e.g. when the client disconnects.
+    """
+    with ExitStack() as on_error:
+        spooled = on_error.enter_context(SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY))
+        async for data in request.stream():
+            spooled.write(data)
+        spooled.seek(0)
+        on_error.pop_all()
+    return spooled
+
+
+def event_chunks(
+    bind, kind: str, stream: BinaryIO, fmt: str, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """``import_stream`` events as NDJSON lines, on a session of the generator's own"""
+    with stream, Session(bind) as db:
+        for event in import_stream(db, kind, stream, fmt, chunk_size):
+            yield to_json(event) + b"\n"
+
+
+async def aio_event_chunks(bind, kind: str, stream: BinaryIO, fmt: str,
+                           chunk_size: int = IMPORT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """``event_chunks`` on an async engine; each chunk is imported in ``run_sync``"""
+    importer = IMPORTERS[kind]()
+    with stream:
+        async with AsyncSession(bind) as db:
+            for chunk in chunked(parse_records(stream, fmt), chunk_size):
+                yield to_json(await db.run_sync(importer.import_chunk, chunk)) + b"\n"
+    yield to_json({"type": "done", **importer.report.summary()}) + b"\n"
@@ -1,23 +1,35 @@
+import itertools
+import random
 from datetime import datetime, timedelta
 
+from sqlalchemy.orm import Session
+
+from app.crud.board import rebalance_board_ranks
+from app.crud.column import rebalance_column_ranks
 from app.database import SessionLocal
+from app.importer import IMPORT_CHUNK_SIZE, TaskImporter, chunked
 from app.models.models import KanbanColumn, Tag, Task, User
 
+DEFAULT_COLUMNS = (("todo", "To Do"), ("in-progress", "In Progress"), ("review", "Review"), ("done", "Done"))
+
+# Words of synthetic titles, descriptions and comments, drawn with Zipf-like frequencies so that searches
+# range from matching most tasks ("word0") to a handful
+SYNTHETIC_VOCABULARY = [f"word{i}" for i in range(5000)]
+SYNTHETIC_DAYS = 730
+
 
 def init_db():
     db = SessionLocal()
     try:
-        # Check if we already have data
-        if db.query(KanbanColumn).count() > 0:
+        # Check if we already have data (first row only, no full COUNT)
+        if db.query(KanbanColumn.id).first() is not None:
             print("Database already initialized, skipping...")
             return
 
         # Create default columns
         columns = [
-            KanbanColumn(id="todo", title="To Do", position=0),
-            KanbanColumn(id="in-progress", title="In Progress", position=1),
-            KanbanColumn(id="review", title="Review", position=2),
-            KanbanColumn(id="done", title="Done", position=3),
+            KanbanColumn(id=column_id, title=title, position=i)
+            for i, (column_id, title) in enumerate(DEFAULT_COLUMNS)
         ]
         db.add_all(columns)
         db.commit()
@@ -105,10 +117,98 @@ def init_db():
         tasks[4].tags.append(tags[3])  # documentation
         db.commit()
 
+        # Rank columns by position and tasks in creation order
+        rebalance_board_ranks(db)
+
         print("Database initialized with default data")
     finally:
         db.close()
 
 
+def synthetic_tasks(
+    tasks: int, comments_per_task: int, tags_per_task: int, users: int, tags: int, seed: int, start: datetime
+):
+    """Task records as the importer reads them, with nested comments; ``seed`` makes them repeatable.
+
+    Assignees and authors are user ids 1..users, tags "tag 1".."tag N" (the
+    first few far more common), dates spread over two years from ``start``.
+    """
+    rng = random.Random(seed)
+    weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(SYNTHETIC_VOCABULARY))))
+    tag_weights = list(itertools.accumulate(1 / i for i in range(1, tags + 1)))
+    tag_names = [f"tag {i}" for i in range(1, tags + 1)]
+
+    def words(count: int) -> str:
+        return " ".join(rng.choices(SYNTHETIC_VOCABULARY, cum_weights=weights, k=count))
+
+    for _ in range(tasks):
+        created = start + timedelta(days=rng.randrange(SYNTHETIC_DAYS), seconds=rng.randrange(86400))
+        yield {
+            "title": words(5),
+            "description": words(20),
+            "status": rng.choice(DEFAULT_COLUMNS)[0],
+            "priority": rng.choice(("low", "medium", "high")),
+            "assignee_id": rng.randint(1, users) if users else None,
+            "tags": (
+                list(set(rng.choices(tag_names, cum_weights=tag_weights, k=tags_per_task))) if tags else []
+            ),
+            "start_date": created.isoformat(),
+            "end_date": (created + timedelta(days=rng.randrange(1, 60))).isoformat(),
+            "time_spent": rng.randrange(40) * 900,
+            "created_at": created.isoformat(),
+            "comments": [
+                {
+                    "text": words(12),
+                    "author_id": rng.randint(1, users),
+                    "timestamp": (created + timedelta(hours=rng.randrange(1, 500))).isoformat(),
+                }
+                for _ in range(comments_per_task if users else 0)
+            ],
+        }
+
+
+def init_synthetic_db(
+    db: Session,
+    tasks: int,
+    comments_per_task: int = 2,
+    tags_per_task: int = 2,
+    users: int = 50,
+    tags: int = 30,
+    seed: int = 0,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    progress=None,
+) -> int:
+    """Fill an empty database with a synthetic board of ``tasks`` tasks; returns the number imported.
+
+    Tasks go through the bulk importer, so millions load in minutes with the
+    search index and analytics kept current. ``progress`` is called with the
+    running count after every chunk.
+    """
+    if db.query(KanbanColumn.id).first() is not None:
+        raise ValueError("Database already has a board")
+    db.add_all(
+        KanbanColumn(id=column_id, title=title, position=i)
+        for i, (column_id, title) in enumerate(DEFAULT_COLUMNS)
+    )
+    # Created up front so that user N and "tag N" have id N
+    db.add_all(User(name=f"user {i}", avatar=f"U{i}") for i in range(1, users + 1))
+    db.add_all(Tag(name=f"tag {i}") for i in range(1, tags + 1))
+    db.flush()
+    # The importer ranks the tasks, appending to each column
+    rebalance_column_ranks(db)
+
+    importer = TaskImporter()
+    records = synthetic_tasks(
+        tasks, comments_per_task, tags_per_task, users, tags, seed, datetime(2024, 1, 1)
+    )
+    for chunk in chunked(enumerate(records, start=1), chunk_size):
+        event = importer.import_chunk(db, chunk)
+        if event["errors"]:
+            raise RuntimeError(f"Synthetic tasks rejected: {event['errors'][0]}")
+        if progress is not None:
+            progress(event["imported"])
+    return importer.report.imported
+
+
 if __name__ == "__main__":
     init_db()
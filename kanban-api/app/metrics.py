@@ -0,0 +1,251 @@
+"""Request and database metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every HTTP request and records, per route
+template (``/api/tasks/{task_id}``, so labels stay few), its latency, response
+size, status and the SQL statements it issued. Statements are counted and
+timed by cursor hooks on every SQLAlchemy engine and attributed to the request
+whose context executed them, including sync handlers on the threadpool and
+``AsyncSession.run_sync`` work. Statements slower than
+``config.SLOW_QUERY_MS`` are logged to the ``kanban.slow_query`` logger.
+
+``render`` returns everything, plus the read cache statistics, for the
+``/metrics`` endpoint. Values are per worker process, as Prometheus expects
+when it scrapes each worker.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import config
+
+slow_query_log = logging.getLogger("kanban.slow_query")
+
+# Starlette adds the charset
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+# Route label for requests no route matched (404s), so unknown paths cannot add label values
+UNMATCHED = "<unmatched>"
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = zip(names, values, strict=True)
+    return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in pairs) + "}"
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in sorted(values.items())
+        ]
+
+    def render(self) -> list[str]:
+        return self.header() + self.samples()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # [count per bucket, then +Inf], sum
+            counts, total = self._values.get(labels) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            self._values[labels] = (counts, total + value)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        names = (*self.labels, "le")
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, (*key, bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+ROUTE_LABELS = ("method", "route")
+
+requests_total = Counter(
+    "kanban_http_requests_total", "HTTP requests finished", ("method", "route", "status")
+)
+requests_in_flight = Gauge("kanban_http_requests_in_flight", "HTTP requests being served", ("method",))
+request_duration = Histogram(
+    "kanban_http_request_duration_seconds", "Time from receiving a request to sending the last of its body",
+    ROUTE_LABELS,
+)
+response_size = Histogram("kanban_http_response_size_bytes", "Response body size", ROUTE_LABELS, SIZE_BUCKETS)
+request_queries = Histogram(
+    "kanban_http_request_db_queries", "SQL statements executed per request", ROUTE_LABELS, QUERY_COUNT_BUCKETS
+)
+request_db_time = Histogram(
+    "kanban_http_request_db_seconds", "Time spent in SQL statements per request", ROUTE_LABELS
+)
+query_duration = Histogram("kanban_db_query_duration_seconds", "SQL statement execution time")
+slow_queries = Counter(
+    "kanban_db_slow_queries_total", "SQL statements slower than KANBAN_SLOW_QUERY_MS", ("route",)
+)
+
+METRICS = (
+    requests_total, requests_in_flight, request_duration, response_size,
+    request_queries, request_db_time, query_duration, slow_queries,
+)
+
+
+@dataclass
+class RequestStats:
+    scope: dict
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# The stats of the request being served, shared with the threadpool and greenlets it runs code in
+current_request: ContextVar[RequestStats | None] = ContextVar("kanban_request_stats", default=None)
+
+
+# Connection.info key for the start of the statement running on it; a connection runs one at a time
+QUERY_START_KEY = "kanban_query_start"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info[QUERY_START_KEY] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Failed statements never get here; the next one overwrites their start
+    elapsed = time.perf_counter() - conn.info.pop(QUERY_START_KEY)
+    query_duration.observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if config.SLOW_QUERY_MS and elapsed * 1000 >= config.SLOW_QUERY_MS:
+        route = _route(stats.scope) if stats is not None else ""
+        slow_queries.inc(route)
+        where = f" in {route}" if route else ""
+        slow_query_log.warning("%.1f ms%s: %s", elapsed * 1000, where, " ".join(statement.split()))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses (exports, the change feed) pass through unbuffered"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            requests_in_flight.dec(method)
+            current_request.reset(token)
+            route = _route(scope)
+            requests_total.inc(method, route, status)
+            request_duration.observe(time.perf_counter() - started, method, route)
+            response_size.observe(size, method, route)
+            request_queries.observe(stats.queries, method, route)
+            request_db_time.observe(stats.db_seconds, method, route)
+
+
+def _route(scope) -> str:
+    # The router stores the matched route in the scope it was given, which is this request's
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED) if route is not None else UNMATCHED
+
+
+def render(cache_stats: dict) -> str:
+    """Every metric in the Prometheus text format, with the read cache's ``stats()``"""
+    lines = [line for metric in METRICS for line in metric.render()]
+    lines += [
+        "# HELP kanban_cache_entries Entries in the read cache",
+        "# TYPE kanban_cache_entries gauge",
+        f"kanban_cache_entries {cache_stats['entries']}",
+        "# HELP kanban_cache_lookups_total Read cache lookups and removals, by tables and outcome",
+        "# TYPE kanban_cache_lookups_total counter",
+    ]
+    for tables, counts in sorted(cache_stats["tables"].items()):
+        for outcome, count in counts.items():
+            labels = _format_labels(("tables", "outcome"), (tables, outcome))
+            lines.append(f"kanban_cache_lookups_total{labels} {count}")
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,28 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+    event,
+    text,
+)
 from sqlalchemy import Column as SQLAColumn
 from sqlalchemy.orm import relationship
 
+from app.analytics import create_summary_tables, drop_summary_tables
 from app.database import Base
+from app.search import create_search_index, drop_search_index
+
+# Rank keys (see app.ranking) must compare byte-wise; PostgreSQL's default collation may not
+RankKey = String().with_variant(String(collation="C"), "postgresql")
 
 # Association table for task tags
 task_tag = Table(
@@ -12,6 +30,9 @@ task_tag = Table(
     Base.metadata,
     SQLAColumn("task_id", Integer, ForeignKey("tasks.id"), primary_key=True),
     SQLAColumn("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    # The composite primary key covers task_id lookups. This index covers tag_id lookups, in task_id
+    # order, so tag filters intersect the tasks of several tags by merging (see crud.task.filter_tasks)
+    Index("ix_task_tag_tag_id_task_id", "tag_id", "task_id"),
 )
 
 
@@ -21,6 +42,8 @@ class KanbanColumn(Base):
     id = SQLAColumn(String, primary_key=True, index=True)
     title = SQLAColumn(String, index=True)
     position = SQLAColumn(Integer, default=0)
+    # Board order; position is reported as the column's index in this order
+    rank = SQLAColumn(RankKey, nullable=True, index=True)
 
     # Relationships
     tasks = relationship("Task", back_populates="column")
@@ -28,28 +51,40 @@ class KanbanColumn(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_status_rank", "status", "rank"),
+        # Few tasks are tracking at once; the partial index holds only those. SQLite only uses it for
+        # a query saying "is_tracking = 1", which is how SQLAlchemy renders is_tracking == True there
+        Index(
+            "ix_tasks_tracking", "is_tracking",
+            sqlite_where=text("is_tracking = 1"), postgresql_where=text("is_tracking"),
+        ),
+    )
 
     id = SQLAColumn(Integer, primary_key=True, index=True)
     title = SQLAColumn(String, index=True)
     description = SQLAColumn(Text, nullable=True)
-    start_date = SQLAColumn(DateTime, nullable=True)
-    end_date = SQLAColumn(DateTime, nullable=True)
-    status = SQLAColumn(String, ForeignKey("columns.id"))
+    start_date = SQLAColumn(DateTime, nullable=True, index=True)
+    end_date = SQLAColumn(DateTime, nullable=True, index=True)
+    status = SQLAColumn(String, ForeignKey("columns.id"), index=True)
     priority = SQLAColumn(String, default="medium")
+    # Order within the task's column
+    rank = SQLAColumn(RankKey, nullable=True)
     time_spent = SQLAColumn(Float, default=0)
     is_tracking = SQLAColumn(Boolean, default=False)
     tracking_start_time = SQLAColumn(DateTime, nullable=True)
-    created_at = SQLAColumn(DateTime, default=datetime.utcnow)
-    updated_at = SQLAColumn(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = SQLAColumn(DateTime, default=datetime.utcnow, index=True)
+    updated_at = SQLAColumn(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Foreign keys
-    assignee_id = SQLAColumn(Integer, ForeignKey("users.id"), nullable=True)
+    assignee_id = SQLAColumn(Integer, ForeignKey("users.id"), nullable=True, index=True)
 
     # Relationships
     column = relationship("KanbanColumn", back_populates="tasks")
     assignee = relationship("User", back_populates="assigned_tasks")
     comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
     tags = relationship("Tag", secondary=task_tag, back_populates="tasks")
+    time_entries = relationship("TimeEntry", back_populates="task", cascade="all, delete-orphan")
 
 
 class User(Base):
@@ -62,6 +97,7 @@ class User(Base):
     # Relationships
     assigned_tasks = relationship("Task", back_populates="assignee")
     comments = relationship("Comment", back_populates="author")
+    time_entries = relationship("TimeEntry", back_populates="user")
 
 
 class Comment(Base):
@@ -72,8 +108,8 @@ class Comment(Base):
     timestamp = SQLAColumn(DateTime, default=datetime.utcnow)
 
     # Foreign keys
-    task_id = SQLAColumn(Integer, ForeignKey("tasks.id"))
-    author_id = SQLAColumn(Integer, ForeignKey("users.id"))
+    task_id = SQLAColumn(Integer, ForeignKey("tasks.id"), index=True)
+    author_id = SQLAColumn(Integer, ForeignKey("users.id"), index=True)
 
     # Relationships
     task = relationship("Task", back_populates="comments")
@@ -88,3 +124,77 @@ class Tag(Base):
 
     # Relationships
     tasks = relationship("Task", secondary=task_tag, back_populates="tags")
+
+
+class TimeEntry(Base):
+    """A stretch of time tracked on a task: opened by a start, closed once by a stop, then never changed"""
+
+    __tablename__ = "time_entries"
+    __table_args__ = (
+        # Holds only running entries: at most one per task, and "who is tracking now" reads nothing else
+        Index(
+            "ix_time_entries_active",
+            "task_id",
+            unique=True,
+            sqlite_where=text("stopped_at IS NULL"),
+            postgresql_where=text("stopped_at IS NULL"),
+        ),
+    )
+
+    id = SQLAColumn(Integer, primary_key=True, index=True)
+    task_id = SQLAColumn(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
+    user_id = SQLAColumn(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    started_at = SQLAColumn(DateTime, nullable=False)
+    stopped_at = SQLAColumn(DateTime, nullable=True)
+    # Set with stopped_at
+    seconds = SQLAColumn(Float, nullable=True)
+
+    # Relationships
+    task = relationship("Task", back_populates="time_entries")
+    user = relationship("User", back_populates="time_entries")
+
+
+class TimeRollup(Base):
+    """Seconds tracked per day, user and task, added to as entries are stopped.
+
+    An entry spanning midnight counts towards each day it covers. Entries
+    without a user count as user 0. Rows outlive their task and user, as
+    history.
+    """
+
+    __tablename__ = "time_rollups"
+
+    day = SQLAColumn(Date, primary_key=True)
+    user_id = SQLAColumn(Integer, primary_key=True)
+    task_id = SQLAColumn(Integer, primary_key=True)
+    seconds = SQLAColumn(Float, nullable=False, default=0)
+
+
+class Change(Base):
+    """Change log: one row per created, updated or deleted row, written in the same transaction.
+
+    The id only grows (AUTOINCREMENT never reuses ids, even after pruning) and
+    serves as the version token for incremental sync.
+    """
+
+    __tablename__ = "changes"
+    # (entity, id) answers "latest change to this table" with one index probe, for ETags
+    __table_args__ = (Index("ix_changes_entity_id", "entity", "id"), {"sqlite_autoincrement": True})
+
+    id = SQLAColumn(Integer, primary_key=True)
+    # "task", "column", "comment", "tag" or "user"
+    entity = SQLAColumn(String, nullable=False)
+    entity_id = SQLAColumn(String, nullable=False)
+    # "create", "update" or "delete"
+    op = SQLAColumn(String, nullable=False)
+    changed_at = SQLAColumn(DateTime, default=datetime.utcnow)
+
+
+# The full-text index (an FTS5 table and triggers on SQLite) is not a mapped table; create_all builds it too
+event.listen(Base.metadata, "after_create", lambda target, connection, **kw: create_search_index(connection))
+event.listen(Base.metadata, "before_drop", lambda target, connection, **kw: drop_search_index(connection))
+# Likewise the analytics summary tables and their triggers
+event.listen(
+    Base.metadata, "after_create", lambda target, connection, **kw: create_summary_tables(connection)
+)
+event.listen(Base.metadata, "before_drop", lambda target, connection, **kw: drop_summary_tables(connection))
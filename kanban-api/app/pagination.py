@@ -0,0 +1,42 @@
+import base64
+import json
+from collections.abc import Sequence
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def after_cursor(after: str | None = None) -> int | None:
+    """Dependency that decodes the opaque ``after`` query parameter into the last seen id"""
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int) -> None:
+    """Advertise the cursor for the next page when this page came back full"""
+    if items and len(items) >= limit:
+        last = items[-1]
+        # Items are ORM objects or rows, or plain dicts on the fast JSON path
+        last_id = last["id"] if isinstance(last, dict) else last.id
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_id)
@@ -0,0 +1,331 @@
+"""Opt-in profiling of single requests.
+
+With ``KANBAN_PROFILING`` on, a request carrying an ``X-Profile`` header or a
+``profile`` query parameter is profiled by sampling, every
+``KANBAN_PROFILE_INTERVAL_MS``, the stacks of the threads running its code:
+the event loop's while the request's task is the one running, and threadpool
+workers while they run a call it handed over with ``attributed`` (as
+``app.crud.aio.run`` does). Sampling rather than cProfile also follows the
+request onto the threadpool, which cProfile, being per thread, would miss. The
+SQL statements the request runs are captured with their timings.
+
+The result is a report with the statements, the functions with the most
+samples and a speedscope profile (https://www.speedscope.app, one profile per
+thread). If ``KANBAN_PROFILE_DIR`` is set the report is written there as
+``<id>.json`` and ``<id>.speedscope.json``, the response goes out unchanged
+and its ``X-Profile-Id`` header names the files. Otherwise the report is the
+response.
+
+Other requests served meanwhile are left out, though they still slow the
+profiled one down. Tasks the request starts, such as the one sending a
+streamed body, are not sampled, and streams that never end (the change feed)
+cannot be profiled.
+
+Nothing here runs unless the middleware is installed, which ``main`` only
+does with ``KANBAN_PROFILING`` on, so the hooks cost nothing otherwise.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import config
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_PARAM = "profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+TOP_FUNCTIONS = 30
+
+
+class SwitchInterval:
+    """Lowers the interpreter's thread switch interval while any sampler runs.
+
+    The setting is process-wide, so concurrent profiles share it: the first
+    to start saves the original, and the last to stop restores it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._original = sys.getswitchinterval()
+
+    def acquire(self, interval: float) -> None:
+        with self._lock:
+            if self._users == 0:
+                self._original = sys.getswitchinterval()
+            self._users += 1
+            sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+
+    def release(self) -> None:
+        with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                sys.setswitchinterval(self._original)
+
+
+switch_interval = SwitchInterval()
+
+
+class Sampler(threading.Thread):
+    """Collects the stacks of the threads running ``task``'s code, outermost frame first, every
+    ``interval`` seconds: the event loop's thread while ``task`` runs on it, and those in ``threads``.
+
+    Created on the event loop's thread.
+    """
+
+    def __init__(self, interval: float, task: asyncio.Task):
+        super().__init__(name="kanban-profiler", daemon=True)
+        self.interval = interval
+        self.task = task
+        self.loop = task.get_loop()
+        self.loop_thread = threading.get_ident()
+        # Threadpool workers while they run a call of the task's (see ``attributed``)
+        self.threads: set[int] = set()
+        # thread id -> [(stack, weight in seconds)]; a stack is a tuple of (file, function, first line)
+        self.samples: dict[int, list[tuple[tuple, float]]] = defaultdict(list)
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        # A busy thread otherwise keeps the GIL, and the sampler waiting, for the default 5 ms
+        switch_interval.acquire(self.interval)
+        super().start()
+
+    def _serving(self) -> set[int]:
+        serving = set(self.threads)
+        if asyncio.current_task(self.loop) is self.task:
+            serving.add(self.loop_thread)
+        return serving
+
+    def run(self) -> None:
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+            now = time.perf_counter()
+            # Only threads serving the task both before and after the stacks are read, so none caught
+            # switching to other work counts
+            serving = self._serving()
+            frames = sys._current_frames()
+            serving &= self._serving()
+            # Or the loop's thread is caught waiting for this thread to stop
+            if self._stopped.is_set():
+                break
+            for thread_id in serving & frames.keys():
+                frame = frames[thread_id]
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                    frame = frame.f_back
+                self.samples[thread_id].append((tuple(reversed(stack)), now - last))
+            last = now
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+        switch_interval.release()
+
+
+class Profile:
+    def __init__(self, method: str, path: str):
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.statements: list[dict] = []
+        self.sampler = Sampler(config.PROFILE_INTERVAL_MS / 1000, asyncio.current_task())
+        self.started = time.perf_counter()
+        self.sampler.start()
+
+    def finish(self, route: str | None, status: int, size: int) -> None:
+        self.duration = time.perf_counter() - self.started
+        self.sampler.stop()
+        self.route, self.status, self.size = route, status, size
+
+    def _frames(self) -> tuple[list[tuple], dict[tuple, int]]:
+        frames, index = [], {}
+        for samples in self.sampler.samples.values():
+            for stack, _ in samples:
+                for frame in stack:
+                    if frame not in index:
+                        index[frame] = len(frames)
+                        frames.append(frame)
+        return frames, index
+
+    def speedscope(self) -> dict:
+        frames, index = self._frames()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "kanban-api",
+            "shared": {"frames": [{"name": name, "file": file, "line": line} for file, name, line in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": names.get(thread_id, str(thread_id)),
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weight for _, weight in samples) * 1000,
+                    "samples": [[index[frame] for frame in stack] for stack, _ in samples],
+                    "weights": [weight * 1000 for _, weight in samples],
+                }
+                for thread_id, samples in self.sampler.samples.items()
+            ],
+        }
+
+    def top_functions(self) -> list[dict]:
+        own, total = Counter(), Counter()
+        for samples in self.sampler.samples.values():
+            for stack, weight in samples:
+                own[stack[-1]] += weight
+                # Once per sample however deep the recursion
+                for frame in set(stack):
+                    total[frame] += weight
+        top = []
+        # By time in the function itself; every caller's total includes its callees, up to the thread's
+        # entry point
+        for frame, weight in own.most_common(TOP_FUNCTIONS):
+            file, name, line = frame
+            top.append({
+                "function": name, "file": file, "line": line,
+                "self_ms": round(weight * 1000, 2), "total_ms": round(total[frame] * 1000, 2),
+            })
+        return top
+
+    def report(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "response_bytes": self.size,
+            "duration_ms": round(self.duration * 1000, 2),
+            "sql_ms": round(sum(statement["ms"] for statement in self.statements), 2),
+            "sql": self.statements,
+            "top": self.top_functions(),
+        }
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{self.id}.json"), "w") as out:
+            json.dump(self.report(), out, indent=2)
+        with open(os.path.join(directory, f"{self.id}.speedscope.json"), "w") as out:
+            json.dump(self.speedscope(), out)
+
+
+# The profile of the request being served, seen by the SQL hooks on the threads it runs code in
+current_profile: ContextVar[Profile | None] = ContextVar("kanban_profile", default=None)
+
+QUERY_START_KEY = "kanban_profile_query_start"
+
+
+def attributed(fn: Callable) -> Callable:
+    """``fn``, sampled as part of the request being profiled, if any, on whichever thread runs it.
+
+    Wrap calls the request hands to the threadpool; called on the event loop.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        return fn
+    threads = profile.sampler.threads
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        thread_id = threading.get_ident()
+        threads.add(thread_id)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            threads.discard(thread_id)
+
+    return call
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info[QUERY_START_KEY] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    started = conn.info.pop(QUERY_START_KEY, None)
+    if profile is not None and started is not None:
+        elapsed = time.perf_counter() - started
+        profile.statements.append({
+            "statement": " ".join(statement.split()),
+            "executemany": executemany,
+            "ms": round(elapsed * 1000, 3),
+        })
+
+
+def _requested(scope) -> bool:
+    if any(name == PROFILE_HEADER for name, _ in scope["headers"]):
+        return True
+    return PROFILE_PARAM in parse_qs(scope.get("query_string", b"").decode(), keep_blank_values=True)
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it (see the module docstring); pure ASGI like ``MetricsMiddleware``"""
+
+    def __init__(self, app):
+        self.app = app
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"])
+        token = current_profile.set(profile)
+        store = config.PROFILE_DIR
+        status = 500
+        size = 0
+
+        async def send_or_hold(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if store:
+                    headers = [*message["headers"], (PROFILE_ID_HEADER, profile.id.encode())]
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            # Without a directory the report replaces the response
+            if store:
+                await send(message)
+
+        try:
+            await self.app(scope, receive, send_or_hold)
+        finally:
+            current_profile.reset(token)
+            route = scope.get("route")
+            profile.finish(getattr(route, "path", None), status, size)
+
+        if store:
+            profile.save(store)
+            return
+        body = json.dumps({**profile.report(), "speedscope": profile.speedscope()}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (PROFILE_ID_HEADER, profile.id.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
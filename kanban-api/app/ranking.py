@@ -0,0 +1,161 @@
+"""Lexicographic rank keys for ordering rows with single-row writes.
+
+A key sorts as a plain string (binary collation) and a new key can always be
+generated between any two existing ones, so moving an item only rewrites that
+item. Keys are an integer part followed by an optional fraction, both in base
+62. The integer part's first character encodes its length, so appending to the
+end of a list grows keys logarithmically rather than linearly. This follows the
+well-known "fractional indexing" scheme.
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Key for the first item of an empty list
+INTEGER_ZERO = "a0"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """Fraction strictly between fractions ``a`` and ``b`` (None means no upper bound)"""
+    if b is not None and a >= b:
+        raise ValueError(f"{a!r} is not less than {b!r}")
+    if a.endswith(DIGITS[0]) or (b and b.endswith(DIGITS[0])):
+        raise ValueError("Fractions may not end in the zero digit")
+
+    if b:
+        # Keep any shared prefix and find the midpoint of what follows it
+        n = 0
+        while (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid rank head {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid rank {key!r}")
+    integer, fraction = key[:length], key[length:]
+    if fraction.endswith(DIGITS[0]):
+        raise ValueError(f"Invalid rank {key!r}")
+    return integer, fraction
+
+
+def _increment_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = DIGITS.index(digits[i]) + 1
+        if d < BASE:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+
+    # Every digit carried: move to the next integer length
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def rank_between(a: str | None, b: str | None) -> str:
+    """Return a key that sorts strictly after ``a`` and before ``b``.
+
+    ``None`` means the start (for ``a``) or the end (for ``b``) of the list.
+    """
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} is not less than {b!r}")
+
+    if a is None:
+        if b is None:
+            return INTEGER_ZERO
+        integer_b, fraction_b = _split(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if fraction_b:
+            return integer_b
+        previous = _decrement_integer(integer_b)
+        if previous is None:
+            raise ValueError("Cannot rank before the smallest key")
+        return previous
+
+    integer_a, fraction_a = _split(a)
+    if b is None:
+        following = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if following is None else following
+
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    following = _increment_integer(integer_a)
+    if following is None:
+        raise ValueError("Cannot rank after the largest key")
+    if following < b:
+        return following
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def ranks_between(a: str | None, b: str | None, n: int) -> list[str]:
+    """Return ``n`` ascending keys between ``a`` and ``b``, spread to keep them short"""
+    if n <= 0:
+        return []
+    if n == 1:
+        return [rank_between(a, b)]
+
+    if b is None:
+        keys = [rank_between(a, None)]
+        for _ in range(n - 1):
+            keys.append(rank_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [rank_between(None, b)]
+        for _ in range(n - 1):
+            keys.append(rank_between(None, keys[-1]))
+        return keys[::-1]
+
+    mid = n // 2
+    key = rank_between(a, b)
+    return ranks_between(a, key, mid) + [key] + ranks_between(key, b, n - mid - 1)
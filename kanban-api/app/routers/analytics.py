@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+
+from app.crud import aio
+from app.crud import analytics as crud
+from app.database import AnySession, get_session
+from app.etags import ANALYTICS_TABLES, conditional_get
+from app.schemas.analytics import BoardSummary, TimeReport
+
+router = APIRouter()
+
+
+# No ETag: overdue counts change with the clock as well as with writes
+@router.get("/summary", response_model=BoardSummary)
+async def read_summary(live: bool = False, db: AnySession = Depends(get_session)):
+    """Task counts per column and assignee, and overdue tasks; ``live`` recomputes them from the tasks
+    table"""
+    return await aio.run(db, crud.get_board_summary, live=live, schema=BoardSummary)
+
+
+@router.get("/time", response_model=TimeReport, dependencies=[Depends(conditional_get(*ANALYTICS_TABLES))])
+async def read_time(live: bool = False, db: AnySession = Depends(get_session)):
+    """Time spent in total and per tag, assignee and column; ``live`` recomputes it from the tasks table"""
+    return await aio.run(db, crud.get_time_report, live=live, schema=TimeReport)
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import config, serialization
+from app.crud import aio
+from app.crud import board as crud
+from app.crud import changes as changes_crud
+from app.database import AnySession, get_session
+from app.etags import BOARD_TABLES, conditional_get
+from app.events import BOARD_CHANNEL, sse_stream
+from app.routers.columns import columns_response
+from app.schemas.board import Board, BoardChanges
+from app.schemas.column import Column
+from app.schemas.task import TaskView
+
+router = APIRouter()
+
+
+def build_board(db: Session) -> Board:
+    board = crud.get_board(db)
+
+    # Derive task_ids from the tasks already loaded instead of lazy-loading col.tasks
+    task_ids_by_column: dict[str, list[int]] = {}
+    for task in board["tasks"]:
+        task_ids_by_column.setdefault(task.status, []).append(task.id)
+
+    columns = [
+        Column(
+            id=col.id, title=col.title, position=i, rank=col.rank, task_ids=task_ids_by_column.get(col.id, [])
+        )
+        for i, col in enumerate(board["columns"])
+    ]
+
+    return Board(
+        version=board["version"], columns=columns, tasks=board["tasks"], users=board["users"],
+        tags=board["tags"],
+    )
+
+
+def build_changes(db: Session, since: int, limit: int) -> BoardChanges:
+    changes = changes_crud.get_changes(db, since=since, limit=limit)
+    if changes.get("columns"):
+        # Changed columns are few; answer with the same shape as the column endpoints
+        changes["columns"] = columns_response(db, changes["columns"])
+    return BoardChanges(**changes)
+
+
+@router.get("/", response_model=Board, dependencies=[Depends(conditional_get(*BOARD_TABLES))])
+async def read_board(response: Response, view: TaskView = "detail", db: AnySession = Depends(get_session)):
+    """Get columns, tasks (with comments and tags, or ``view=summary`` cards), users and tags in one
+    response"""
+    if view == "summary" or config.FAST_JSON:
+        content = await aio.run(db, serialization.board_content, view=view)
+        return serialization.render(response, content) if config.FAST_JSON else content
+    return await aio.run(db, build_board)
+
+
+@router.get("/changes", response_model=BoardChanges)
+async def read_board_changes(
+    since: int = Query(0, ge=0), limit: int = Query(1000, ge=1, le=10000),
+    db: AnySession = Depends(get_session),
+):
+    """Get rows created, updated or deleted after the ``since`` version, and the new version"""
+    return await aio.run(db, build_changes, since=since, limit=limit)
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def board_events():
+    """Stream board changes as server-sent events, one ``change`` event per commit"""
+    return StreamingResponse(
+        sse_stream(BOARD_CHANNEL),
+        media_type="text/event-stream",
+        # Disable proxy buffering so events arrive as they are published
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
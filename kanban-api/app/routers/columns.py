@@ -1,67 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
+from app import config, serialization
+from app.crud import aio
 from app.crud import column as crud
-from app.database import get_db
-from app.schemas.column import Column, ColumnCreate, ColumnUpdate
+from app.database import AnySession, get_session
+from app.etags import COLUMN_TABLES, conditional_get
+from app.models.models import KanbanColumn
+from app.schemas.column import Column, ColumnCreate, ColumnMove, ColumnUpdate
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[Column])
-def read_columns(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all columns"""
+def column_response(db: Session, db_column: KanbanColumn) -> Column:
+    """Convert to response model with task_ids; position is the column's index on the board"""
+    return columns_response(db, [db_column])[0]
+
+
+def columns_response(db: Session, db_columns: list[KanbanColumn]) -> list[Column]:
+    task_ids = crud.get_column_task_ids(db, column_ids=[col.id for col in db_columns])
+    positions = crud.get_column_positions(db)
+    return [
+        Column(
+            id=col.id, title=col.title, position=positions[col.id], rank=col.rank,
+            task_ids=task_ids.get(col.id, []),
+        )
+        for col in db_columns
+    ]
+
+
+def list_columns(db: Session, skip: int = 0, limit: int = 100) -> list[Column]:
     columns = crud.get_columns(db, skip=skip, limit=limit)
+    task_ids = crud.get_column_task_ids(db, column_ids=[col.id for col in columns])
 
     # Convert to response model with task_ids
     response_columns = []
-    for col in columns:
-        task_ids = [task.id for task in col.tasks]
-        response_columns.append(Column(id=col.id, title=col.title, position=col.position, task_ids=task_ids))
+    for i, col in enumerate(columns):
+        response_columns.append(
+            Column(
+                id=col.id, title=col.title, position=skip + i, rank=col.rank,
+                task_ids=task_ids.get(col.id, []),
+            )
+        )
 
     return response_columns
 
 
-@router.get("/{column_id}", response_model=Column)
-def read_column(column_id: str, db: Session = Depends(get_db)):
+@router.get("/", response_model=list[Column], dependencies=[Depends(conditional_get(*COLUMN_TABLES))])
+async def read_columns(
+    response: Response, skip: int = 0, limit: int = 100, db: AnySession = Depends(get_session)
+):
+    """Get all columns"""
+    if config.FAST_JSON:
+        content = await aio.run(db, serialization.columns_content, skip=skip, limit=limit)
+        return serialization.render(response, content)
+    return await aio.run(db, list_columns, skip=skip, limit=limit)
+
+
+@router.get("/{column_id}", response_model=Column, dependencies=[Depends(conditional_get(*COLUMN_TABLES))])
+async def read_column(column_id: str, db: AnySession = Depends(get_session)):
     """Get a specific column by ID"""
-    db_column = crud.get_column(db, column_id=column_id)
+    db_column = await aio.run(db, crud.get_column, column_id=column_id)
     if db_column is None:
         raise HTTPException(status_code=404, detail="Column not found")
-
-    # Convert to response model with task_ids
-    task_ids = [task.id for task in db_column.tasks]
-    return Column(id=db_column.id, title=db_column.title, position=db_column.position, task_ids=task_ids)
+    return await aio.run(db, column_response, db_column)
 
 
 @router.post("/", response_model=Column, status_code=status.HTTP_201_CREATED)
-def create_column(column: ColumnCreate, db: Session = Depends(get_db)):
+async def create_column(column: ColumnCreate, db: AnySession = Depends(get_session)):
     """Create a new column"""
     # Check if column with this ID already exists
-    db_column = crud.get_column(db, column_id=column.id)
+    db_column = await aio.run(db, crud.get_column, column_id=column.id)
     if db_column:
         raise HTTPException(status_code=400, detail="Column with this ID already exists")
 
-    db_column = crud.create_column(db=db, column=column)
-    return Column(id=db_column.id, title=db_column.title, position=db_column.position, task_ids=[])
+    db_column = await aio.run(db, crud.create_column, column=column)
+    return await aio.run(db, column_response, db_column)
 
 
 @router.put("/{column_id}", response_model=Column)
-def update_column(column_id: str, column: ColumnUpdate, db: Session = Depends(get_db)):
+async def update_column(column_id: str, column: ColumnUpdate, db: AnySession = Depends(get_session)):
     """Update a column"""
-    db_column = crud.update_column(db=db, column_id=column_id, column=column)
+    db_column = await aio.run(db, crud.update_column, column_id=column_id, column=column)
     if db_column is None:
         raise HTTPException(status_code=404, detail="Column not found")
+    return await aio.run(db, column_response, db_column)
 
-    # Convert to response model with task_ids
-    task_ids = [task.id for task in db_column.tasks]
-    return Column(id=db_column.id, title=db_column.title, position=db_column.position, task_ids=task_ids)
+
+@router.post("/{column_id}/move", response_model=Column)
+async def move_column(column_id: str, move: ColumnMove, db: AnySession = Depends(get_session)):
+    """Move a column between two neighbouring columns"""
+    try:
+        db_column = await aio.run(db, crud.move_column, column_id=column_id, move=move)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if db_column is None:
+        raise HTTPException(status_code=404, detail="Column not found")
+    return await aio.run(db, column_response, db_column)
 
 
 @router.delete("/{column_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_column(column_id: str, db: Session = Depends(get_db)):
+async def delete_column(column_id: str, db: AnySession = Depends(get_session)):
     """Delete a column"""
-    success = crud.delete_column(db=db, column_id=column_id)
+    success = await aio.run(db, crud.delete_column, column_id=column_id)
     if not success:
         raise HTTPException(status_code=404, detail="Column not found")
     return None
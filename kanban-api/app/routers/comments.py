@@ -1,39 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
+from app.crud import aio
 from app.crud import comment as crud
-from app.database import get_db
+from app.database import AnySession, get_session
+from app.etags import COMMENT_TABLES, conditional_get
+from app.pagination import after_cursor, set_next_cursor
 from app.schemas.comment import Comment, CommentCreate, CommentUpdate
 
 router = APIRouter()
 
 
-@router.get("/task/{task_id}", response_model=list[Comment])
-def read_comments_by_task(task_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get(
+    "/task/{task_id}", response_model=list[Comment], dependencies=[Depends(conditional_get(*COMMENT_TABLES))]
+)
+async def read_comments_by_task(
+    task_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = Depends(after_cursor),
+    db: AnySession = Depends(get_session),
+):
     """Get all comments for a specific task"""
-    comments = crud.get_comments_by_task(db, task_id=task_id, skip=skip, limit=limit)
+    comments = await aio.run(
+        db, crud.get_comments_by_task, task_id=task_id, skip=skip, limit=limit, after_id=after_id,
+        schema=Comment,
+    )
+    set_next_cursor(response, comments, limit)
     return comments
 
 
 @router.post("/", response_model=Comment, status_code=status.HTTP_201_CREATED)
-def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
+async def create_comment(comment: CommentCreate, db: AnySession = Depends(get_session)):
     """Create a new comment"""
-    return crud.create_comment(db=db, comment=comment)
+    return await aio.run(db, crud.create_comment, comment=comment, schema=Comment)
 
 
 @router.put("/{comment_id}", response_model=Comment)
-def update_comment(comment_id: int, comment: CommentUpdate, db: Session = Depends(get_db)):
+async def update_comment(comment_id: int, comment: CommentUpdate, db: AnySession = Depends(get_session)):
     """Update a comment"""
-    db_comment = crud.update_comment(db=db, comment_id=comment_id, comment=comment)
+    db_comment = await aio.run(
+        db, crud.update_comment, comment_id=comment_id, comment=comment, schema=Comment
+    )
     if db_comment is None:
         raise HTTPException(status_code=404, detail="Comment not found")
     return db_comment
 
 
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_comment(comment_id: int, db: Session = Depends(get_db)):
+async def delete_comment(comment_id: int, db: AnySession = Depends(get_session)):
     """Delete a comment"""
-    success = crud.delete_comment(db=db, comment_id=comment_id)
+    success = await aio.run(db, crud.delete_comment, comment_id=comment_id)
     if not success:
         raise HTTPException(status_code=404, detail="Comment not found")
     return None
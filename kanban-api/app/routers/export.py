@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import export
+from app.database import AnySession, get_session
+
+router = APIRouter()
+
+
+@router.get("/tasks.ndjson", response_class=StreamingResponse)
+async def export_tasks(status: str | None = None, gzip: bool = False, db: AnySession = Depends(get_session)):
+    """Stream every task (with its tags) as newline-delimited JSON, optionally gzip-compressed"""
+    task_chunks = export.aio_task_chunks if isinstance(db, AsyncSession) else export.task_chunks
+    return export.ndjson_response(task_chunks(db.bind, status, gzip), "tasks.ndjson", gzip)
+
+
+@router.get("/comments.ndjson", response_class=StreamingResponse)
+async def export_comments(
+    task_id: int | None = None, gzip: bool = False, db: AnySession = Depends(get_session)
+):
+    """Stream every comment as newline-delimited JSON, optionally gzip-compressed"""
+    comment_chunks = export.aio_comment_chunks if isinstance(db, AsyncSession) else export.comment_chunks
+    return export.ndjson_response(comment_chunks(db.bind, task_id, gzip), "comments.ndjson", gzip)
@@ -0,0 +1,35 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import importer
+from app.database import AnySession, get_session
+from app.export import NDJSON_MEDIA_TYPE
+
+router = APIRouter()
+
+Format = Literal["csv", "ndjson"]
+
+
+async def _import(request: Request, kind: str, format: Format | None, db: AnySession) -> StreamingResponse:
+    fmt = importer.request_format(format, request.headers.get("content-type"))
+    body = await importer.spool_body(request)
+    event_chunks = importer.aio_event_chunks if isinstance(db, AsyncSession) else importer.event_chunks
+    chunks = event_chunks(db.bind, kind, body, fmt)
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post("/tasks", response_class=StreamingResponse)
+async def import_tasks(request: Request, format: Format | None = None, db: AnySession = Depends(get_session)):
+    """Import tasks from a CSV or NDJSON body, streaming progress events and a final summary as NDJSON"""
+    return await _import(request, "tasks", format, db)
+
+
+@router.post("/comments", response_class=StreamingResponse)
+async def import_comments(
+    request: Request, format: Format | None = None, db: AnySession = Depends(get_session)
+):
+    """Import comments from a CSV or NDJSON body, streaming progress events and a final summary as NDJSON"""
+    return await _import(request, "comments", format, db)
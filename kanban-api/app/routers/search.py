@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.crud import aio
+from app.crud import search as crud
+from app.database import AnySession, get_session
+from app.etags import SEARCH_TABLES, conditional_get
+from app.schemas.search import SearchResult
+
+router = APIRouter()
+
+
+@router.get("/", response_model=list[SearchResult], dependencies=[Depends(conditional_get(*SEARCH_TABLES))])
+async def search(
+    q: str = Query(..., min_length=1), skip: int = 0, limit: int = Query(20, le=100),
+    db: AnySession = Depends(get_session),
+):
+    """Search task titles, descriptions and comments, with highlighted matches.
+
+    The newest 2000 matches (``app.search.MAX_RANKED_MATCHES``) come first, best first; older
+    matches follow them, newest first.
+    """
+    return await aio.run(db, crud.search_tasks, q=q, skip=skip, limit=limit, schema=SearchResult)
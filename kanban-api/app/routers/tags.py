@@ -1,53 +1,67 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
+from app import config, serialization
+from app.crud import aio
 from app.crud import tag as crud
-from app.database import get_db
+from app.database import AnySession, get_session
+from app.etags import TAG_TABLES, conditional_get
+from app.pagination import after_cursor, set_next_cursor
 from app.schemas.tag import Tag, TagCreate, TagUpdate
 
 router = APIRouter()
 
 # Create a dependency that doesn't use Depends in the default argument
-db_dependency = Depends(get_db)
+db_dependency = Depends(get_session)
 
 
-@router.get("/", response_model=List[Tag])
-def read_tags(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=List[Tag], dependencies=[Depends(conditional_get(*TAG_TABLES))])
+async def read_tags(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = Depends(after_cursor),
+    db: AnySession = Depends(get_session),
+):
     """Get all tags"""
-    tags = crud.get_tags(db, skip=skip, limit=limit)
+    if config.FAST_JSON:
+        tags = await aio.run(db, crud.get_tags, skip=skip, limit=limit, after_id=after_id)
+        set_next_cursor(response, tags, limit)
+        return serialization.render(response, serialization.TAG.dicts(tags))
+    tags = await aio.run(db, crud.get_tags, skip=skip, limit=limit, after_id=after_id, schema=Tag)
+    set_next_cursor(response, tags, limit)
     return tags
 
 
-@router.get("/{tag_id}", response_model=Tag)
-def read_tag(tag_id: int, db: Session = Depends(get_db)):
+@router.get("/{tag_id}", response_model=Tag, dependencies=[Depends(conditional_get(*TAG_TABLES))])
+async def read_tag(tag_id: int, db: AnySession = Depends(get_session)):
     """Get a specific tag by ID"""
-    db_tag = crud.get_tag(db, tag_id=tag_id)
+    db_tag = await aio.run(db, crud.get_tag, tag_id=tag_id, schema=Tag)
     if db_tag is None:
         raise HTTPException(status_code=404, detail="Tag not found")
     return db_tag
 
 
 @router.post("/", response_model=Tag, status_code=status.HTTP_201_CREATED)
-def create_tag(tag: TagCreate, db: Session = Depends(get_db)):
+async def create_tag(tag: TagCreate, db: AnySession = Depends(get_session)):
     """Create a new tag"""
-    return crud.create_tag(db=db, tag=tag)
+    return await aio.run(db, crud.create_tag, tag=tag, schema=Tag)
 
 
 @router.put("/{tag_id}", response_model=Tag)
-def update_tag(tag_id: int, tag: TagUpdate, db: Session = Depends(get_db)):
+async def update_tag(tag_id: int, tag: TagUpdate, db: AnySession = Depends(get_session)):
     """Update a tag"""
-    db_tag = crud.update_tag(db=db, tag_id=tag_id, tag=tag)
+    db_tag = await aio.run(db, crud.update_tag, tag_id=tag_id, tag=tag, schema=Tag)
     if db_tag is None:
         raise HTTPException(status_code=404, detail="Tag not found")
     return db_tag
 
 
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_tag(tag_id: int, db: Session = Depends(get_db)):
+async def delete_tag(tag_id: int, db: AnySession = Depends(get_session)):
     """Delete a tag"""
-    success = crud.delete_tag(db=db, tag_id=tag_id)
+    success = await aio.run(db, crud.delete_tag, tag_id=tag_id)
     if not success:
         raise HTTPException(status_code=404, detail="Tag not found")
     return None
@@ -1,10 +1,12 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.crud import tag as crud
 from app.database import get_db
+from app.etags import TAG_TABLES, conditional_get
+from app.pagination import after_cursor, set_next_cursor
 from app.schemas.tag import Tag, TagCreate, TagUpdate
 
 router = APIRouter()
@@ -13,14 +15,21 @@ router = APIRouter()
 db_dependency = Depends(get_db)
 
 
-@router.get("/", response_model=List[Tag])
-def read_tags(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=List[Tag], dependencies=[Depends(conditional_get(*TAG_TABLES))])
+def read_tags(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = Depends(after_cursor),
+    db: Session = Depends(get_db),
+):
     """Get all tags"""
-    tags = crud.get_tags(db, skip=skip, limit=limit)
+    tags = crud.get_tags(db, skip=skip, limit=limit, after_id=after_id)
+    set_next_cursor(response, tags, limit)
     return tags
 
 
-@router.get("/{tag_id}", response_model=Tag)
+@router.get("/{tag_id}", response_model=Tag, dependencies=[Depends(conditional_get(*TAG_TABLES))])
 def read_tag(tag_id: int, db: Session = Depends(get_db)):
     """Get a specific tag by ID"""
     db_tag = crud.get_tag(db, tag_id=tag_id)
@@ -1,68 +1,166 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from app.database import get_db
-from app.schemas.task import Task, TaskCreate, TaskUpdate, TaskTimeTrackingUpdate
+from app import config, serialization
+from app.crud import aio
+from app.database import AnySession, get_session
+from app.etags import TASK_TABLES, conditional_get
+from app.filters import check_cursor, task_filter, task_sort
+from app.pagination import after_cursor, set_next_cursor
+from app.schemas.task import (
+    Task,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskFilter,
+    TaskMove,
+    TaskSummary,
+    TaskTimeTrackingUpdate,
+    TaskUpdate,
+    TaskView,
+)
 from app.crud import task as crud
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Task])
-def read_tasks(status: Optional[str] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all tasks, optionally filtered by status"""
-    tasks = crud.get_tasks(db, status=status, skip=skip, limit=limit)
+def rebalance_column(bind, status: str) -> None:
+    # The request's session is closed by the time background tasks run
+    with Session(bind) as db:
+        crud.rebalance_task_ranks(db, status)
+
+async def aio_rebalance_column(bind, status: str) -> None:
+    async with AsyncSession(bind) as db:
+        await aio.run(db, crud.rebalance_task_ranks, status)
+
+def schedule_rebalance(background_tasks: BackgroundTasks, task, bind) -> None:
+    """Re-rank the task's column after the response once repeated moves have made its key long"""
+    if task.rank is not None and len(task.rank) > config.RANK_REBALANCE_LENGTH:
+        rebalance = aio_rebalance_column if isinstance(bind, AsyncEngine) else rebalance_column
+        background_tasks.add_task(rebalance, bind, task.status)
+
+@router.get(
+    "/", response_model=List[Union[Task, TaskSummary]], dependencies=[Depends(conditional_get(*TASK_TABLES))]
+)
+async def read_tasks(
+    response: Response,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = Depends(after_cursor),
+    filters: TaskFilter = Depends(task_filter),
+    order: List[tuple] = Depends(task_sort),
+    view: TaskView = "detail",
+    db: AnySession = Depends(get_session),
+):
+    """Get tasks, optionally filtered (see ``app.filters``) and sorted; cursors page the default id order.
+
+    ``view=summary`` returns ``TaskSummary`` cards instead of full tasks.
+    """
+    keyset = check_cursor(order, after_id)
+    order_by = None if keyset else order
+    if view == "summary":
+        content = await aio.run(
+            db, serialization.task_summaries_content,
+            status=status, skip=skip, limit=limit, after_id=after_id, filters=filters, order_by=order_by,
+        )
+        if keyset:
+            set_next_cursor(response, content, limit)
+        return serialization.render(response, content) if config.FAST_JSON else content
+    if config.FAST_JSON:
+        content = await aio.run(
+            db, serialization.tasks_content,
+            status=status, skip=skip, limit=limit, after_id=after_id, filters=filters, order_by=order_by,
+        )
+        if keyset:
+            set_next_cursor(response, content, limit)
+        return serialization.render(response, content)
+    tasks = await aio.run(
+        db, crud.get_tasks, status=status, skip=skip, limit=limit, after_id=after_id,
+        filters=filters, order_by=order_by, schema=Task,
+    )
+    if keyset:
+        set_next_cursor(response, tasks, limit)
     return tasks
 
-@router.get("/{task_id}", response_model=Task)
-def read_task(task_id: int, db: Session = Depends(get_db)):
+@router.get("/{task_id}", response_model=Task, dependencies=[Depends(conditional_get(*TASK_TABLES))])
+async def read_task(task_id: int, db: AnySession = Depends(get_session)):
     """Get a specific task by ID"""
-    db_task = crud.get_task(db, task_id=task_id)
+    db_task = await aio.run(db, crud.get_task, task_id=task_id, schema=Task)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
 @router.post("/", response_model=Task, status_code=status.HTTP_201_CREATED)
-def create_task(task: TaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: TaskCreate, db: AnySession = Depends(get_session)):
     """Create a new task"""
-    return crud.create_task(db=db, task=task)
+    return await aio.run(db, crud.create_task, task=task, schema=Task)
+
+@router.post("/bulk", response_model=List[TaskBulkResult])
+async def bulk_create_tasks(tasks: List[TaskCreate], db: AnySession = Depends(get_session)):
+    """Create many tasks in one transaction, returning a result per item"""
+    return await aio.run(db, crud.bulk_create_tasks, tasks=tasks)
+
+@router.patch("/bulk", response_model=List[TaskBulkResult])
+async def bulk_update_tasks(tasks: List[TaskBulkUpdate], db: AnySession = Depends(get_session)):
+    """Update or move many tasks in one transaction, returning a result per item"""
+    return await aio.run(db, crud.bulk_update_tasks, tasks=tasks)
 
 @router.put("/{task_id}", response_model=Task)
-def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db)):
+async def update_task(task_id: int, task: TaskUpdate, db: AnySession = Depends(get_session)):
     """Update a task"""
-    db_task = crud.update_task(db=db, task_id=task_id, task=task)
+    db_task = await aio.run(db, crud.update_task, task_id=task_id, task=task, schema=Task)
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return db_task
+
+@router.post("/{task_id}/move", response_model=Task)
+async def move_task(
+    task_id: int, move: TaskMove, background_tasks: BackgroundTasks, db: AnySession = Depends(get_session)
+):
+    """Move a task to a column, between two neighbouring tasks"""
+    try:
+        db_task = await aio.run(db, crud.move_task, task_id=task_id, move=move, schema=Task)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    schedule_rebalance(background_tasks, db_task, db.bind)
     return db_task
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(task_id: int, db: Session = Depends(get_db)):
+async def delete_task(task_id: int, db: AnySession = Depends(get_session)):
     """Delete a task"""
-    success = crud.delete_task(db=db, task_id=task_id)
+    success = await aio.run(db, crud.delete_task, task_id=task_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
     return None
 
 @router.put("/{task_id}/time-tracking", response_model=Task)
-def update_task_time_tracking(task_id: int, time_tracking: TaskTimeTrackingUpdate, db: Session = Depends(get_db)):
+async def update_task_time_tracking(
+    task_id: int, time_tracking: TaskTimeTrackingUpdate, db: AnySession = Depends(get_session)
+):
     """Update task time tracking status"""
-    db_task = crud.update_task_time_tracking(db=db, task_id=task_id, time_tracking=time_tracking)
+    db_task = await aio.run(
+        db, crud.update_task_time_tracking, task_id=task_id, time_tracking=time_tracking, schema=Task
+    )
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
 @router.post("/{task_id}/tags/{tag_id}", response_model=Task)
-def add_tag_to_task(task_id: int, tag_id: int, db: Session = Depends(get_db)):
+async def add_tag_to_task(task_id: int, tag_id: int, db: AnySession = Depends(get_session)):
     """Add a tag to a task"""
-    db_task = crud.add_tag_to_task(db=db, task_id=task_id, tag_id=tag_id)
+    db_task = await aio.run(db, crud.add_tag_to_task, task_id=task_id, tag_id=tag_id, schema=Task)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task or tag not found")
     return db_task
 
 @router.delete("/{task_id}/tags/{tag_id}", response_model=Task)
-def remove_tag_from_task(task_id: int, tag_id: int, db: Session = Depends(get_db)):
+async def remove_tag_from_task(task_id: int, tag_id: int, db: AnySession = Depends(get_session)):
     """Remove a tag from a task"""
-    db_task = crud.remove_tag_from_task(db=db, task_id=task_id, tag_id=tag_id)
+    db_task = await aio.run(db, crud.remove_tag_from_task, task_id=task_id, tag_id=tag_id, schema=Task)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task or tag not found")
     return db_task
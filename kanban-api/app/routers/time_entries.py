@@ -0,0 +1,88 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from app.crud import aio
+from app.crud import time_entry as crud
+from app.database import AnySession, get_session
+from app.etags import TIME_TABLES, conditional_get
+from app.pagination import after_cursor, set_next_cursor
+from app.schemas.time_entry import TimeEntry, TimeEntryStart, TimeRollup
+
+router = APIRouter()
+
+RollupKey = Literal["day", "user", "task"]
+
+
+@router.post("/task/{task_id}/start", response_model=TimeEntry, status_code=status.HTTP_201_CREATED)
+async def start_time_entry(
+    task_id: int, start: TimeEntryStart | None = None, db: AnySession = Depends(get_session)
+):
+    """Start tracking time on a task, at the server's clock"""
+    user_id = start.user_id if start else None
+    try:
+        db_entry = await aio.run(
+            db, crud.start_time_entry, task_id=task_id, user_id=user_id, schema=TimeEntry
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if db_entry is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return db_entry
+
+
+@router.post("/task/{task_id}/stop", response_model=TimeEntry)
+async def stop_time_entry(task_id: int, db: AnySession = Depends(get_session)):
+    """Stop tracking time on a task, adding the entry's seconds to its time spent"""
+    try:
+        db_entry = await aio.run(db, crud.stop_time_entry, task_id=task_id, schema=TimeEntry)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if db_entry is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return db_entry
+
+
+@router.get(
+    "/task/{task_id}", response_model=list[TimeEntry], dependencies=[Depends(conditional_get(*TIME_TABLES))]
+)
+async def read_time_entries(
+    task_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = Depends(after_cursor),
+    db: AnySession = Depends(get_session),
+):
+    """Get a task's time entries, oldest first"""
+    entries = await aio.run(
+        db, crud.get_time_entries,
+        task_id=task_id, skip=skip, limit=limit, after_id=after_id, schema=TimeEntry,
+    )
+    if entries is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    set_next_cursor(response, entries, limit)
+    return entries
+
+
+@router.get("/active", response_model=list[TimeEntry], dependencies=[Depends(conditional_get(*TIME_TABLES))])
+async def read_active_time_entries(user_id: int | None = None, db: AnySession = Depends(get_session)):
+    """Get the running time entries, optionally only a user's"""
+    return await aio.run(db, crud.get_active_time_entries, user_id=user_id, schema=TimeEntry)
+
+
+@router.get("/rollup", response_model=list[TimeRollup], dependencies=[Depends(conditional_get(*TIME_TABLES))])
+async def read_time_rollup(
+    start: date | None = None,
+    end: date | None = None,
+    user_id: int | None = None,
+    task_id: int | None = None,
+    by: list[RollupKey] = Query(["day", "user"]),
+    db: AnySession = Depends(get_session),
+):
+    """Get seconds tracked per day, user and/or task (``by``) from stopped entries"""
+    return await aio.run(
+        db, crud.get_time_rollup,
+        start=start, end=end, user_id=user_id, task_id=task_id, by=by, schema=TimeRollup,
+    )
@@ -1,44 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List
 
-from app.database import get_db
+from app import config, serialization
+from app.database import AnySession, get_session
+from app.etags import USER_TABLES, conditional_get
+from app.pagination import after_cursor, set_next_cursor
 from app.schemas.user import User, UserCreate, UserUpdate
+from app.crud import aio
 from app.crud import user as crud
 
 router = APIRouter()
 
-@router.get("/", response_model=List[User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=List[User], dependencies=[Depends(conditional_get(*USER_TABLES))])
+async def read_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: int | None = Depends(after_cursor),
+    db: AnySession = Depends(get_session),
+):
     """Get all users"""
-    users = crud.get_users(db, skip=skip, limit=limit)
+    if config.FAST_JSON:
+        users = await aio.run(db, crud.get_users, skip=skip, limit=limit, after_id=after_id)
+        set_next_cursor(response, users, limit)
+        return serialization.render(response, serialization.USER.dicts(users))
+    users = await aio.run(db, crud.get_users, skip=skip, limit=limit, after_id=after_id, schema=User)
+    set_next_cursor(response, users, limit)
     return users
 
-@router.get("/{user_id}", response_model=User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+@router.get("/{user_id}", response_model=User, dependencies=[Depends(conditional_get(*USER_TABLES))])
+async def read_user(user_id: int, db: AnySession = Depends(get_session)):
     """Get a specific user by ID"""
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await aio.run(db, crud.get_user, user_id=user_id, schema=User)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AnySession = Depends(get_session)):
     """Create a new user"""
-    return crud.create_user(db=db, user=user)
+    return await aio.run(db, crud.create_user, user=user, schema=User)
 
 @router.put("/{user_id}", response_model=User)
-def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user: UserUpdate, db: AnySession = Depends(get_session)):
     """Update a user"""
-    db_user = crud.update_user(db=db, user_id=user_id, user=user)
+    db_user = await aio.run(db, crud.update_user, user_id=user_id, user=user, schema=User)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AnySession = Depends(get_session)):
     """Delete a user"""
-    success = crud.delete_user(db=db, user_id=user_id)
+    success = await aio.run(db, crud.delete_user, user_id=user_id)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return None
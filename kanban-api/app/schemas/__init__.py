@@ -3,3 +3,7 @@ from app.schemas.task import *
 from app.schemas.user import *
 from app.schemas.comment import *
 from app.schemas.tag import *
+from app.schemas.board import *
+from app.schemas.search import *
+from app.schemas.analytics import *
+from app.schemas.time_entry import *
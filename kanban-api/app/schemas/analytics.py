@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ColumnSummary(BaseModel):
+    id: str
+    # None for a status that is not one of the board's columns
+    title: str | None = None
+    tasks: int = 0
+    # Tasks whose end date has passed
+    overdue: int = 0
+
+
+class AssigneeLoad(BaseModel):
+    # None for unassigned tasks
+    id: int | None = None
+    name: str | None = None
+    tasks: int = 0
+    # Task counts per column id
+    by_column: dict[str, int] = {}
+
+
+class BoardSummary(BaseModel):
+    as_of: datetime
+    tasks: int = 0
+    overdue: int = 0
+    columns: list[ColumnSummary] = []
+    assignees: list[AssigneeLoad] = []
+
+
+class TagTime(BaseModel):
+    id: int
+    name: str | None = None
+    tasks: int = 0
+    time_spent: float = 0
+
+
+class AssigneeTime(BaseModel):
+    # None for unassigned tasks
+    id: int | None = None
+    name: str | None = None
+    tasks: int = 0
+    time_spent: float = 0
+
+
+class ColumnTime(BaseModel):
+    id: str
+    title: str | None = None
+    tasks: int = 0
+    time_spent: float = 0
+
+
+class TimeReport(BaseModel):
+    # Seconds, as in Task.time_spent
+    total: float = 0
+    by_tag: list[TagTime] = []
+    by_assignee: list[AssigneeTime] = []
+    by_column: list[ColumnTime] = []
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+
+from app.schemas.column import Column
+from app.schemas.comment import Comment
+from app.schemas.tag import Tag
+from app.schemas.task import Task, TaskSummary
+from app.schemas.user import User
+
+
+class Board(BaseModel):
+    # Change log version the snapshot includes; pass it to /api/board/changes as `since`
+    version: int = 0
+    columns: list[Column] = []
+    # TaskSummary cards with view=summary
+    tasks: list[Task | TaskSummary] = []
+    users: list[User] = []
+    tags: list[Tag] = []
+
+
+class BoardDeletions(BaseModel):
+    columns: list[str] = []
+    tasks: list[int] = []
+    comments: list[int] = []
+    tags: list[int] = []
+
+
+class BoardChanges(BaseModel):
+    version: int
+    # The requested version is no longer in the change log; reload the board instead
+    reset: bool = False
+    # More changes are waiting; request again from `version`
+    has_more: bool = False
+    columns: list[Column] = []
+    tasks: list[Task] = []
+    comments: list[Comment] = []
+    tags: list[Tag] = []
+    deleted: BoardDeletions = BoardDeletions()
@@ -8,6 +8,8 @@ class ColumnBase(BaseModel):
 
 class ColumnCreate(ColumnBase):
     id: str
+    # Where the column goes on the board; omitted means the end
+    position: int | None = None
 
 
 class ColumnUpdate(BaseModel):
@@ -15,8 +17,15 @@ class ColumnUpdate(BaseModel):
     position: int | None = None
 
 
+class ColumnMove(BaseModel):
+    # Neighbours on the board: the column goes after after_id and before before_id
+    after_id: str | None = None
+    before_id: str | None = None
+
+
 class Column(ColumnBase):
     id: str
+    rank: str | None = None
     task_ids: list[int] = []
 
     class Config:
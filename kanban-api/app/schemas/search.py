@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    id: int
+    title: str | None = None
+    status: str | None = None
+    # Title and best matching passage with the matched words wrapped in <mark>
+    highlight: str | None = None
+    snippet: str | None = None
+    score: float
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Union
+from pydantic import BaseModel, model_validator
+from typing import Any, List, Literal, Optional, Union
 from datetime import datetime
 
 from app.schemas.comment import Comment
@@ -17,6 +17,8 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     pass
 
+TRACKING_FIELDS = ("time_spent", "is_tracking", "tracking_start_time")
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -25,16 +27,57 @@ class TaskUpdate(BaseModel):
     status: Optional[str] = None
     priority: Optional[str] = None
     assignee_id: Optional[Union[int, None]] = None
-    time_spent: Optional[float] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def reject_tracking_fields(cls, data: Any) -> Any:
+        """time_spent and the tracking state are only changed by starting and stopping time entries
+        (see app.crud.time_entry), so an update setting them is refused rather than half applied"""
+        if isinstance(data, dict):
+            fields = [field for field in TRACKING_FIELDS if field in data]
+            if fields:
+                raise ValueError(f"{', '.join(fields)} can only be changed through /api/time")
+        return data
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+class TaskBulkResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    ok: bool = True
+    error: Optional[str] = None
+
+class TaskFilter(BaseModel):
+    """Filters for task lists; list fields match any of their values, empty means unfiltered"""
+    assignee_id: List[int] = []
+    priority: List[str] = []
+    tag_id: List[int] = []
+    # "any": tasks with at least one of tag_id, "all": tasks with every one of them
+    tag_match: Literal["any", "all"] = "any"
+    start_date_from: Optional[datetime] = None
+    start_date_to: Optional[datetime] = None
+    end_date_from: Optional[datetime] = None
+    end_date_to: Optional[datetime] = None
     is_tracking: Optional[bool] = None
-    tracking_start_time: Optional[Union[datetime, None]] = None
+    updated_since: Optional[datetime] = None
+
+class TaskMove(BaseModel):
+    status: str
+    # Neighbours in the target column: the task goes after after_id and before before_id
+    after_id: Optional[int] = None
+    before_id: Optional[int] = None
 
 class TaskTimeTrackingUpdate(BaseModel):
     is_tracking: bool
     tracking_start_time: Optional[datetime] = None
 
+# "detail": full tasks with comments and tags; "summary": TaskSummary, what a board card shows
+TaskView = Literal["summary", "detail"]
+
 class Task(TaskBase):
     id: int
+    rank: Optional[str] = None
     time_spent: float = 0
     is_tracking: bool = False
     tracking_start_time: Optional[datetime] = None
@@ -45,3 +88,20 @@ class Task(TaskBase):
 
     class Config:
         from_attributes = True
+
+class TaskSummary(BaseModel):
+    """A task as a card shows it: no description, tag ids instead of tags and a count instead of comments"""
+    id: int
+    title: str
+    status: str
+    priority: str = "medium"
+    assignee_id: Optional[int] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    rank: Optional[str] = None
+    time_spent: float = 0
+    is_tracking: bool = False
+    tracking_start_time: Optional[datetime] = None
+    updated_at: datetime
+    tag_ids: List[int] = []
+    comment_count: int = 0
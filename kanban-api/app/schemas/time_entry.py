@@ -0,0 +1,30 @@
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+
+class TimeEntryStart(BaseModel):
+    # Defaults to the task's assignee
+    user_id: int | None = None
+
+class TimeEntry(BaseModel):
+    id: int
+    task_id: int
+    user_id: int | None = None
+    started_at: datetime
+    # Both unset while the entry is running
+    stopped_at: datetime | None = None
+    seconds: float | None = None
+
+    class Config:
+        from_attributes = True
+
+class TimeRollup(BaseModel):
+    # Only the keys the rollup was summed per are set; user_id is also unset for time tracked without a user
+    day: date | None = None
+    user_id: int | None = None
+    task_id: int | None = None
+    seconds: float = 0
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,195 @@
+"""Full-text search index over task titles, descriptions and comments.
+
+On SQLite an FTS5 table, ``task_search``, holds one row per task (its rowid is
+the task id) with the task's title, description and the text of its comments.
+Triggers on ``tasks`` and ``comments`` keep it current, so ORM writes, bulk
+statements and the importer need no extra code. Ranking is BM25 with the title
+weighted above the description and comments, over at most the newest
+``MAX_RANKED_MATCHES`` matches; older matches follow the ranked ones, newest
+first.
+
+On PostgreSQL there is no extra table: GIN indexes over ``to_tsvector`` of the
+same text on ``tasks`` and ``comments`` serve the match, and ``ts_rank`` orders
+the results.
+
+The index is created by migration 0006 and by ``Base.metadata.create_all``
+(see ``app.models.models``).
+"""
+
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import column, table, text
+from sqlalchemy.engine import Connection
+
+from app.triggers import sqlite_objects, triggers_suspended
+
+SEARCH_TABLE = "task_search"
+
+# Text search configuration for PostgreSQL's to_tsvector/to_tsquery
+TS_CONFIG = "english"
+
+# Words of a query beyond this are ignored
+MAX_QUERY_TERMS = 16
+
+# Only the newest this many matches of a query are ranked; older ones are listed after them, newest
+# first. Scoring every match of a word found in most tasks takes the better part of a second on a
+# million tasks; this bound keeps it in milliseconds, and queries with fewer matches (nearly all real
+# ones) are ranked exactly
+MAX_RANKED_MATCHES = 2000
+
+# Relative BM25 weights of title, description and comments
+COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# Words around a match in a snippet
+SNIPPET_WORDS = 16
+
+SQLITE_TABLE_DDL = (
+    # prefix indexes make the trailing prefix term of a query an index lookup
+    f"""CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+        title, description, comments, tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank)"
+    f" VALUES ('rank', 'bm25({', '.join(map(str, COLUMN_WEIGHTS))})')",
+)
+
+SQLITE_TRIGGERS = {
+    f"{SEARCH_TABLE}_task_insert": f"""AFTER INSERT ON tasks BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"{SEARCH_TABLE}_task_update": f"""AFTER UPDATE OF title, description ON tasks BEGIN
+        UPDATE {SEARCH_TABLE} SET title = new.title, description = new.description WHERE rowid = new.id;
+    END""",
+    f"{SEARCH_TABLE}_task_delete": f"""AFTER DELETE ON tasks BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END""",
+    f"{SEARCH_TABLE}_comment_insert": f"""AFTER INSERT ON comments BEGIN
+        UPDATE {SEARCH_TABLE} SET comments = coalesce(comments || char(10), '') || new.text
+        WHERE rowid = new.task_id;
+    END""",
+    # Edits and deletes rebuild the task's comment text, for the old and the new task when a comment moves
+    f"{SEARCH_TABLE}_comment_update": f"""AFTER UPDATE OF text, task_id ON comments BEGIN
+        UPDATE {SEARCH_TABLE}
+        SET comments = (
+            SELECT group_concat(text, char(10)) FROM comments WHERE task_id = {SEARCH_TABLE}.rowid
+        )
+        WHERE rowid IN (old.task_id, new.task_id);
+    END""",
+    f"{SEARCH_TABLE}_comment_delete": f"""AFTER DELETE ON comments BEGIN
+        UPDATE {SEARCH_TABLE}
+        SET comments = (SELECT group_concat(text, char(10)) FROM comments WHERE task_id = old.task_id)
+        WHERE rowid = old.task_id;
+    END""",
+}
+
+# Bulk inserts index their rows with one executemany instead of these (see ``insert_triggers_suspended``)
+SQLITE_INSERT_TRIGGERS = (f"{SEARCH_TABLE}_task_insert", f"{SEARCH_TABLE}_comment_insert")
+
+SQLITE_BACKFILL = f"""INSERT INTO {SEARCH_TABLE}(rowid, title, description, comments)
+    SELECT id, title, description,
+        (SELECT group_concat(text, char(10)) FROM comments WHERE task_id = tasks.id)
+    FROM tasks"""
+
+SQLITE_INDEX_ROW = f"INSERT INTO {SEARCH_TABLE}(rowid, title, description, comments) VALUES (?, ?, ?, ?)"
+
+SQLITE_REINDEX_COMMENTS = f"""UPDATE {SEARCH_TABLE}
+    SET comments = (SELECT group_concat(text, char(10)) FROM comments WHERE task_id = {SEARCH_TABLE}.rowid)
+    WHERE rowid = ?"""
+
+# For selecting from the FTS5 table with Core
+search_table = table(SEARCH_TABLE, column("rowid"), column("rank"))
+
+
+def task_vector(prefix: str = "") -> str:
+    """tsvector of a task's title (weight A) and description (weight B), the GIN index's expression"""
+    return (
+        f"setweight(to_tsvector('{TS_CONFIG}', coalesce({prefix}title, '')), 'A')"
+        f" || setweight(to_tsvector('{TS_CONFIG}', coalesce({prefix}description, '')), 'B')"
+    )
+
+
+def comment_vector(prefix: str = "") -> str:
+    return f"to_tsvector('{TS_CONFIG}', coalesce({prefix}text, ''))"
+
+
+POSTGRES_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING gin (({task_vector()}))",
+    f"CREATE INDEX IF NOT EXISTS ix_comments_search ON comments USING gin (({comment_vector()}))",
+)
+
+POSTGRES_DROP = (
+    "DROP INDEX IF EXISTS ix_comments_search",
+    "DROP INDEX IF EXISTS ix_tasks_search",
+)
+
+
+def create_search_index(connection: Connection) -> None:
+    """Create the index for the connection's backend and fill it from existing rows; a no-op if it exists"""
+    if connection.dialect.name == "sqlite":
+        if sqlite_objects(connection, "table", [SEARCH_TABLE]):
+            return
+        triggers = (f"CREATE TRIGGER {name} {body}" for name, body in SQLITE_TRIGGERS.items())
+        statements = [*SQLITE_TABLE_DDL, *triggers]
+        statements.append(SQLITE_BACKFILL)
+    elif connection.dialect.name == "postgresql":
+        statements = POSTGRES_DDL
+    else:
+        statements = ()
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def drop_search_index(connection: Connection) -> None:
+    if connection.dialect.name == "sqlite":
+        triggers = (f"DROP TRIGGER IF EXISTS {name}" for name in SQLITE_TRIGGERS)
+        statements = [*triggers, f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+    elif connection.dialect.name == "postgresql":
+        statements = POSTGRES_DROP
+    else:
+        statements = ()
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+@contextmanager
+def insert_triggers_suspended(connection: Connection) -> Iterator[bool]:
+    """Suspend the SQLite insert triggers for the body of a ``with`` (see ``app.triggers``).
+
+    Yields whether rows inserted meanwhile must be indexed with ``index_tasks``
+    or ``reindex_comments``: a trigger costs several times more per row than
+    one executemany into the FTS5 table.
+    """
+    with triggers_suspended(connection, SQLITE_TRIGGERS, SQLITE_INSERT_TRIGGERS) as suspended:
+        yield suspended
+
+
+def index_tasks(connection: Connection, rows: list[tuple]) -> None:
+    """Add (id, title, description, comment text) rows for new tasks to the SQLite index"""
+    if rows:
+        connection.exec_driver_sql(SQLITE_INDEX_ROW, rows)
+
+
+def reindex_comments(connection: Connection, task_ids) -> None:
+    """Rebuild the indexed comment text of ``task_ids`` on SQLite"""
+    if task_ids:
+        connection.exec_driver_sql(SQLITE_REINDEX_COMMENTS, [(task_id,) for task_id in task_ids])
+
+
+def query_terms(q: str) -> list[str]:
+    """The words of a user's query, lowercased; punctuation and search operators are dropped"""
+    return re.findall(r"\w+", q.lower())[:MAX_QUERY_TERMS]
+
+
+def fts5_query(terms: list[str]) -> str:
+    """Every term must match, the last one as a prefix (search as you type)"""
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += "*"
+    return " ".join(phrases)
+
+
+def tsquery(terms: list[str]) -> str:
+    """``fts5_query`` in to_tsquery syntax"""
+    return " & ".join(terms) + ":*"
@@ -0,0 +1,173 @@
+"""Opt-in fast JSON path for list and board responses (KANBAN_FAST_JSON).
+
+By default FastAPI validates every returned ORM object against the endpoint's
+``response_model`` and walks the result again with ``jsonable_encoder``, one
+attribute at a time; with nested comments and tags that dominates the cost of a
+large task list. The fast path selects exactly the schema's columns as Core
+rows, zips them into dicts and encodes them in one ``orjson.dumps`` call.
+
+Endpoints keep their ``response_model``, so the OpenAPI schema is unchanged;
+returning a ``Response`` directly is what makes FastAPI skip validation.
+
+Task summaries (``view=summary``) are built here in either mode: only the
+columns ``TaskSummary`` renders are selected, and comments and tags are
+reduced to a count and ids (see ``crud.task.get_task_summary_rows``).
+"""
+
+from collections.abc import Iterable
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import Row
+from sqlalchemy.orm import Session
+
+from app import config
+from app.crud import board as board_crud
+from app.crud import column as column_crud
+from app.crud import task as task_crud
+from app.models import models
+from app.schemas.comment import Comment
+from app.schemas.tag import Tag
+from app.schemas.task import Task, TaskFilter, TaskSummary
+from app.schemas.user import User
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if config.FAST_JSON and orjson is None:
+    raise RuntimeError("KANBAN_FAST_JSON needs the orjson package installed (the \"fast\" extra)")
+
+
+class RowSerializer:
+    """Compiled once per schema: the table columns it renders, selected in table order"""
+
+    def __init__(self, schema: type[BaseModel], model):
+        self.columns = tuple(
+            column for column in model.__table__.columns if column.key in schema.model_fields
+        )
+
+    @staticmethod
+    def dicts(rows: Iterable[Row]) -> list[dict]:
+        rows = list(rows)
+        if not rows:
+            return []
+        # Every row of one result has the same keys
+        fields = rows[0]._fields
+        return [dict(zip(fields, row, strict=True)) for row in rows]
+
+
+TASK = RowSerializer(Task, models.Task)
+TASK_SUMMARY = RowSerializer(TaskSummary, models.Task)
+COMMENT = RowSerializer(Comment, models.Comment)
+TAG = RowSerializer(Tag, models.Tag)
+USER = RowSerializer(User, models.User)
+
+
+def render(response: Response, content) -> Response:
+    """Encode ``content`` with orjson, keeping the headers dependencies set on ``response`` (ETag, cursors)"""
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(orjson.dumps(content), media_type="application/json", headers=headers)
+
+
+def task_dicts(task_rows: list[Row], comment_rows: list[Row] | None, task_tag_rows: list[Row]) -> list[dict]:
+    """Task dicts with their tags, and with their comments unless ``comment_rows`` is None"""
+    tasks = TASK.dicts(task_rows)
+    by_id = {}
+    for task in tasks:
+        if comment_rows is not None:
+            task["comments"] = []
+        task["tags"] = []
+        by_id[task["id"]] = task
+    for comment in COMMENT.dicts(comment_rows or ()):
+        by_id[comment["task_id"]]["comments"].append(comment)
+    if task_tag_rows:
+        # Rows are (task_id, *tag columns)
+        tag_fields = task_tag_rows[0]._fields[1:]
+        for task_id, *tag in task_tag_rows:
+            by_id[task_id]["tags"].append(dict(zip(tag_fields, tag, strict=True)))
+    return tasks
+
+
+def tasks_content(
+    db: Session, status: str | None = None, skip: int = 0, limit: int = 100, after_id: int | None = None,
+    filters: TaskFilter | None = None, order_by: list[tuple] | None = None,
+) -> list[dict]:
+    """The ``GET /api/tasks/`` page as plain dicts"""
+    task_rows = task_crud.get_task_rows(
+        db, TASK.columns, status=status, skip=skip, limit=limit, after_id=after_id, filters=filters,
+        order_by=order_by,
+    )
+    comment_rows, task_tag_rows = task_crud.get_task_relation_rows(
+        db, [row.id for row in task_rows], COMMENT.columns, TAG.columns
+    )
+    return task_dicts(task_rows, comment_rows, task_tag_rows)
+
+
+def task_summary_dicts(
+    task_rows: list[Row], comment_count_rows: list[Row], task_tag_id_rows: list[Row]
+) -> list[dict]:
+    tasks = TASK_SUMMARY.dicts(task_rows)
+    by_id = {}
+    for task in tasks:
+        task["tag_ids"] = []
+        task["comment_count"] = 0
+        by_id[task["id"]] = task
+    for task_id, count in comment_count_rows:
+        by_id[task_id]["comment_count"] = count
+    for task_id, tag_id in task_tag_id_rows:
+        by_id[task_id]["tag_ids"].append(tag_id)
+    return tasks
+
+
+def task_summaries_content(
+    db: Session, status: str | None = None, skip: int = 0, limit: int = 100, after_id: int | None = None,
+    filters: TaskFilter | None = None, order_by: list[tuple] | None = None,
+) -> list[dict]:
+    """The ``GET /api/tasks/?view=summary`` page as plain dicts"""
+    task_rows = task_crud.get_task_rows(
+        db, TASK_SUMMARY.columns, status=status, skip=skip, limit=limit, after_id=after_id, filters=filters,
+        order_by=order_by,
+    )
+    comment_count_rows, task_tag_id_rows = task_crud.get_task_summary_rows(db, [row.id for row in task_rows])
+    return task_summary_dicts(task_rows, comment_count_rows, task_tag_id_rows)
+
+
+def _column_dicts(
+    column_rows: list[Row], task_ids: dict[str, list[int]], first_position: int = 0
+) -> list[dict]:
+    return [
+        {"title": row.title, "position": first_position + i, "id": row.id, "rank": row.rank,
+         "task_ids": task_ids.get(row.id, [])}
+        for i, row in enumerate(column_rows)
+    ]
+
+
+def columns_content(db: Session, skip: int = 0, limit: int = 100) -> list[dict]:
+    """The ``GET /api/columns/`` page as plain dicts"""
+    column_rows = column_crud.get_columns(db, skip=skip, limit=limit)
+    task_ids = column_crud.get_column_task_ids(db, column_ids=[row.id for row in column_rows])
+    return _column_dicts(column_rows, task_ids, first_position=skip)
+
+
+def board_content(db: Session, view: str = "detail") -> dict:
+    """The ``GET /api/board/`` body as plain dicts"""
+    if view == "summary":
+        board = board_crud.get_board_summary_rows(db, TASK_SUMMARY.columns)
+        tasks = task_summary_dicts(board["tasks"], board["comment_counts"], board["tag_ids"])
+    else:
+        board = board_crud.get_board_rows(db, TASK.columns, COMMENT.columns, TAG.columns)
+        tasks = task_dicts(board["tasks"], board["comments"], board["task_tags"])
+
+    task_ids: dict[str, list[int]] = {}
+    for task in tasks:
+        task_ids.setdefault(task["status"], []).append(task["id"])
+
+    return {
+        "version": board["version"],
+        "columns": _column_dicts(board["columns"], task_ids),
+        "tasks": tasks,
+        "users": USER.dicts(board["users"]),
+        "tags": TAG.dicts(board["tags"]),
+    }
@@ -0,0 +1,44 @@
+"""Helpers for the SQLite triggers that keep derived tables current.
+
+The full-text index (``app.search``) and the analytics summary tables
+(``app.analytics``) are maintained by triggers on SQLite. Bulk inserts can
+suspend the per-row insert triggers and update the derived tables with a few
+set-based statements instead.
+"""
+
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+
+
+def sqlite_objects(connection: Connection, kind: str, names) -> set[str]:
+    """Which of ``names`` exist as schema objects of ``kind`` ("table", "trigger", ...)"""
+    found = connection.execute(
+        text("SELECT name FROM sqlite_master WHERE type = :kind AND name IN :names").bindparams(
+            bindparam("names", expanding=True)
+        ),
+        {"kind": kind, "names": list(names)},
+    )
+    return set(found.scalars())
+
+
+@contextmanager
+def triggers_suspended(connection: Connection, triggers: Mapping[str, str], names) -> Iterator[bool]:
+    """Drop the SQLite triggers ``names`` for the body of a ``with``, recreating them from
+    ``triggers`` afterwards.
+
+    Yields whether any were dropped, i.e. whether rows written meanwhile must
+    be applied to the derived tables by the caller. DDL is transactional in
+    SQLite, so other connections never see the triggers missing, and a rollback
+    restores them as well.
+    """
+    suspended = sqlite_objects(connection, "trigger", names) if connection.dialect.name == "sqlite" else ()
+    for name in suspended:
+        connection.execute(text(f"DROP TRIGGER {name}"))
+    try:
+        yield bool(suspended)
+    finally:
+        for name in suspended:
+            connection.execute(text(f"CREATE TRIGGER {name} {triggers[name]}"))
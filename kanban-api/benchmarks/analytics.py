@@ -0,0 +1,71 @@
+"""Analytics endpoint latency against board size.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.analytics [--tasks 10000,100000,1000000]
+
+For each size, fills a fresh SQLite database file with the synthetic board of
+``benchmarks.task_filters`` and times ``crud.get_board_summary`` and
+``crud.get_time_report`` read from the summary tables and computed live with
+GROUP BY queries, checking that both give the same result. Times are the best
+of five runs.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from functools import partial
+
+from sqlalchemy.orm import Session
+
+from app.cache import read_cache
+from app.crud.analytics import get_board_summary, get_time_report
+from app.database import create_db_engine
+from benchmarks.task_filters import EPOCH, load
+
+# A fixed clock, a year into the dataset's dates
+NOW = EPOCH.replace(year=EPOCH.year + 1)
+
+
+def best_ms(call) -> tuple[float, object]:
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        result = call()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2), result
+
+
+def run(tasks: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'analytics.db')}")
+        load(engine, tasks)
+        read_cache.clear()
+        result = {"tasks": tasks}
+        with Session(engine) as db:
+            for name, call in (
+                ("summary", lambda live: get_board_summary(db, now=NOW, live=live)),
+                ("time", lambda live: get_time_report(db, live=live)),
+            ):
+                cached_ms, cached = best_ms(partial(call, False))
+                live_ms, live = best_ms(partial(call, True))
+                if json.dumps(cached, default=str) != json.dumps(live, default=str):
+                    raise SystemExit(
+                        f"{name}: summary tables disagree with the live queries at {tasks} tasks"
+                    )
+                result[name] = {"summary_tables_ms": cached_ms, "live_ms": live_ms}
+        engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", default="10000,100000,1000000", help="comma-separated board sizes")
+    args = parser.parse_args()
+    print(json.dumps([run(int(size)) for size in args.tasks.split(",")], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Shared helpers for the API benchmarks.
+
+Benchmarks run against a private in-memory SQLite database wired into the app
+through a ``get_db`` dependency override, so they never touch ``kanban.db``.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.board import rebalance_board_ranks
+from app.database import Base, create_db_engine, get_db
+from app.models.models import Comment, KanbanColumn, Tag, Task, User
+
+COLUMN_IDS = ["todo", "in-progress", "review", "done"]
+
+
+def make_engine(url: str = "sqlite://"):
+    """Create an engine and schema for a benchmark run."""
+    engine = create_db_engine(url)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_client(engine) -> TestClient:
+    """Return a TestClient whose requests use sessions bound to ``engine``."""
+    from main import app
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Not used as a context manager: startup events would touch the real database.
+    return TestClient(app)
+
+
+def seed(
+    engine, tasks: int, comments_per_task: int = 2, tags_per_task: int = 2, users: int = 5, tags: int = 5
+):
+    """Insert a synthetic board with the given number of tasks."""
+    SessionLocal = sessionmaker(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add_all(KanbanColumn(id=col, title=col, position=i) for i, col in enumerate(COLUMN_IDS))
+        db_users = [User(name=f"user-{i}", avatar=f"U{i}") for i in range(users)]
+        db_tags = [Tag(name=f"tag-{i}") for i in range(tags)]
+        db.add_all(db_users + db_tags)
+        db.flush()
+
+        now = datetime.utcnow()
+        for i in range(tasks):
+            task = Task(
+                title=f"Task {i}",
+                description=f"Description for task {i}",
+                start_date=now,
+                end_date=now + timedelta(days=i % 14),
+                status=COLUMN_IDS[i % len(COLUMN_IDS)],
+                priority=("low", "medium", "high")[i % 3],
+                assignee_id=db_users[i % users].id,
+            )
+            task.tags = [db_tags[(i + j) % tags] for j in range(min(tags_per_task, tags))]
+            task.comments = [
+                Comment(text=f"Comment {j} on task {i}", author_id=db_users[j % users].id)
+                for j in range(comments_per_task)
+            ]
+            db.add(task)
+        db.commit()
+        rebalance_board_ranks(db)
+    finally:
+        db.close()
+
+
+@contextmanager
+def count_queries(engine):
+    """Count the SQL statements executed on ``engine`` inside the block."""
+    counter = {"count": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
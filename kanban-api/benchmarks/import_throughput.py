@@ -0,0 +1,94 @@
+"""Bulk import throughput for CSV and NDJSON task files.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.import_throughput [--tasks 100000] [--chunk-size 5000]
+
+Generates a file of ``--tasks`` tasks (each with an assignee, two tags and
+dates; NDJSON tasks also carry a comment), imports it into a fresh SQLite
+database file with ``app.importer.import_stream`` and reports tasks per second,
+parsing included.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import Session
+
+from app.database import Base, create_db_engine
+from app.importer import IMPORT_CHUNK_SIZE, import_stream
+from benchmarks.common import seed
+
+STATUSES = ("todo", "in-progress", "done")
+
+
+def records(tasks: int):
+    for i in range(tasks):
+        yield {
+            "title": f"Imported task {i}",
+            "description": "Generated for the import benchmark",
+            "status": STATUSES[i % len(STATUSES)],
+            "priority": "medium",
+            "assignee": f"user {i % 20}",
+            "tags": [f"tag {i % 7}", f"tag {i % 11}"],
+            "start_date": "2024-01-01T09:00:00",
+            "end_date": "2024-01-05T17:00:00",
+            "time_spent": 1.5,
+        }
+
+
+def csv_file(tasks: int) -> bytes:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(next(records(1))))
+    writer.writeheader()
+    for record in records(tasks):
+        writer.writerow({**record, "tags": ";".join(record["tags"])})
+    return out.getvalue().encode()
+
+
+def ndjson_file(tasks: int) -> bytes:
+    comment = [{"text": "Imported comment", "author": "user 0"}]
+    return "".join(json.dumps({**record, "comments": comment}) + "\n" for record in records(tasks)).encode()
+
+
+def run(fmt: str, data: bytes, tasks: int, chunk_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        seed(engine, tasks=0)
+        with Session(engine) as db:
+            started = time.perf_counter()
+            # The last event is the summary
+            *_, summary = import_stream(db, "tasks", io.BytesIO(data), fmt, chunk_size)
+            elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    return {
+        "format": fmt,
+        "imported": summary["imported"],
+        "failed": summary["failed"],
+        "seconds": round(elapsed, 3),
+        "tasks_per_second": round(tasks / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    results = [
+        run("csv", csv_file(args.tasks), args.tasks, args.chunk_size),
+        run("ndjson", ndjson_file(args.tasks), args.tasks, args.chunk_size),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
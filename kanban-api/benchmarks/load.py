@@ -0,0 +1,404 @@
+"""Load test of every router against seeded boards, with a regression check.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.load run [--tasks 1000,100000,1000000] [--requests 200] [--warmup 10]
+                                  [--concurrency 4] [--db-dir /tmp/kanban-load] [--async-db] [--seed 0]
+                                  [--out results.json]
+    python -m benchmarks.load compare base.json new.json [--threshold 0.2] [--p99-threshold 1] [--min-ms 1]
+
+``run`` seeds a SQLite board per size with ``python -m app.cli seed --tasks N``
+(two comments and up to two tags per task), once: the seeded file is kept in
+``--db-dir`` and copied before every run, so each run starts from the same data.
+A child process per size then serves the app in-process through
+``httpx.AsyncClient`` over ``ASGITransport`` and sends ``--requests`` requests
+per scenario, after ``--warmup`` untimed ones, from ``--concurrency`` concurrent
+clients, reads first, then writes. Requests are drawn from ``--seed``, so two
+runs send the same ones.
+
+Per scenario it reports latency percentiles, throughput, SQL statements per
+request (counted by a cursor hook, as ``benchmarks.common.count_queries``) and
+non-2xx responses, as JSON. Scenarios whose responses grow with the board (the
+whole board, the full export) are skipped above ``max_tasks``; the change
+feed's event stream never ends and is not requested.
+
+``compare`` exits non-zero if any scenario of the second run is slower than the
+first by more than ``--threshold`` (p50 or throughput) or ``--p99-threshold``
+(p99, which a garbage collection or WAL checkpoint in a few requests moves a
+lot), ignoring latency changes under ``--min-ms``, issues at least one more
+statement per request or fails more requests.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parent.parent
+SIZES = (1000, 100_000, 1_000_000)
+
+STATUSES = ("todo", "in-progress", "review", "done")
+
+
+@dataclass
+class Board:
+    """What the seeded board holds (see ``app.init_db.init_synthetic_db``), plus ids created while writing"""
+    tasks: int
+    users: int = 50
+    tags: int = 30
+    created: list[int] = field(default_factory=list)
+    tracked: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    # (board, rng) -> (method, url, httpx request keywords)
+    request: object
+    max_tasks: int | None = None
+    # Called with the board and the response body of every successful request
+    record: object = None
+
+
+def _task(board: Board, rng: random.Random) -> int:
+    return rng.randint(1, board.tasks)
+
+
+def _new_task(board: Board, rng: random.Random) -> dict:
+    return {
+        "title": f"load test {rng.randrange(10**6)}", "description": "word1 word2 word3",
+        "status": rng.choice(STATUSES), "priority": rng.choice(("low", "medium", "high")),
+        "assignee_id": rng.randint(1, board.users),
+    }
+
+
+def _import_body(board: Board, rng: random.Random) -> bytes:
+    records = [{**_new_task(board, rng), "tags": [f"tag {rng.randint(1, board.tags)}"]} for _ in range(100)]
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+def _tracked(board: Board, rng: random.Random) -> int:
+    task_id = _task(board, rng)
+    while task_id in board.tracked:
+        task_id = _task(board, rng)
+    board.tracked.append(task_id)
+    return task_id
+
+
+SCENARIOS = [
+    Scenario("health", lambda b, r: ("GET", "/api/health", {})),
+    Scenario("columns", lambda b, r: ("GET", "/api/columns/", {})),
+    Scenario("column", lambda b, r: ("GET", f"/api/columns/{r.choice(STATUSES)}", {})),
+    Scenario("tasks", lambda b, r: ("GET", "/api/tasks/", {"params": {
+        "limit": 100, "skip": r.randrange(0, b.tasks, 100),
+    }})),
+    Scenario("tasks summary", lambda b, r: ("GET", "/api/tasks/", {"params": {
+        "limit": 100, "view": "summary",
+    }})),
+    Scenario("tasks by status", lambda b, r: ("GET", "/api/tasks/", {"params": {
+        "status": r.choice(STATUSES), "limit": 100,
+    }})),
+    Scenario("tasks filtered", lambda b, r: ("GET", "/api/tasks/", {"params": {
+        "assignee_id": r.randint(1, b.users), "tag_id": r.randint(1, 5), "priority": "high",
+        "sort": "-end_date,id", "limit": 50,
+    }})),
+    Scenario("task", lambda b, r: ("GET", f"/api/tasks/{_task(b, r)}", {})),
+    Scenario("board", lambda b, r: ("GET", "/api/board/", {}), max_tasks=10_000),
+    Scenario(
+        "board summary", lambda b, r: ("GET", "/api/board/", {"params": {"view": "summary"}}),
+        max_tasks=10_000,
+    ),
+    Scenario("board changes", lambda b, r: ("GET", "/api/board/changes", {"params": {
+        "since": 0, "limit": 100,
+    }})),
+    Scenario("users", lambda b, r: ("GET", "/api/users/", {})),
+    Scenario("user", lambda b, r: ("GET", f"/api/users/{r.randint(1, b.users)}", {})),
+    Scenario("tags", lambda b, r: ("GET", "/api/tags/", {})),
+    Scenario("tag", lambda b, r: ("GET", f"/api/tags/{r.randint(1, b.tags)}", {})),
+    Scenario("comments", lambda b, r: ("GET", f"/api/comments/task/{_task(b, r)}", {})),
+    # word0 is in nearly every task, word500 in a few percent
+    Scenario("search", lambda b, r: ("GET", "/api/search/", {"params": {
+        "q": f"word{r.choice((0, 10, 500, 4000))}",
+    }})),
+    Scenario("analytics summary", lambda b, r: ("GET", "/api/analytics/summary", {})),
+    Scenario("analytics time", lambda b, r: ("GET", "/api/analytics/time", {})),
+    Scenario("export comments of task", lambda b, r: ("GET", "/api/export/comments.ndjson", {"params": {
+        "task_id": _task(b, r),
+    }})),
+    Scenario("export tasks", lambda b, r: ("GET", "/api/export/tasks.ndjson", {}), max_tasks=10_000),
+    Scenario("time rollup", lambda b, r: ("GET", "/api/time/rollup", {"params": {"by": ["user"]}})),
+    Scenario("time active", lambda b, r: ("GET", "/api/time/active", {})),
+    Scenario("metrics", lambda b, r: ("GET", "/metrics", {})),
+    Scenario(
+        "task create", lambda b, r: ("POST", "/api/tasks/", {"json": _new_task(b, r)}),
+        record=lambda b, body: b.created.append(body["id"]),
+    ),
+    Scenario("task update", lambda b, r: ("PUT", f"/api/tasks/{_task(b, r)}", {"json": {
+        "priority": r.choice(("low", "high")),
+    }})),
+    Scenario("task move", lambda b, r: ("POST", f"/api/tasks/{_task(b, r)}/move", {"json": {
+        "status": r.choice(STATUSES),
+    }})),
+    Scenario("task tag", lambda b, r: ("POST", f"/api/tasks/{_task(b, r)}/tags/{r.randint(1, b.tags)}", {})),
+    Scenario("tasks bulk update", lambda b, r: ("PATCH", "/api/tasks/bulk", {"json": [
+        {"id": _task(b, r), "priority": r.choice(("low", "medium"))} for _ in range(50)
+    ]})),
+    Scenario("comment create", lambda b, r: ("POST", "/api/comments/", {"json": {
+        "text": "word1 word7 word42", "task_id": _task(b, r), "author_id": r.randint(1, b.users),
+    }})),
+    Scenario("time start", lambda b, r: ("POST", f"/api/time/task/{_tracked(b, r)}/start", {})),
+    # Stops what "time start" started, in the same order
+    Scenario("time stop", lambda b, r: (
+        "POST", f"/api/time/task/{b.tracked.pop(0) if b.tracked else 1}/stop", {}
+    )),
+    Scenario("import 100 tasks", lambda b, r: (
+        "POST", "/api/import/tasks",
+        {"content": _import_body(b, r), "headers": {"content-type": "application/x-ndjson"}},
+    )),
+    Scenario("task delete", lambda b, r: (
+        "DELETE", f"/api/tasks/{b.created.pop() if b.created else _task(b, r)}", {}
+    )),
+]
+
+
+# Statements executed on behalf of the request being sent; each client coroutine sets its own counter
+request_queries: ContextVar[list | None] = ContextVar("load_request_queries", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted ``values``"""
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+async def run_scenario(
+    client, board: Board, scenario: Scenario, requests: int, concurrency: int, seed: int, warmup: int
+) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    latencies, queries, errors = [], [], 0
+
+    async def worker(next_request, measured: bool):
+        nonlocal errors
+        for _ in next_request:
+            method, url, kwargs = scenario.request(board, rng)
+            counter = [0]
+            token = request_queries.set(counter)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                request_queries.reset(token)
+            if response.is_success and scenario.record is not None:
+                scenario.record(board, response.json())
+            if measured:
+                latencies.append(elapsed)
+                queries.append(counter[0])
+                errors += not response.is_success
+
+    # Untimed requests first, so caches and the connection pool are warm
+    warmups = iter(range(warmup))
+    await asyncio.gather(*(worker(warmups, measured=False) for _ in range(concurrency)))
+    next_request = iter(range(requests))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(next_request, measured=True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / requests * 1000, 3),
+        "rps": round(requests / elapsed, 1),
+        "queries_per_request": round(sum(queries) / requests, 2),
+        "errors": errors,
+    }
+
+
+async def serve(tasks: int, requests: int, concurrency: int, seed: int, warmup: int) -> dict:
+    """Run the scenarios against the app of this process, configured by the environment ``run`` sets"""
+    import httpx
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from main import app
+
+    event.listen(Engine, "before_cursor_execute", _count_query)
+    board = Board(tasks)
+    results = {}
+    async with app.router.lifespan_context(app):
+        # Errors come back as 500s, counted like any other failed request
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+            for scenario in SCENARIOS:
+                if scenario.max_tasks is not None and tasks > scenario.max_tasks:
+                    continue
+                results[scenario.name] = await run_scenario(
+                    client, board, scenario, requests, concurrency, seed, warmup
+                )
+                print(f"{tasks} tasks, {scenario.name}: {results[scenario.name]}", file=sys.stderr)
+    return results
+
+
+def remove_database(path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def copy_database(source: Path, target: Path) -> None:
+    """Copy through SQLite, so pages still in the write-ahead log come along and a stale log cannot"""
+    remove_database(target)
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def seeded_database(db_dir: Path, tasks: int, seed: int) -> Path:
+    """The pristine seeded database for ``tasks``, created with the CLI the first time"""
+    path = db_dir / f"board-{tasks}-{seed}.db"
+    if path.exists():
+        return path
+    partial = path.with_suffix(".partial")
+    remove_database(partial)
+    env = {**os.environ, "KANBAN_DATABASE_URL": f"sqlite:///{partial}"}
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "app.cli", "migrate"], cwd=API_DIR, env=env, check=True)
+    subprocess.run(
+        [sys.executable, "-m", "app.cli", "seed", "--tasks", str(tasks), "--seed", str(seed)],
+        cwd=API_DIR, env=env, check=True,
+    )
+    print(f"Seeded {tasks} tasks in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    copy_database(partial, path)
+    remove_database(partial)
+    return path
+
+
+def run(args) -> dict:
+    db_dir = Path(args.db_dir)
+    db_dir.mkdir(parents=True, exist_ok=True)
+    results = {
+        "meta": {
+            "sizes": args.tasks, "requests": args.requests, "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "async_db": args.async_db, "seed": args.seed, "python": sys.version.split()[0],
+        },
+        "results": {},
+    }
+    for tasks in args.tasks:
+        working = db_dir / f"run-{tasks}.db"
+        copy_database(seeded_database(db_dir, tasks, args.seed), working)
+        env = {
+            **os.environ,
+            "KANBAN_DATABASE_URL": f"sqlite:///{working}",
+            "KANBAN_AUTO_MIGRATE": "0",
+            "KANBAN_ASYNC_DB": "1" if args.async_db else "0",
+        }
+        command = [
+            sys.executable, "-m", "benchmarks.load", "serve", str(tasks),
+            "--requests", str(args.requests), "--warmup", str(args.warmup),
+            "--concurrency", str(args.concurrency),
+            "--seed", str(args.seed),
+        ]
+        output = subprocess.run(command, cwd=API_DIR, env=env, check=True, stdout=subprocess.PIPE).stdout
+        results["results"][str(tasks)] = json.loads(output)
+        remove_database(working)
+    return results
+
+
+def compare(base: dict, new: dict, threshold: float, p99_threshold: float, min_ms: float) -> list[str]:
+    """Regressions of ``new`` against ``base``, one line each"""
+    regressions = []
+    for size, scenarios in new["results"].items():
+        for name, now in scenarios.items():
+            before = base["results"].get(size, {}).get(name)
+            if before is None:
+                continue
+            where = f"{size} tasks, {name}"
+            for key, allowed in (("p50_ms", threshold), ("p99_ms", p99_threshold)):
+                if now[key] > before[key] * (1 + allowed) and now[key] - before[key] >= min_ms:
+                    regressions.append(f"{where}: {key} {before[key]} -> {now[key]}")
+            if now["rps"] < before["rps"] / (1 + threshold):
+                regressions.append(f"{where}: rps {before['rps']} -> {now['rps']}")
+            # Cache fills and concurrent writes move the mean by fractions; an N+1 adds a statement or more
+            queries_before, queries_now = before["queries_per_request"], now["queries_per_request"]
+            if queries_now - queries_before >= 1:
+                regressions.append(f"{where}: queries per request {queries_before} -> {queries_now}")
+            if now["errors"] > before["errors"]:
+                regressions.append(f"{where}: errors {before['errors']} -> {now['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subcommands.add_parser("run", help="seed boards and measure every scenario")
+    run_parser.add_argument(
+        "--tasks", type=lambda value: [int(size) for size in value.split(",")], default=list(SIZES),
+        help="comma-separated board sizes",
+    )
+    run_parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    run_parser.add_argument("--warmup", type=int, default=10, help="untimed requests per scenario first")
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--db-dir", default=os.path.join(os.environ.get("TMPDIR", "/tmp"), "kanban-load"))
+    run_parser.add_argument("--async-db", action="store_true", help="serve with KANBAN_ASYNC_DB")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--out", help="write the results here as well as to stdout")
+
+    serve_parser = subcommands.add_parser("serve", help="run the scenarios in this process (used by run)")
+    serve_parser.add_argument("tasks", type=int)
+    serve_parser.add_argument("--requests", type=int, default=200)
+    serve_parser.add_argument("--warmup", type=int, default=10)
+    serve_parser.add_argument("--concurrency", type=int, default=4)
+    serve_parser.add_argument("--seed", type=int, default=0)
+
+    compare_parser = subcommands.add_parser("compare", help="flag regressions between two run results")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown")
+    compare_parser.add_argument(
+        "--p99-threshold", type=float, default=1.0, help="allowed relative p99 slowdown"
+    )
+    compare_parser.add_argument(
+        "--min-ms", type=float, default=1.0, help="latency changes smaller than this are noise"
+    )
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        results = asyncio.run(serve(args.tasks, args.requests, args.concurrency, args.seed, args.warmup))
+        print(json.dumps(results))
+    elif args.command == "run":
+        results = json.dumps(run(args), indent=2)
+        if args.out:
+            Path(args.out).write_text(results + "\n")
+        print(results)
+    else:
+        regressions = compare(
+            json.loads(args.base.read_text()), json.loads(args.new.read_text()),
+            args.threshold, args.p99_threshold, args.min_ms,
+        )
+        for regression in regressions:
+            print(regression)
+        print(f"{len(regressions)} regressions")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
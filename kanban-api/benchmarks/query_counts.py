@@ -0,0 +1,58 @@
+"""Regression check: SQL statements per request must not grow with task count.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.query_counts
+
+Each endpoint is requested against boards of increasing size. The script exits
+non-zero if any endpoint issues more statements on a larger board, which is the
+signature of an N+1 lazy load.
+"""
+
+import sys
+
+from benchmarks.common import count_queries, make_client, make_engine, seed
+
+SIZES = (10, 100, 500)
+
+ENDPOINTS = [
+    "/api/tasks/",
+    "/api/tasks/?status=todo",
+    "/api/tasks/1",
+    "/api/columns/",
+    "/api/columns/todo",
+    "/api/board/",
+]
+
+
+def measure(size: int) -> dict[str, int]:
+    engine = make_engine()
+    seed(engine, tasks=size)
+    client = make_client(engine)
+
+    counts = {}
+    for path in ENDPOINTS:
+        with count_queries(engine) as counter:
+            response = client.get(path)
+        response.raise_for_status()
+        counts[path] = counter["count"]
+    engine.dispose()
+    return counts
+
+
+def main() -> int:
+    results = {size: measure(size) for size in SIZES}
+
+    failed = False
+    for path in ENDPOINTS:
+        counts = [results[size][path] for size in SIZES]
+        ok = len(set(counts)) == 1
+        failed = failed or not ok
+        detail = ", ".join(f"N={size}: {count}" for size, count in zip(SIZES, counts, strict=True))
+        print(f"{'ok  ' if ok else 'FAIL'} {path:<28} {detail}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
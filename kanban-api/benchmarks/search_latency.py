@@ -0,0 +1,85 @@
+"""Full-text search latency on a large board.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.search_latency [--tasks 1000000] [--db /tmp/search.db]
+
+Fills a SQLite database file (kept with ``--db``, so later runs skip the load)
+with ``--tasks`` tasks whose words follow a Zipf distribution over a 20k-word
+vocabulary, then times ``crud.search_tasks`` for queries from the most common
+word (in nearly every task) down to rare ones. Times are the best of three runs.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crud.search import search_tasks
+from app.database import Base, create_db_engine
+from app.importer import import_stream
+from benchmarks.common import seed
+
+VOCABULARY = [f"w{i}" for i in range(20_000)]
+QUERIES = ("w0", "w5", "w100", "w5000", "w19999", "w12", "w1 w2", "w3 w7 w40")
+LOAD_BATCH = 100_000
+
+
+def load(engine, tasks: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    seed(engine, tasks=0)
+    rng = random.Random(1)
+    pool = rng.choices(VOCABULARY, [1 / (i + 1) for i in range(len(VOCABULARY))], k=2_000_000)
+
+    def words(count: int) -> str:
+        start = rng.randrange(len(pool) - count)
+        return " ".join(pool[start:start + count])
+
+    for start in range(0, tasks, LOAD_BATCH):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["title", "description", "status"])
+        writer.writerows([words(6), words(20), "todo"] for _ in range(min(LOAD_BATCH, tasks - start)))
+        with Session(engine) as db:
+            for _ in import_stream(db, "tasks", io.BytesIO(out.getvalue().encode()), "csv"):
+                pass
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO task_search(task_search) VALUES ('optimize')"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--db", help="database file to reuse between runs")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "search.db")
+    fresh = not os.path.exists(path)
+    engine = create_db_engine(f"sqlite:///{path}")
+    if fresh:
+        load(engine, args.tasks)
+
+    results = {}
+    with Session(engine) as db:
+        for q in QUERIES:
+            best = float("inf")
+            for _ in range(3):
+                started = time.perf_counter()
+                hits = search_tasks(db, q)
+                best = min(best, time.perf_counter() - started)
+            results[q] = {"hits": len(hits), "ms": round(best * 1000, 1)}
+    engine.dispose()
+    if not args.db:
+        os.remove(path)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Per-task cost of building a task list response, default path vs the fast JSON path.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.serialization [--tasks 1000] [--repeat 20]
+
+"default" is what ``GET /api/tasks/`` does without KANBAN_FAST_JSON: load ORM
+objects with their comments and tags, validate them against ``list[Task]`` and
+encode them the way FastAPI does. "fast" selects Core rows and encodes dicts
+with orjson (``app.serialization``). Both produce the same JSON; timings are
+the best of ``--repeat`` runs, reported per task and split into load and encode.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.orm import sessionmaker
+
+from app import serialization
+from app.crud import task as task_crud
+from app.schemas.task import Task
+from benchmarks.common import make_engine, seed
+
+RESPONSE_FIELD = create_response_field(name="Response_read_tasks", type_=list[Task])
+
+
+def default_encode(tasks) -> bytes:
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=tasks))
+    return JSONResponse(content).body
+
+
+def fast_encode(content) -> bytes:
+    return serialization.orjson.dumps(content)
+
+
+def best_of(repeat: int, session_factory, load, encode) -> tuple[float, float, bytes]:
+    best_load = best_encode = float("inf")
+    body = b""
+    for _ in range(repeat):
+        with session_factory() as db:
+            start = time.perf_counter()
+            loaded = load(db)
+            loaded_at = time.perf_counter()
+            body = encode(loaded)
+            done = time.perf_counter()
+        best_load = min(best_load, loaded_at - start)
+        best_encode = min(best_encode, done - loaded_at)
+    return best_load, best_encode, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if serialization.orjson is None:
+        parser.error("the fast path needs orjson: install the \"fast\" extra")
+
+    engine = make_engine()
+    seed(engine, tasks=args.tasks)
+    session_factory = sessionmaker(bind=engine)
+
+    paths = {
+        "default": (lambda db: task_crud.get_tasks(db, limit=args.tasks), default_encode),
+        "fast": (lambda db: serialization.tasks_content(db, limit=args.tasks), fast_encode),
+    }
+    results, bodies = {}, {}
+    for name, (load, encode) in paths.items():
+        load_s, encode_s, bodies[name] = best_of(args.repeat, session_factory, load, encode)
+        results[name] = {
+            "load_us_per_task": round(load_s / args.tasks * 1e6, 2),
+            "encode_us_per_task": round(encode_s / args.tasks * 1e6, 2),
+            "total_us_per_task": round((load_s + encode_s) / args.tasks * 1e6, 2),
+        }
+    default, fast = results["default"]["total_us_per_task"], results["fast"]["total_us_per_task"]
+    results["speedup"] = round(default / fast, 1)
+    results["same_json"] = json.loads(bodies["default"]) == json.loads(bodies["fast"])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Filtered and sorted task list latency on a large board.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.task_filters [--tasks 1000000] [--db /tmp/filters.db] [-v]
+
+Fills a SQLite database file (kept with ``--db``, so later runs skip the load)
+with ``--tasks`` tasks spread over 50 assignees, 30 tags (one to three per
+task, skewed towards the first few), two years of start and end dates and
+update times and up to ten hours spent, with one task in a thousand tracking
+time. It then times a
+100-task page of ``crud.get_tasks`` for each filter and sort in ``CASES``.
+Times are the best of three runs; ``-v`` also prints each query plan.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.crud.task import get_tasks
+from app.database import Base, create_db_engine
+from app.importer import import_stream
+from app.models.models import Tag, User
+from app.schemas.task import TaskFilter
+from benchmarks.common import seed
+
+LOAD_BATCH = 100_000
+EPOCH = datetime(2024, 1, 1)
+DAYS = 730
+TAGS = 30
+USERS = 50
+
+# (name, filters, sort); the dataset's last day is EPOCH + DAYS
+CASES = [
+    ("unfiltered", TaskFilter(), None),
+    ("assignee", TaskFilter(assignee_id=[7]), None),
+    ("assignees + high priority", TaskFilter(assignee_id=[3, 4, 5], priority=["high"]), None),
+    ("common tag", TaskFilter(tag_id=[1]), None),
+    ("rare tag", TaskFilter(tag_id=[TAGS]), None),
+    ("any of two rare tags", TaskFilter(tag_id=[TAGS - 1, TAGS]), None),
+    ("all of two tags", TaskFilter(tag_id=[1, 2], tag_match="all"), None),
+    ("all of three rare tags", TaskFilter(tag_id=[TAGS - 2, TAGS - 1, TAGS], tag_match="all"), None),
+    ("start in a week", TaskFilter(
+        start_date_from=EPOCH + timedelta(days=300), start_date_to=EPOCH + timedelta(days=307)
+    ), None),
+    ("due in a week, by due date", TaskFilter(
+        end_date_from=EPOCH + timedelta(days=400), end_date_to=EPOCH + timedelta(days=407)
+    ), [("end_date", False)]),
+    ("tracking", TaskFilter(is_tracking=True), None),
+    ("updated in the last day", TaskFilter(updated_since=EPOCH + timedelta(days=DAYS - 1)), None),
+    ("by due date", TaskFilter(), [("end_date", False)]),
+    ("newest first", TaskFilter(), [("created_at", True)]),
+    ("assignee, by priority then due date", TaskFilter(assignee_id=[7]),
+     [("priority", True), ("end_date", False)]),
+    ("by priority then due date", TaskFilter(), [("priority", True), ("end_date", False)]),
+]
+
+
+def load(engine, tasks: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    seed(engine, tasks=0, users=0, tags=0)
+    # Created up front so that "tag N" has id N, as CASES assumes, and "user N" id N + 1
+    tag_names = [f"tag {i}" for i in range(1, TAGS + 1)]
+    with Session(engine) as db:
+        db.add_all(Tag(name=name) for name in tag_names)
+        db.add_all(User(name=f"user {i}", avatar=f"U{i}") for i in range(USERS))
+        db.commit()
+    rng = random.Random(1)
+    tag_weights = [1 / i for i in range(1, TAGS + 1)]
+
+    def row():
+        start = EPOCH + timedelta(days=rng.randrange(DAYS), minutes=rng.randrange(1440))
+        tags = set(rng.choices(tag_names, tag_weights, k=rng.randint(1, 3)))
+        return [
+            "Task", rng.choice(("todo", "in-progress", "review", "done")),
+            rng.choice(("low", "medium", "high")),
+            f"user {rng.randrange(USERS)}", ";".join(tags), start.isoformat(),
+            (start + timedelta(days=rng.randrange(30))).isoformat(),
+            (start + timedelta(days=rng.randrange(DAYS))).isoformat(), rng.randrange(40) * 900,
+        ]
+
+    for start in range(0, tasks, LOAD_BATCH):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow([
+            "title", "status", "priority", "assignee", "tags", "start_date", "end_date", "updated_at",
+            "time_spent",
+        ])
+        writer.writerows(row() for _ in range(min(LOAD_BATCH, tasks - start)))
+        with Session(engine) as db:
+            for _ in import_stream(db, "tasks", io.BytesIO(out.getvalue().encode()), "csv"):
+                pass
+    with engine.begin() as connection:
+        # Imported tasks never start out tracking
+        connection.execute(text("UPDATE tasks SET is_tracking = 1 WHERE id % 1000 = 0"))
+        connection.execute(text("ANALYZE"))
+
+
+def query_plan(engine, db: Session, filters: TaskFilter, order_by) -> list[str]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        get_tasks(db, filters=filters, order_by=order_by)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    statement, parameters = statements[0]
+    return [row[3] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--db", help="database file to reuse between runs")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print each query plan")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "filters.db")
+    fresh = not os.path.exists(path)
+    engine = create_db_engine(f"sqlite:///{path}")
+    if fresh:
+        load(engine, args.tasks)
+
+    results = {}
+    with Session(engine) as db:
+        for name, filters, order_by in CASES:
+            best = float("inf")
+            for _ in range(3):
+                started = time.perf_counter()
+                tasks = get_tasks(db, filters=filters, order_by=order_by)
+                best = min(best, time.perf_counter() - started)
+                db.expunge_all()
+            results[name] = {"tasks": len(tasks), "ms": round(best * 1000, 1)}
+            if args.verbose:
+                results[name]["plan"] = query_plan(engine, db, filters, order_by)
+    engine.dispose()
+    if not args.db:
+        os.remove(path)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Concurrent time tracking: no lost time, and the cost of "who is tracking now".
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.time_tracking [--threads 8] [--rounds 200] [--tasks 5] [--history 1000000]
+
+``--threads`` threads start and stop tracking on the same ``--tasks`` tasks
+``--rounds`` times each through ``crud.start_time_entry`` and
+``crud.stop_time_entry``, on a SQLite file, so most attempts race another
+thread for the same task. Afterwards the seconds of the stops that succeeded,
+the tasks' ``time_spent``, the closed entries and the rollup must all agree,
+and no task may have more than one running entry.
+
+It then adds ``--history`` closed entries and times
+``crud.get_active_time_entries`` (best of five), which reads only
+ix_time_entries_active however long the history grows.
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.crud.time_entry import get_active_time_entries, start_time_entry, stop_time_entry
+from app.models.models import Task, TimeEntry, TimeRollup
+from benchmarks.common import make_engine, seed
+
+HISTORY_BATCH = 100_000
+
+
+def race(engine, threads: int, rounds: int, tasks: int) -> dict:
+    counts = {"started": 0, "stopped": 0, "conflicts": 0, "busy": 0, "seconds": 0.0}
+    lock = threading.Lock()
+
+    def worker(seed_: int):
+        rng = random.Random(seed_)
+        for _ in range(rounds):
+            task_id = rng.randint(1, tasks)
+            with Session(engine) as db:
+                try:
+                    if rng.random() < 0.5:
+                        start_time_entry(db, task_id)
+                        outcome, seconds = "started", 0.0
+                    else:
+                        outcome, seconds = "stopped", stop_time_entry(db, task_id).seconds
+                except ValueError:
+                    outcome, seconds = "conflicts", 0.0
+                except OperationalError:
+                    # SQLite's single writer timing out, not a lost update
+                    outcome, seconds = "busy", 0.0
+            with lock:
+                counts[outcome] += 1
+                counts["seconds"] += seconds
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    counts["ops_per_s"] = round(threads * rounds / elapsed)
+
+    with Session(engine) as db:
+        totals = {
+            "task time_spent": db.scalar(select(func.sum(Task.time_spent)).where(Task.id <= tasks)),
+            "closed entries": db.scalar(select(func.coalesce(func.sum(TimeEntry.seconds), 0))),
+            "rollup": db.scalar(select(func.coalesce(func.sum(TimeRollup.seconds), 0))),
+        }
+        running = db.execute(
+            select(TimeEntry.task_id, func.count())
+            .where(TimeEntry.stopped_at.is_(None))
+            .group_by(TimeEntry.task_id)
+        ).all()
+        tracking = db.scalars(select(Task.id).where(Task.is_tracking)).all()
+    counts["seconds"] = round(counts["seconds"], 6)
+    counts["consistent"] = (
+        all(abs(total - counts["seconds"]) < 1e-6 for total in totals.values())
+        and all(count == 1 for _, count in running)
+        and sorted(task_id for task_id, _ in running) == sorted(tracking)
+    )
+    counts["totals"] = {name: round(total, 6) for name, total in totals.items()}
+    return counts
+
+
+def add_history(engine, entries: int, tasks: int) -> None:
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for start in range(0, entries, HISTORY_BATCH):
+            rows = []
+            for _ in range(min(HISTORY_BATCH, entries - start)):
+                started_at = now - timedelta(minutes=rng.randrange(1, 500_000))
+                seconds = rng.randrange(60, 7200)
+                rows.append({
+                    "task_id": rng.randint(1, tasks), "user_id": None, "started_at": started_at,
+                    "stopped_at": started_at + timedelta(seconds=seconds), "seconds": seconds,
+                })
+            connection.execute(insert(TimeEntry), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=5, help="tasks the threads race on")
+    parser.add_argument(
+        "--history", type=int, default=1_000_000, help="closed entries added before timing lookups"
+    )
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "time.db")
+    engine = make_engine(f"sqlite:///{path}")
+    seed(engine, tasks=1000, comments_per_task=0, tags_per_task=0)
+    with engine.begin() as connection:
+        connection.execute(Task.__table__.update().values(time_spent=0))
+
+    results = {"race": race(engine, args.threads, args.rounds, args.tasks)}
+
+    add_history(engine, args.history, 1000)
+    with Session(engine) as db:
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            active = get_active_time_entries(db)
+            best = min(best, time.perf_counter() - started)
+            db.expunge_all()
+    results["active lookup"] = {"history": args.history, "running": len(active), "ms": round(best * 1000, 2)}
+
+    engine.dispose()
+    os.remove(path)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
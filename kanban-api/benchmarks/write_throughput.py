@@ -0,0 +1,80 @@
+"""Concurrent write throughput with and without the SQLite connection pragmas.
+
+Run from the kanban-api directory::
+
+    python -m benchmarks.write_throughput [--threads 8] [--writes 200]
+
+Each thread commits single-task transactions, as the task router does. The
+same workload runs against a fresh database file with the default rollback
+journal and again with WAL, ``synchronous=NORMAL`` and ``busy_timeout``.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_db_engine
+from app.models.models import KanbanColumn, Task
+
+
+def run(sqlite_pragmas: bool, threads: int, writes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", sqlite_pragmas=sqlite_pragmas)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+        with SessionLocal() as db:
+            db.add(KanbanColumn(id="todo", title="To Do", position=0))
+            db.commit()
+
+        errors = []
+
+        def worker(n: int):
+            db = SessionLocal()
+            try:
+                for i in range(writes):
+                    try:
+                        db.add(Task(title=f"Task {n}-{i}", status="todo"))
+                        db.commit()
+                    except OperationalError as e:
+                        db.rollback()
+                        errors.append(str(e.orig))
+            finally:
+                db.close()
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        started = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    committed = threads * writes - len(errors)
+    return {
+        "sqlite_pragmas": sqlite_pragmas,
+        "committed": committed,
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "writes_per_second": round(committed / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="commits per thread")
+    args = parser.parse_args()
+
+    results = [run(False, args.threads, args.writes), run(True, args.threads, args.writes)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
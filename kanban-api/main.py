@@ -1,14 +1,35 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import Base, engine
-from app.init_db import init_db
-from app.routers import columns, comments, tags, tasks, users
+from app import config
+from app import metrics as request_metrics
+from app.cache import read_cache
+from app.database import get_async_engine
+from app.etags import NotModified, not_modified_handler
+from app.events import change_feed
+from app.profiling import ProfilingMiddleware
+from app.routers import (
+    analytics,
+    board,
+    columns,
+    comments,
+    export,
+    imports,
+    search,
+    tags,
+    tasks,
+    time_entries,
+    users,
+)
 
 # Initialize FastAPI app
 app = FastAPI(title="Kanban API", description="API for Kanban Board Application")
 
+# Innermost, so CORS headers are added to the profiles it returns too
+if config.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -16,23 +37,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-Id"],
 )
 
+# Outermost, so the timings cover CORS handling too
+if config.METRICS_ENABLED:
+    app.add_middleware(request_metrics.MetricsMiddleware)
+
+# Conditional GETs whose If-None-Match still matches end in an empty 304
+app.add_exception_handler(NotModified, not_modified_handler)
+
 # Include routers
 app.include_router(columns.router, prefix="/api/columns", tags=["columns"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(comments.router, prefix="/api/comments", tags=["comments"])
 app.include_router(tags.router, prefix="/api/tags", tags=["tags"])
+app.include_router(board.router, prefix="/api/board", tags=["board"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(imports.router, prefix="/api/import", tags=["import"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(time_entries.router, prefix="/api/time", tags=["time"])
 
 
 @app.on_event("startup")
 async def startup_event():
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    await change_feed.start()
+
+    # Production deploys run `python -m app.cli migrate` once instead of every worker checking the schema
+    if not config.AUTO_MIGRATE:
+        return
+
+    from app.cli import migrate, seed
+
+    # Bring the schema up to date and initialize the database with sample data
+    migrate(configure_logger=False)
+    seed()
 
-    # Initialize the database with sample data
-    init_db()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await change_feed.stop()
+
+    # Close pooled async connections so their driver threads can exit
+    if config.ASYNC_DB:
+        await get_async_engine().dispose()
 
 
 @app.get("/")
@@ -45,5 +95,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/api/metrics")
+async def metrics():
+    """Counters for this worker process"""
+    return {"cache": read_cache.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Request, SQL and cache metrics for this worker process, for Prometheus to scrape"""
+    return Response(request_metrics.render(read_cache.stats()), media_type=request_metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
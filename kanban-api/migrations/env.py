@@ -0,0 +1,66 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.analytics import TABLE_PREFIX as ANALYTICS_TABLE_PREFIX
+from app.database import Base, create_db_engine
+from app.search import SEARCH_TABLE
+
+config = context.config
+
+# Leave logging alone when migrations run inside the API process (see app.cli.migrate)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    # An explicit sqlalchemy.url (e.g. set programmatically) wins over app.config
+    from app.database import SQLALCHEMY_DATABASE_URL
+
+    return config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+
+def include_name(name, type_, parent_names) -> bool:
+    # The FTS5 table and its shadow tables, and the analytics summary tables, are managed by app.search and
+    # app.analytics, not by the models
+    return not (type_ == "table" and name.startswith((SEARCH_TABLE, ANALYTICS_TABLE_PREFIX)))
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting to a database"""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=include_name,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_db_engine(get_url())
+
+    with connectable.connect() as connection:
+        # Batch mode lets ALTER-style operations work on SQLite by rebuilding the table
+        context.configure(
+            connection=connection, target_metadata=target_metadata, render_as_batch=True,
+            include_name=include_name,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+    connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,41 @@
+"""Index the foreign keys and filter columns used by the CRUD queries
+
+Task.status backs the column views, Comment.task_id the comment lists and
+task_tag.tag_id the tag lookups; the remaining foreign keys are indexed so
+user deletes and per-assignee/author queries do not scan.
+
+``if_not_exists`` keeps this safe on databases where create_all already
+built some of these indexes from the models.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEXES = [
+    ("ix_tasks_status", "tasks", ["status"]),
+    ("ix_tasks_assignee_id", "tasks", ["assignee_id"]),
+    ("ix_comments_task_id", "comments", ["task_id"]),
+    ("ix_comments_author_id", "comments", ["author_id"]),
+    ("ix_task_tag_tag_id", "task_tag", ["tag_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
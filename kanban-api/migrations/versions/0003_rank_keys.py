@@ -0,0 +1,65 @@
+"""Add fractional rank keys for task order within a column and for column order
+
+Existing tasks are ranked by id within their column and existing columns by
+position, which matches the order the API returned before.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.ranking import ranks_between
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+RankKey = sa.String().with_variant(sa.String(collation="C"), "postgresql")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("rank", RankKey, nullable=True))
+        batch_op.create_index("ix_tasks_status_rank", ["status", "rank"])
+
+    with op.batch_alter_table("columns") as batch_op:
+        batch_op.add_column(sa.Column("rank", RankKey, nullable=True))
+        batch_op.create_index("ix_columns_rank", ["rank"])
+
+    conn = op.get_bind()
+    tasks = sa.table("tasks", sa.column("id", sa.Integer), sa.column("status", sa.String), sa.column("rank"))
+    columns = sa.table(
+        "columns", sa.column("id", sa.String), sa.column("position", sa.Integer), sa.column("rank")
+    )
+
+    column_order = sa.select(columns.c.id).order_by(columns.c.position, columns.c.id)
+    column_ids = [row.id for row in conn.execute(column_order)]
+    for column_id, rank in zip(column_ids, ranks_between(None, None, len(column_ids)), strict=True):
+        conn.execute(columns.update().where(columns.c.id == column_id).values(rank=rank))
+
+    statuses = [row.status for row in conn.execute(sa.select(tasks.c.status).distinct())]
+    for status in statuses:
+        task_order = sa.select(tasks.c.id).where(tasks.c.status == status).order_by(tasks.c.id)
+        task_ids = [row.id for row in conn.execute(task_order)]
+        ranks = ranks_between(None, None, len(task_ids))
+        conn.execute(
+            tasks.update().where(tasks.c.id == sa.bindparam("task_id")).values(rank=sa.bindparam("new_rank")),
+            [{"task_id": task_id, "new_rank": rank} for task_id, rank in zip(task_ids, ranks, strict=True)],
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("columns") as batch_op:
+        batch_op.drop_index("ix_columns_rank")
+        batch_op.drop_column("rank")
+
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_index("ix_tasks_status_rank")
+        batch_op.drop_column("rank")
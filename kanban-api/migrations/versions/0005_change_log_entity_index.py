@@ -0,0 +1,24 @@
+"""Index the change log by entity for per-table versions (ETags)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_changes_entity_id", "changes", ["entity", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_changes_entity_id", table_name="changes")
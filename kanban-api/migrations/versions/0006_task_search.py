@@ -0,0 +1,31 @@
+"""Add the full-text search index over tasks and comments
+
+An FTS5 table kept current by triggers on SQLite, GIN indexes on PostgreSQL
+(see app.search); existing tasks and comments are indexed. A later batch
+migration that rebuilds ``tasks`` or ``comments`` on SQLite drops their
+triggers and must recreate the index.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+from app.search import create_search_index, drop_search_index
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_search_index(op.get_bind())
@@ -0,0 +1,44 @@
+"""Index the task and task_tag columns that task list filters and sorts use
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Supersedes ix_task_tag_tag_id; tag filters merge each tag's task ids in order
+    op.create_index("ix_task_tag_tag_id_task_id", "task_tag", ["tag_id", "task_id"])
+    op.drop_index("ix_task_tag_tag_id", table_name="task_tag")
+    op.create_index("ix_tasks_start_date", "tasks", ["start_date"])
+    op.create_index("ix_tasks_end_date", "tasks", ["end_date"])
+    op.create_index("ix_tasks_created_at", "tasks", ["created_at"])
+    op.create_index("ix_tasks_updated_at", "tasks", ["updated_at"])
+    op.create_index(
+        "ix_tasks_tracking",
+        "tasks",
+        ["is_tracking"],
+        sqlite_where=sa.text("is_tracking = 1"),
+        postgresql_where=sa.text("is_tracking"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_tracking", table_name="tasks")
+    op.drop_index("ix_tasks_updated_at", table_name="tasks")
+    op.drop_index("ix_tasks_created_at", table_name="tasks")
+    op.drop_index("ix_tasks_end_date", table_name="tasks")
+    op.drop_index("ix_tasks_start_date", table_name="tasks")
+    op.create_index("ix_task_tag_tag_id", "task_tag", ["tag_id"])
+    op.drop_index("ix_task_tag_tag_id_task_id", table_name="task_tag")
@@ -0,0 +1,32 @@
+"""Add the analytics summary tables
+
+Running totals per column and assignee, per due date and per tag, kept
+current by triggers on SQLite (see app.analytics) and filled from the
+existing tasks. Other backends compute the analytics from ``tasks`` directly.
+As with the search index, a later batch migration that rebuilds ``tasks``,
+``task_tag`` or ``tags`` on SQLite drops their triggers and must recreate them.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+from app.analytics import create_summary_tables, drop_summary_tables
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: str | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    create_summary_tables(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_summary_tables(op.get_bind())
@@ -0,0 +1,66 @@
+"""Add time entries and their daily rollup for server-side time tracking
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: str | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "time_entries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("stopped_at", sa.DateTime(), nullable=True),
+        sa.Column("seconds", sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_time_entries_id", "time_entries", ["id"])
+    op.create_index("ix_time_entries_task_id", "time_entries", ["task_id"])
+    op.create_index("ix_time_entries_user_id", "time_entries", ["user_id"])
+    op.create_index(
+        "ix_time_entries_active",
+        "time_entries",
+        ["task_id"],
+        unique=True,
+        sqlite_where=sa.text("stopped_at IS NULL"),
+        postgresql_where=sa.text("stopped_at IS NULL"),
+    )
+    op.create_table(
+        "time_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("seconds", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "user_id", "task_id"),
+    )
+    # Tasks tracking at upgrade time get their running entry, so stopping them works as for new ones
+    op.execute(
+        """INSERT INTO time_entries (task_id, user_id, started_at)
+        SELECT id, assignee_id, coalesce(tracking_start_time, CURRENT_TIMESTAMP) FROM tasks
+        WHERE is_tracking"""
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("time_rollups")
+    op.drop_index("ix_time_entries_active", table_name="time_entries")
+    op.drop_index("ix_time_entries_user_id", table_name="time_entries")
+    op.drop_index("ix_time_entries_task_id", table_name="time_entries")
+    op.drop_index("ix_time_entries_id", table_name="time_entries")
+    op.drop_table("time_entries")
@@ -0,0 +1,136 @@
+"""The CRUD queries are served by indexes.
+
+Run from the kanban-api directory with ``python -m pytest``.
+
+Each case calls a CRUD function against a seeded SQLite database, captures
+every statement it executes, and runs ``EXPLAIN QUERY PLAN`` on it. A plain
+``SCAN <table>`` (a full pass over the table or one of its indexes) fails the
+test, except for tables the case lists as intentionally unfiltered.
+"""
+
+import re
+from collections.abc import Callable
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import serialization
+from app.crud import changes as changes_crud
+from app.crud import column as column_crud
+from app.crud import comment as comment_crud
+from app.crud import tag as tag_crud
+from app.crud import task as task_crud
+from app.crud import time_entry as time_crud
+from app.crud import user as user_crud
+from app.crud.board import get_board
+from app.schemas.task import TaskFilter, TaskMove
+from benchmarks.common import make_engine, seed
+
+# (name, call, tables allowed to be scanned because the query reads all of them)
+CASES: list[tuple[str, Callable[[Session], object], set[str]]] = [
+    ("get_task", lambda db: task_crud.get_task(db, 1), set()),
+    ("get_tasks", lambda db: task_crud.get_tasks(db), {"tasks"}),
+    ("get_tasks(status)", lambda db: task_crud.get_tasks(db, status="todo"), set()),
+    ("get_tasks(after)", lambda db: task_crud.get_tasks(db, status="todo", after_id=100), set()),
+    ("get_tasks(assignee, dates)", lambda db: task_crud.get_tasks(
+        db, filters=TaskFilter(assignee_id=[1, 2], priority=["high"], end_date_to=datetime(2100, 1, 1))
+    ), set()),
+    ("get_tasks(all tags)", lambda db: task_crud.get_tasks(
+        db, filters=TaskFilter(tag_id=[1, 2], tag_match="all")
+    ), set()),
+    # Walks tasks in id order probing task_tag, stopping once the page is full
+    ("get_tasks(any tag)", lambda db: task_crud.get_tasks(db, filters=TaskFilter(tag_id=[1, 2])), {"tasks"}),
+    ("get_tasks(tracking)", lambda db: task_crud.get_tasks(db, filters=TaskFilter(is_tracking=True)), set()),
+    ("get_tasks(updated_since, sort)", lambda db: task_crud.get_tasks(
+        db, filters=TaskFilter(updated_since=datetime(2000, 1, 1)),
+        order_by=[("priority", True), ("end_date", False)],
+    ), set()),
+    ("move_task(after)", lambda db: task_crud.move_task(db, 1, TaskMove(status="todo", after_id=5)), set()),
+    ("move_task(before)", lambda db: task_crud.move_task(db, 1, TaskMove(status="todo", before_id=5)), set()),
+    ("move_task(end)", lambda db: task_crud.move_task(db, 2, TaskMove(status="done")), set()),
+    ("get_columns", lambda db: column_crud.get_columns(db), {"columns"}),
+    ("get_column_task_ids", lambda db: column_crud.get_column_task_ids(db, ["todo", "done"]), set()),
+    ("get_comments_by_task", lambda db: comment_crud.get_comments_by_task(db, 1), set()),
+    ("get_comments_by_task(after)", lambda db: comment_crud.get_comments_by_task(db, 1, after_id=1), set()),
+    ("get_users", lambda db: user_crud.get_users(db), {"users"}),
+    ("get_user", lambda db: user_crud.get_user(db, 1), set()),
+    ("get_tags", lambda db: tag_crud.get_tags(db), {"tags"}),
+    ("get_tag_by_name", lambda db: tag_crud.get_tag_by_name(db, "tag-1"), set()),
+    ("get_entity_version", lambda db: changes_crud.get_entity_version(db, ("task", "comment", "tag")), set()),
+    ("get_changes", lambda db: changes_crud.get_changes(db, since=changes_crud.get_version(db) - 5), set()),
+    ("start_time_entry", lambda db: time_crud.start_time_entry(db, 1), set()),
+    # Reads only the running entries, which are all ix_time_entries_active holds
+    ("get_active_time_entries", time_crud.get_active_time_entries, {"time_entries"}),
+    # Starts the entry it stops, so that it does not depend on another case
+    ("stop_time_entry", lambda db: (
+        time_crud.start_time_entry(db, 2), time_crud.stop_time_entry(db, 2)
+    ), set()),
+    ("get_time_entries", lambda db: time_crud.get_time_entries(db, 1), set()),
+    ("get_time_rollup(days)", lambda db: time_crud.get_time_rollup(
+        db, start=date(2026, 1, 1), end=date(2026, 1, 31)
+    ), set()),
+    ("get_board", get_board, {"columns", "tasks", "users", "tags"}),
+    # Fast JSON path (KANBAN_FAST_JSON)
+    ("tasks_content(status)", lambda db: serialization.tasks_content(db, status="todo"), set()),
+    (
+        "board_content", serialization.board_content,
+        {"columns", "tasks", "comments", "task_tag", "users", "tags"},
+    ),
+    # Reverse foreign-key loads, e.g. when deleting or inspecting a user or tag
+    ("Tag.tasks", lambda db: tag_crud.get_tag(db, 1).tasks, set()),
+    ("User.assigned_tasks", lambda db: user_crud.get_user(db, 1).assigned_tasks, set()),
+    ("User.comments", lambda db: user_crud.get_user(db, 1).comments, set()),
+    ("User.time_entries", lambda db: user_crud.get_user(db, 1).time_entries, set()),
+]
+
+# Matches full scans of a table or of every entry in one of its indexes ("CONSTANT ROW" is a FROM-less SELECT)
+SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)")
+
+
+def capture_statements(engine, db: Session, call: Callable[[Session], object]) -> list[tuple[str, object]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def table_scans(engine, statement: str, parameters) -> tuple[list[str], list[str]]:
+    """Return (plan lines, tables read by a full scan) for one statement"""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    plan = [row[3] for row in rows]
+    scans = [match.group(1) for line in plan if (match := SCAN.match(line))]
+    return plan, scans
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = make_engine()
+    seed(engine, tasks=2000)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    ("call", "allowed"), [pytest.param(call, allowed, id=name) for name, call, allowed in CASES]
+)
+def test_query_uses_indexes(engine, call: Callable[[Session], object], allowed: set[str]):
+    with Session(engine) as db:
+        statements = capture_statements(engine, db, call)
+    assert statements
+
+    problems, plans = [], []
+    for statement, parameters in statements:
+        plan, scans = table_scans(engine, statement, parameters)
+        problems += [table for table in scans if table not in allowed]
+        plans.append("\n".join([" ".join(statement.split()), *(f"    {line}" for line in plan)]))
+    assert not problems, f"full scan of {', '.join(sorted(set(problems)))}:\n" + "\n".join(plans)
@@ -17,6 +17,133 @@ const loadState = () => {
   return initialState;
 };
 
+// Send a drop to the backend as a move between the task's new neighbours
+const persistMove = (taskIdStr, columnId, taskIds, index) => {
+  api.moveTask(taskIdStr, {
+    status: columnId,
+    after_id: index > 0 ? Number(taskIds[index - 1]) : null,
+    before_id: index < taskIds.length - 1 ? Number(taskIds[index + 1]) : null
+  }).catch(error => console.error('Error moving task:', error));
+};
+
+// Task fields as they arrive in change feed deltas, mapped to the names used in state
+const TASK_FIELDS = {
+  title: 'title',
+  description: 'description',
+  start_date: 'startDate',
+  end_date: 'endDate',
+  status: 'status',
+  rank: 'rank',
+  priority: 'priority',
+  assignee_id: 'assignee',
+  tags: 'tags',
+  comments: 'comments',
+  time_spent: 'timeSpent'
+};
+
+const byRank = (items) => (a, b) => {
+  const rankA = items[a]?.rank || '';
+  const rankB = items[b]?.rank || '';
+  return rankA < rankB ? -1 : rankA > rankB ? 1 : 0;
+};
+
+// Put a task in its column's taskIds, ordered by rank, and out of every other column
+const placeTask = (columns, tasks, taskId) => {
+  const task = tasks[taskId];
+  const placed = {};
+  Object.keys(columns).forEach(colId => {
+    let taskIds = columns[colId].taskIds.filter(id => String(id) !== String(taskId));
+    if (task && colId === task.status) {
+      taskIds = [...taskIds, taskId].sort(byRank(tasks));
+    }
+    placed[colId] = { ...columns[colId], taskIds };
+  });
+  return placed;
+};
+
+// Apply one delta from the board change feed; unknown rows and kinds are ignored
+const applyChange = (state, { type, op, data }) => {
+  const id = String(data.id);
+
+  if (type === 'task') {
+    if (op === 'delete') {
+      const { [id]: removed, ...tasks } = state.tasks;
+      return { ...state, tasks, columns: placeTask(state.columns, tasks, id) };
+    }
+    const current = state.tasks[id] || { id: data.id, comments: [], tags: [], timeSpent: 0, timeTracking: {} };
+    const task = { ...current };
+    Object.entries(TASK_FIELDS).forEach(([field, key]) => {
+      if (field in data) task[key] = data[field];
+    });
+    if ('is_tracking' in data || 'tracking_start_time' in data) {
+      task.timeTracking = {
+        isTracking: data.is_tracking ?? current.timeTracking.isTracking,
+        startTime: data.tracking_start_time ?? current.timeTracking.startTime
+      };
+    }
+    const tasks = { ...state.tasks, [id]: task };
+    const moved = op === 'create' || 'status' in data || 'rank' in data;
+    return { ...state, tasks, columns: moved ? placeTask(state.columns, tasks, id) : state.columns };
+  }
+
+  if (type === 'comment') {
+    // Update and delete deltas may omit task_id, so find the task holding the comment
+    const hasComment = taskId => state.tasks[taskId].comments.some(comment => String(comment.id) === id);
+    const taskId = data.task_id != null ? String(data.task_id) : Object.keys(state.tasks).find(hasComment);
+    const task = state.tasks[taskId];
+    if (!task) return state;
+
+    let comments = task.comments.filter(comment => String(comment.id) !== id);
+    if (op !== 'delete') {
+      const existing = task.comments.find(comment => String(comment.id) === id);
+      comments = existing
+        ? task.comments.map(comment => (comment === existing ? { ...comment, ...data } : comment))
+        : [...comments, data];
+    }
+    return { ...state, tasks: { ...state.tasks, [taskId]: { ...task, comments } } };
+  }
+
+  if (type === 'column') {
+    if (op === 'delete') {
+      const { [id]: removed, ...columns } = state.columns;
+      return { ...state, columns, columnOrder: state.columnOrder.filter(colId => colId !== id) };
+    }
+    const column = { id, taskIds: [], ...state.columns[id] };
+    if ('title' in data) column.title = data.title;
+    if ('rank' in data) column.rank = data.rank;
+    const columns = { ...state.columns, [id]: column };
+    const columnOrder = state.columnOrder.includes(id) ? [...state.columnOrder] : [...state.columnOrder, id];
+    return { ...state, columns, columnOrder: columnOrder.sort(byRank(columns)) };
+  }
+
+  if (type === 'tag' && op !== 'create') {
+    const tasks = {};
+    Object.entries(state.tasks).forEach(([taskId, task]) => {
+      tasks[taskId] = {
+        ...task,
+        tags: op === 'delete'
+          ? task.tags.filter(tag => String(tag.id) !== id)
+          : task.tags.map(tag => (String(tag.id) === id ? { ...tag, ...data } : tag))
+      };
+    });
+    return { ...state, tasks };
+  }
+
+  return state;
+};
+
+// Turn a /board/changes response into the same deltas the event stream sends
+const changesToDeltas = ({ columns, tasks, comments, tags, deleted }) => [
+  ...columns.map(data => ({ type: 'column', op: 'update', data })),
+  ...tasks.map(data => ({ type: 'task', op: 'update', data })),
+  ...comments.map(data => ({ type: 'comment', op: 'update', data })),
+  ...tags.map(data => ({ type: 'tag', op: 'update', data })),
+  ...deleted.columns.map(id => ({ type: 'column', op: 'delete', data: { id } })),
+  ...deleted.tasks.map(id => ({ type: 'task', op: 'delete', data: { id } })),
+  ...deleted.comments.map(id => ({ type: 'comment', op: 'delete', data: { id } })),
+  ...deleted.tags.map(id => ({ type: 'tag', op: 'delete', data: { id } }))
+];
+
 // Define reducer function
 const kanbanReducer = (state, action) => {
   let newState;
@@ -42,6 +169,7 @@ const kanbanReducer = (state, action) => {
         columnsById[column.id] = {
           id: column.id,
           title: column.title,
+          rank: column.rank,
           taskIds: column.task_ids || []
         };
         columnOrder.push(column.id);
@@ -64,6 +192,7 @@ const kanbanReducer = (state, action) => {
           startDate: task.start_date,
           endDate: task.end_date,
           status: task.status,
+          rank: task.rank,
           priority: task.priority,
           assignee: task.assignee_id,
           tags: task.tags || [],
@@ -234,6 +363,8 @@ const kanbanReducer = (state, action) => {
               }
             }
           };
+
+          persistMove(taskIdStr, source.droppableId, newTaskIds, destination.index);
         } else {
           // Moving to a different column
           const sourceColumn = state.columns[source.droppableId];
@@ -273,9 +404,8 @@ const kanbanReducer = (state, action) => {
             }
           };
 
-          // Update the task status in the backend
-          api.updateTask(taskIdStr, { status: destination.droppableId })
-            .catch(error => console.error('Error updating task status:', error));
+          // Update the task's column and place in the backend
+          persistMove(taskIdStr, destination.droppableId, destTaskIds, destination.index);
         }
       } catch (error) {
         console.error('Error in MOVE_TASK reducer:', error);
@@ -310,14 +440,8 @@ const kanbanReducer = (state, action) => {
     case 'START_TIME_TRACKING':
       const startTimeTracking = new Date().getTime();
       
-      // Create time tracking data for API
-      const startTimeTrackingData = {
-        is_tracking: true,
-        tracking_start_time: startTimeTracking
-      };
-      
-      // Send time tracking update to API
-      api.updateTaskTimeTracking(action.payload.taskId, startTimeTrackingData)
+      // Start tracking on the server, which records its own start time
+      api.startTimeTracking(action.payload.taskId)
         .catch(error => console.error('Error starting time tracking:', error));
       
       newState = {
@@ -341,15 +465,8 @@ const kanbanReducer = (state, action) => {
       const endTime = new Date().getTime();
       const timeSpent = task.timeSpent + (endTime - startTime) / 1000; // in seconds
       
-      // Create time tracking data for API
-      const stopTimeTrackingData = {
-        is_tracking: false,
-        tracking_start_time: null,
-        time_spent: timeSpent
-      };
-      
-      // Send time tracking update to API
-      api.updateTaskTimeTracking(action.payload.taskId, stopTimeTrackingData)
+      // Stop tracking on the server, which adds the elapsed time itself
+      api.stopTimeTracking(action.payload.taskId)
         .catch(error => console.error('Error stopping time tracking:', error));
       
       newState = {
@@ -399,6 +516,11 @@ const kanbanReducer = (state, action) => {
       };
       break;
 
+    case 'APPLY_CHANGES':
+      // Deltas from other viewers (and echoes of our own writes, which apply idempotently)
+      newState = action.payload.reduce(applyChange, state);
+      break;
+
     default:
       return state;
   }
@@ -418,32 +540,18 @@ export const KanbanProvider = ({ children }) => {
 
   // Load data from the API on component mount
   useEffect(() => {
+    // Change log version the local state reflects; null until the board has loaded
+    let version = null;
+
     const fetchData = async () => {
       dispatch({ type: 'SET_LOADING', payload: true });
       try {
-        // Fetch columns
-        const columns = await api.getColumns();
-        dispatch({ type: 'SET_COLUMNS', payload: columns });
-
-        // Fetch tasks
-        const tasks = await api.getTasks();
-
-        // Fetch comments for each task
-        for (const task of tasks) {
-          try {
-            const comments = await api.getCommentsByTask(task.id);
-            task.comments = comments;
-          } catch (commentError) {
-            console.error(`Error fetching comments for task ${task.id}:`, commentError);
-            task.comments = [];
-          }
-        }
-
-        dispatch({ type: 'SET_TASKS', payload: tasks });
-
-        // Fetch users
-        const users = await api.getUsers();
-        dispatch({ type: 'SET_USERS', payload: users });
+        // Fetch columns, tasks (with comments and tags) and users in one request
+        const board = await api.getBoard();
+        dispatch({ type: 'SET_COLUMNS', payload: board.columns });
+        dispatch({ type: 'SET_TASKS', payload: board.tasks });
+        dispatch({ type: 'SET_USERS', payload: board.users });
+        version = board.version;
 
         setIsInitialized(true);
       } catch (error) {
@@ -454,7 +562,39 @@ export const KanbanProvider = ({ children }) => {
       }
     };
 
-    fetchData();
+    // Fetch only what changed since our version; cost follows churn, not board size
+    const catchUp = async () => {
+      if (version === null) return;
+      try {
+        let hasMore = true;
+        while (hasMore) {
+          const result = await api.getBoardChanges(version);
+          if (result.reset) {
+            await fetchData();
+            return;
+          }
+          dispatch({ type: 'APPLY_CHANGES', payload: changesToDeltas(result) });
+          version = result.version;
+          hasMore = result.has_more;
+        }
+      } catch (error) {
+        console.error('Error fetching board changes:', error);
+      }
+    };
+
+    // Changes made while the snapshot was loading are picked up by the catch-up
+    fetchData().then(catchUp);
+
+    // Keep the board live: apply other viewers' changes instead of reloading
+    return api.subscribeToBoard({
+      onChanges: (changes, changeVersion) => {
+        if (version === null || changeVersion <= version) return;
+        dispatch({ type: 'APPLY_CHANGES', payload: changes });
+        version = changeVersion;
+      },
+      onOpen: catchUp,
+      onResync: catchUp
+    });
   }, []);
 
   return (
@@ -10,6 +10,32 @@ const api = axios.create({
   },
 });
 
+// Board API calls
+export const getBoard = async () => {
+  const response = await api.get('/board');
+  return response.data;
+};
+
+// Rows changed after a board version, plus the version to ask from next time
+export const getBoardChanges = async (since) => {
+  const response = await api.get('/board/changes', { params: { since } });
+  return response.data;
+};
+
+// Live board changes over server-sent events; returns a function that closes the stream
+export const subscribeToBoard = ({ onChanges, onOpen, onResync }) => {
+  const source = new EventSource(`${API_URL}/board/events`);
+  source.addEventListener('change', event => {
+    const { version, changes } = JSON.parse(event.data);
+    onChanges(changes, version);
+  });
+  // Fires on every (re)connect; anything published while disconnected is fetched from /board/changes
+  source.addEventListener('open', onOpen);
+  // The server dropped this viewer for falling behind
+  source.addEventListener('resync', onResync);
+  return () => source.close();
+};
+
 // Column API calls
 export const getColumns = async () => {
   const response = await api.get('/columns');
@@ -57,12 +83,23 @@ export const updateTask = async (taskId, task) => {
   return response.data;
 };
 
+export const moveTask = async (taskId, move) => {
+  const response = await api.post(`/tasks/${taskId}/move`, move);
+  return response.data;
+};
+
 export const deleteTask = async (taskId) => {
   await api.delete(`/tasks/${taskId}`);
 };
 
-export const updateTaskTimeTracking = async (taskId, timeTracking) => {
-  const response = await api.put(`/tasks/${taskId}/time-tracking`, timeTracking);
+// The server's clock times entries; the board picks up the new time spent from the change feed
+export const startTimeTracking = async (taskId) => {
+  const response = await api.post(`/time/task/${taskId}/start`);
+  return response.data;
+};
+
+export const stopTimeTracking = async (taskId) => {
+  const response = await api.post(`/time/task/${taskId}/stop`);
   return response.data;
 };
 